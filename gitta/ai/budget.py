@@ -0,0 +1,333 @@
+# ai/budget.py
+# Purpose: Keep every prompt within one predictable size budget.
+#
+# Responsibilities:
+#   - Share a prompt budget between a template's variable sections
+#   - Compress commit logs (collapse fixups, dedupe, keep newest/oldest)
+#   - Compress diffstats by aggregating files per directory
+#   - Cut diffs and free text at a line boundary
+#   - Compact diffs in steps when a prompt overflows the model's context
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+
+from gitta.ai.tokens import PromptBudget
+
+# Diffs get twice the share of commit logs, stats and context when they compete
+DIFF_WEIGHT = 2
+
+# Commits that only amend an earlier commit of the same branch
+FIXUP_PREFIXES = ("fixup! ", "squash! ", "amend! ")
+
+# Diff compaction levels, applied in turn after a context-length error
+COMPACT_LOW_VALUE = 1  # low-value files reduced to a stat line
+COMPACT_HUNKS = 2  # and only the first hunk of every other file kept
+COMPACT_STAT_ONLY = 3  # every file reduced to a stat line
+MAX_COMPACTION = COMPACT_STAT_ONLY
+
+# Files whose diffs say little about a change: lock files, generated,
+# minified and vendored code, snapshots
+LOW_VALUE_RE = re.compile(
+    r"(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|poetry\.lock|uv\.lock|Pipfile\.lock|Cargo\.lock|Gemfile\.lock|composer\.lock|go\.sum)$"
+    r"|\.(min\.js|min\.css|map|snap|svg|pb\.go)$"
+    r"|(^|/)(vendor|node_modules|dist|build|__snapshots__)/"
+)
+
+# A file section of a diff, or the one-line form of a pure rename/copy
+_FILE_SECTION_RE = re.compile(r"^(?:diff --git a/.+ b/(.+)|(?:rename|copy) .+ => .+)$", re.MULTILINE)
+
+# `path | 12 +++--`, `path | Bin 0 -> 12 bytes` or `path | +3 -1`
+_STAT_LINE_RE = re.compile(r"^\s*(.+?)\s+\|\s+(.*)$")
+_ADDED_REMOVED_RE = re.compile(r"^\+(\d+) -(\d+)$")
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """Cut text to at most limit characters, at a line boundary when one is near."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    newline = cut.rfind("\n")
+    # Prefer whole lines unless that would throw away most of the share
+    if newline > limit // 2:
+        cut = cut[:newline]
+    return cut
+
+
+def compress_commit_log(log: str, limit: int) -> str:
+    """
+    Shrink a `git log --oneline` style log to at most limit characters.
+
+    Applied in order until the log fits: fixup!/squash!/amend! commits are
+    folded into the commit they amend, repeated subjects are listed once
+    with a count, and finally only the newest and oldest commits are kept
+    around a "... N more commits" marker.
+    """
+    if len(log) <= limit:
+        return log
+
+    entries: list[list] = []  # [line, subject, repeats]
+    by_subject: dict[str, list] = {}
+    fixup_lines: list[tuple[str, str]] = []
+    for line in log.splitlines():
+        sha, _, subject = line.partition(" ")
+        subject = subject or sha
+        target = subject
+        while target.startswith(FIXUP_PREFIXES):
+            target = target.split(" ", 1)[1]
+        if target != subject:
+            # Log is newest first: the amended commit comes later
+            fixup_lines.append((line, target))
+            continue
+        if subject in by_subject:
+            by_subject[subject][2] += 1
+            continue
+        entry = [line, subject, 1]
+        by_subject[subject] = entry
+        entries.append(entry)
+
+    fixups = 0
+    for line, target in fixup_lines:
+        if target in by_subject:
+            by_subject[target][2] += 1
+            fixups += 1
+        else:
+            entries.append([line, target, 1])
+
+    lines = [line if repeats == 1 else f"{line} (x{repeats})" for line, _, repeats in entries]
+    if fixups:
+        lines.append(f"({fixups} fixup commit(s) folded into the commits they amend)")
+    text = "\n".join(lines)
+    if len(text) <= limit:
+        return text
+
+    return _keep_ends(lines, limit, "commits")
+
+
+def compress_stat(stat: str, limit: int) -> str:
+    """
+    Shrink `git diff --stat` style output to at most limit characters.
+
+    Files are aggregated into ever shallower directories (`dir/ (N files) |
+    changes`) until the output fits; the trailing summary line is kept.
+    """
+    if len(stat) <= limit:
+        return stat
+
+    lines = stat.splitlines()
+    summary = lines.pop() if lines and "changed" in lines[-1] and "|" not in lines[-1] else ""
+
+    files = []
+    for line in lines:
+        match = _STAT_LINE_RE.match(line)
+        if match:
+            files.append((match.group(1), _count_changes(match.group(2))))
+
+    out = lines + ([summary] if summary else [])
+    # Keep `depth` leading path components, from the deepest directories up
+    depth = max((len(PurePosixPath(path).parts) for path, _ in files), default=1) - 1
+    while depth >= 1:
+        rows: dict[str, list[int]] = {}
+        for path, changes in files:
+            parts = PurePosixPath(path).parts
+            key = "/".join(parts[:depth]) + "/" if len(parts) > depth else path
+            row = rows.setdefault(key, [0, 0])
+            row[0] += 1
+            row[1] += changes
+        out = [
+            f" {key} ({count} files) | {changes}" if count > 1 else f" {key} | {changes}"
+            for key, (count, changes) in rows.items()
+        ]
+        if summary:
+            out.append(summary)
+        text = "\n".join(out)
+        if len(text) <= limit:
+            return text
+        depth -= 1
+
+    return _keep_ends(out, limit, "entries")
+
+
+def _count_changes(value: str) -> int:
+    """Lines changed in the right-hand side of a stat line (0 for binary files)."""
+    match = _ADDED_REMOVED_RE.match(value.strip())
+    if match:
+        return int(match.group(1)) + int(match.group(2))
+    number = re.match(r"\d+", value.strip())
+    return int(number.group()) if number else 0
+
+
+def _keep_ends(lines: list[str], limit: int, noun: str) -> str:
+    """Keep the first and last lines that fit, with a marker for the omitted middle."""
+    head: list[str] = []
+    tail: list[str] = []
+    size = 0
+    i, j = 0, len(lines) - 1
+    reserve = len(f"... {len(lines)} more {noun} ...") + 2
+    # Alternate between both ends so the newest and oldest survive equally
+    while i <= j:
+        line = lines[i] if len(head) <= len(tail) else lines[j]
+        if size + len(line) + 1 + reserve > limit:
+            break
+        size += len(line) + 1
+        if len(head) <= len(tail):
+            head.append(line)
+            i += 1
+        else:
+            tail.append(line)
+            j -= 1
+
+    omitted = j - i + 1
+    if omitted <= 0:
+        return "\n".join(head + tail[::-1])
+    return truncate_text("\n".join(head + [f"... {omitted} more {noun} ..."] + tail[::-1]), limit)
+
+
+def compact_diff(diff: str, level: int) -> str:
+    """
+    Shrink a diff by dropping detail at increasing compaction levels.
+
+    COMPACT_LOW_VALUE replaces the diffs of lock files, generated and
+    vendored code with a `path | +added -removed` line; COMPACT_HUNKS also
+    keeps only the first hunk of every other file; COMPACT_STAT_ONLY
+    reduces every file to its stat line. Text that is not part of a file
+    section (e.g. a heading before the diff) is kept.
+    """
+    if level <= 0:
+        return diff
+    matches = list(_FILE_SECTION_RE.finditer(diff))
+    if not matches:
+        return diff
+
+    out = [diff[:matches[0].start()].rstrip("\n")] if matches[0].start() else []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(diff)
+        section = diff[match.start():end].rstrip("\n")
+        path = match.group(1)
+        if path is None:
+            # Pure moves are a single line already
+            out.append(section)
+        elif level >= COMPACT_STAT_ONLY or LOW_VALUE_RE.search(path):
+            out.append(_stat_line(path, section))
+        elif level >= COMPACT_HUNKS:
+            out.append(_first_hunk(section))
+        else:
+            out.append(section)
+    return "\n".join(out)
+
+
+def _stat_line(path: str, section: str) -> str:
+    added = removed = 0
+    for line in section.splitlines():
+        if line.startswith("+") and not line.startswith("+++"):
+            added += 1
+        elif line.startswith("-") and not line.startswith("---"):
+            removed += 1
+    return f"{path} | +{added} -{removed} (diff omitted)"
+
+
+def _first_hunk(section: str) -> str:
+    """A file section cut after its first hunk, noting how many were left out."""
+    lines = section.splitlines()
+    hunks = [i for i, line in enumerate(lines) if line.startswith("@@")]
+    if len(hunks) <= 1:
+        return section
+    return "\n".join(lines[:hunks[1]] + [f"... {len(hunks) - 1} more hunk(s) omitted"])
+
+
+@dataclass
+class Section:
+    """
+    One variable part of a prompt.
+
+    weight sets the section's share of the budget when sections compete;
+    fit shrinks its text to a given length. Sections with fit=None are
+    always kept whole (e.g. file lists a response is validated against).
+    compact, when set, drops detail at a compaction level (see
+    compact_diff) before the section is fitted.
+    """
+
+    text: str
+    weight: float = 1.0
+    fit: Callable[[str, int], str] | None = truncate_text
+    compact: Callable[[str, int], str] | None = None
+
+
+def allocate(sizes: dict[str, int], weights: dict[str, float], budget: int) -> dict[str, int]:
+    """
+    Share budget between sections by weight.
+
+    Sections needing less than their share keep their full size, and what
+    they leave over is shared among the rest.
+    """
+    alloc: dict[str, int] = {}
+    remaining = dict(sizes)
+    left = max(budget, 0)
+    while remaining:
+        total_weight = sum(weights[name] for name in remaining) or 1
+        fitting = [name for name, size in remaining.items() if size <= left * weights[name] / total_weight]
+        if not fitting:
+            for name in remaining:
+                alloc[name] = int(left * weights[name] / total_weight)
+            break
+        for name in fitting:
+            alloc[name] = remaining.pop(name)
+            left -= alloc[name]
+    return alloc
+
+
+def fit_sections(sections: dict[str, Section], budget: PromptBudget) -> dict[str, str]:
+    """
+    Shrink a prompt's sections so their total size stays within budget.
+
+    Sections are measured and shared out in the budget's unit (characters
+    or tokens); each share is turned into a character limit for the
+    section's fit function using that section's own characters per unit,
+    and cut exactly if the estimate overshoots.
+
+    Args:
+        sections: The template's variable sections by placeholder name.
+        budget: Total size allowed across all sections.
+
+    Returns:
+        The (possibly compressed) text for each placeholder.
+    """
+    fitted = {name: s.text for name, s in sections.items()}
+    sizes = {name: budget.measure(s.text) for name, s in sections.items()}
+    if sum(sizes.values()) <= budget.limit:
+        return fitted
+
+    def shrink(name: str, share: int) -> str:
+        text = sections[name].text
+        chars = share * len(text) // max(sizes[name], 1)
+        result = sections[name].fit(text, chars)
+        return result if budget.measure(result) <= share else budget.cut(result, share)
+
+    fixed = sum(sizes[name] for name, s in sections.items() if s.fit is None)
+    flexible = {name: s for name, s in sections.items() if s.fit is not None}
+    weights = {name: s.weight for name, s in flexible.items()}
+    alloc = allocate({name: sizes[name] for name in flexible}, weights, budget.limit - fixed)
+    for name in flexible:
+        if sizes[name] > alloc[name]:
+            fitted[name] = shrink(name, alloc[name])
+
+    # Compressed logs and stats often land well under their share: give
+    # what they leave to the sections that were simply cut (e.g. the diff)
+    unused = budget.limit - fixed - sum(budget.measure(fitted[name]) for name in flexible)
+    cut = [name for name, s in flexible.items() if s.fit is truncate_text and sizes[name] > alloc[name]]
+    if unused > 0 and cut:
+        extra = allocate({name: sizes[name] - alloc[name] for name in cut}, weights, unused)
+        for name in cut:
+            fitted[name] = shrink(name, alloc[name] + extra[name])
+    return fitted
+
+
+def format_group_list(groups: list[tuple[str, list[str]]]) -> str:
+    """The suggested split-commit groups as listed in the split prompt."""
+    return "\n".join(f"- {scope}: {', '.join(files)}" for scope, files in groups)
+
+
+def exceeds_budget(budget: PromptBudget, *texts: str) -> bool:
+    """Whether texts would be shrunk by fit_sections() under budget."""
+    return sum(budget.measure(text) for text in texts) > budget.limit
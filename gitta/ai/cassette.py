@@ -0,0 +1,152 @@
+# ai/cassette.py
+# Purpose: Record and replay AI requests for offline runs and benchmarks.
+#
+# Responsibilities:
+#   - Key each request by a hash of its rendered prompt and parameters
+#   - Record mode: append request key, completion, usage and latency to a cassette
+#   - Replay mode: serve recorded completions locally, optionally with latency
+#
+# Enabled through the environment:
+#   GITTA_CASSETTE=path/to/cassette.jsonl
+#   GITTA_CASSETTE_MODE=record|replay          (default: replay)
+#   GITTA_CASSETTE_LATENCY=<ms>|recorded       (replay only; default: 0)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from openai.types.chat import ChatCompletion
+
+from gitta.constants import CASSETTE_ENV, CASSETTE_LATENCY_ENV, CASSETTE_MODE_ENV
+
+# Request parameters that change the completion; anything else is ignored
+KEY_FIELDS = ("model", "messages", "temperature", "n", "max_tokens", "response_format")
+
+
+class ReplayedBadRequestError(Exception):
+    """A request the provider rejected when the cassette was recorded."""
+
+
+class CassetteMissError(RuntimeError):
+    """Replay mode found no recorded response for a request."""
+
+
+def request_key(kwargs: dict) -> str:
+    """Stable hash of the rendered prompt and the parameters that affect the completion."""
+    fields = {name: kwargs[name] for name in KEY_FIELDS if kwargs.get(name) is not None}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+class Cassette:
+    """
+    A JSON Lines file of recorded interactions.
+
+    Each line holds one request key with either the completion (including
+    usage) or the provider's error, plus the latency seen when recording.
+    A key recorded several times is replayed in recording order, repeating
+    the last entry once they run out.
+    """
+
+    def __init__(self, path: Path, mode: str, latency: str = "0"):
+        if mode not in ("record", "replay"):
+            raise RuntimeError(f"Invalid {CASSETTE_MODE_ENV} '{mode}'. Must be 'record' or 'replay'.")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict]] = {}
+        self._served: dict[str, int] = {}
+
+        if mode == "replay":
+            try:
+                lines = path.read_text().splitlines()
+            except OSError as e:
+                raise RuntimeError(f"Cannot read cassette {path}: {e}")
+            for number, line in enumerate(lines, 1):
+                if line.strip():
+                    try:
+                        entry = json.loads(line)
+                        key = entry["key"]
+                    except (ValueError, TypeError, KeyError) as e:
+                        raise RuntimeError(f"Invalid cassette entry at {path}:{number}: {e}") from None
+                    self._entries.setdefault(key, []).append(entry)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def replay(self, kwargs: dict) -> ChatCompletion:
+        """
+        Serve the recorded completion for a request.
+
+        Raises:
+            CassetteMissError: If the request was never recorded.
+            ReplayedBadRequestError: If the provider rejected it when recorded.
+        """
+        key = request_key(kwargs)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(
+                    f"No recorded response in cassette {self.path} for this request "
+                    f"(key {key[:12]}). Re-record with {CASSETTE_MODE_ENV}=record."
+                )
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            entry = entries[min(index, len(entries) - 1)]
+
+        self._simulate_latency(entry)
+
+        if "error" in entry:
+            raise ReplayedBadRequestError(entry["error"])
+        return ChatCompletion.model_validate(entry["response"])
+
+    def record(self, kwargs: dict, elapsed_ms: float, response: ChatCompletion | None = None, error: str | None = None) -> None:
+        """Append one interaction to the cassette."""
+        entry = {"key": request_key(kwargs), "model": kwargs.get("model"), "latency_ms": round(elapsed_ms, 1)}
+        if response is not None:
+            entry["response"] = response.model_dump(mode="json")
+        else:
+            entry["error"] = error
+
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(line)
+
+    def _simulate_latency(self, entry: dict) -> None:
+        if self.latency == "recorded":
+            delay_ms = entry.get("latency_ms", 0)
+        else:
+            try:
+                delay_ms = float(self.latency)
+            except ValueError:
+                raise RuntimeError(f"Invalid {CASSETTE_LATENCY_ENV} '{self.latency}'. Use milliseconds or 'recorded'.")
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+
+_cassette: Cassette | None = None
+_loaded = False
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette | None:
+    """The cassette configured by GITTA_CASSETTE for this process, or None."""
+    global _cassette, _loaded
+    with _cassette_lock:
+        if not _loaded:
+            path = os.environ.get(CASSETTE_ENV)
+            if path:
+                _cassette = Cassette(
+                    Path(path),
+                    os.environ.get(CASSETTE_MODE_ENV, "replay"),
+                    os.environ.get(CASSETTE_LATENCY_ENV, "0"),
+                )
+            _loaded = True
+        return _cassette
@@ -5,57 +5,117 @@
 #   - Load config
 #   - Retrieve API key
 #   - Instantiate client
-#   - Send prompt
+#   - Fit every prompt's variable sections into one size budget
+#   - Compact and retry prompts that overflow the model's context window
+#   - Send prompt (through the shared rate-limit scheduler)
+#   - Record or replay requests when a cassette is configured
 #   - Return text output
 
-from openai import OpenAI
+import json
+import time
+from collections.abc import Callable
+from dataclasses import replace
 
-from gitta.ai.prompts import BRANCH_PROMPT_TEMPLATE, COMMIT_PROMPT_TEMPLATE, EXPLAIN_PROMPT_TEMPLATE, PR_PROMPT_TEMPLATE, SCOPED_COMMIT_PROMPT_TEMPLATE, STYLE_INSTRUCTIONS
-from gitta.config.settings import Settings
+from openai import BadRequestError, OpenAI, RateLimitError
+
+from gitta.ai.budget import DIFF_WEIGHT, MAX_COMPACTION, Section, compact_diff, compress_commit_log, compress_stat, fit_sections, format_group_list
+from gitta.ai.cassette import ReplayedBadRequestError, get_cassette
+from gitta.ai.context_limits import is_context_length_error, load_context_limit, parse_context_limit, save_context_limit
+from gitta.ai.prompts import BRANCH_PROMPT_TEMPLATE, COMMIT_PROMPT_TEMPLATE, EXPLAIN_CHUNK_PROMPT_TEMPLATE, EXPLAIN_PROMPT_TEMPLATE, EXPLAIN_SUMMARY_PROMPT_TEMPLATE, JSON_REPAIR_PROMPT_TEMPLATE, PR_JSON_PROMPT_TEMPLATE, PR_PROMPT_TEMPLATE, SCOPED_COMMIT_PROMPT_TEMPLATE, SPLIT_COMMITS_PROMPT_TEMPLATE, SQUASH_PROMPT_TEMPLATE, STYLE_INSTRUCTIONS
+from gitta.ai.scheduler import estimate_request_tokens, get_scheduler
+from gitta.ai.tokens import get_estimator, get_prompt_budget
+from gitta.ai.schemas import PR_SCHEMA, SPLIT_COMMITS_SCHEMA, validate_pr, validate_split_commits
+from gitta.config.settings import get_settings
+from gitta.constants import CANDIDATE_TEMPERATURE, CONTEXT_PROMPT_SHARE, RATE_LIMIT_RETRIES
+from gitta.utils.errors import ContextLengthError, StructuredOutputError
 
 
 class AIClient:
     def __init__ (self):
-        settings = Settings()
+        settings = get_settings()
 
         if not settings.api_key:
             raise ValueError("API key not found. Run 'gitta init' to configure your API key.")
 
+        # The scheduler owns retry pacing: SDK retries would hide 429s from it
         self.client = OpenAI(
             api_key=settings.api_key,
-            base_url=settings.base_url
+            base_url=settings.base_url,
+            max_retries=0,
         )
 
         self.model = settings.model
         self.style = settings.style
+        self.base_url = settings.base_url
+        self.prompt_budget = get_prompt_budget(settings)
+        self.estimator = get_estimator(settings.model)
+        self.scheduler = get_scheduler(settings.base_url, settings.model, settings.rpm, settings.tpm)
 
-    def generate_commit_message(self, diff: str) -> str:
+    def generate_commit_message(self, diff: str, repo_context: str = "") -> str:
         """
         Generate a commit message from a git diff using the AI client.
 
         Args:
             diff (str): The git diff representing the staged changes.
+            repo_context (str): Optional summary of the repo's commit conventions.
 
         Returns:
             str: The generated commit message.
         """
         style_instructions = STYLE_INSTRUCTIONS.get(self.style, STYLE_INSTRUCTIONS["conventional"])
-        prompt = COMMIT_PROMPT_TEMPLATE.format(diff=diff, style_instructions=style_instructions)
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
+        sections = dict(diff=Section(diff, DIFF_WEIGHT, compact=compact_diff), repo_context=Section(repo_context))
+        response = self._send(
+            COMMIT_PROMPT_TEMPLATE,
+            sections,
+            {"style_instructions": style_instructions},
             temperature=0,
         )
 
         return response.choices[0].message.content.strip()
 
+    def generate_commit_messages(self, diff: str, n: int, repo_context: str = "", sample: bool = False) -> list[str]:
+        """
+        Generate several alternative commit messages in a single request.
+
+        Args:
+            diff (str): The git diff representing the staged changes.
+            n (int): Number of candidates to request.
+            repo_context (str): Optional summary of the repo's commit conventions.
+            sample (bool): Sample even a single candidate at
+                CANDIDATE_TEMPERATURE, so it can differ from earlier ones.
+
+        Returns:
+            list[str]: Distinct candidates, best first. Providers that ignore
+            `n` return a single candidate.
+        """
+        if n <= 1 and not sample:
+            return [self.generate_commit_message(diff, repo_context)]
+
+        style_instructions = STYLE_INSTRUCTIONS.get(self.style, STYLE_INSTRUCTIONS["conventional"])
+        sections = dict(diff=Section(diff, DIFF_WEIGHT, compact=compact_diff), repo_context=Section(repo_context))
+        response = self._send(
+            COMMIT_PROMPT_TEMPLATE,
+            sections,
+            {"style_instructions": style_instructions},
+            n=n,
+            # Identical samples at temperature 0 would make n pointless
+            temperature=CANDIDATE_TEMPERATURE,
+        )
+
+        candidates = []
+        for choice in response.choices:
+            text = (choice.message.content or "").strip()
+            if text and text not in candidates:
+                candidates.append(text)
+        return candidates
+
     def generate_pr_description(self, branch: str, commits: str, stat: str, diff: str) -> tuple[str, str]:
         """
         Generate a PR title and body from branch commits and diff.
 
+        Uses structured JSON output when the provider supports it and falls
+        back to the TITLE:/BODY: text format otherwise.
+
         Args:
             branch: The current branch name.
             commits: The commit log (oneline format).
@@ -65,18 +125,22 @@ class AIClient:
         Returns:
             tuple: (title, body) strings.
         """
-        prompt = PR_PROMPT_TEMPLATE.format(
-            branch=branch,
-            commits=commits,
-            stat=stat,
-            diff=diff,
+        sections = dict(
+            commits=Section(commits, fit=compress_commit_log),
+            stat=Section(stat, fit=compress_stat),
+            diff=Section(diff, DIFF_WEIGHT, compact=compact_diff),
         )
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
+        try:
+            return self._complete_json(
+                PR_JSON_PROMPT_TEMPLATE, sections, {"branch": branch}, "pr_description", PR_SCHEMA, validate_pr
+            )
+        except StructuredOutputError:
+            pass
+
+        response = self._send(
+            PR_PROMPT_TEMPLATE,
+            sections,
+            {"branch": branch},
             temperature=0,
         )
 
@@ -97,6 +161,34 @@ class AIClient:
 
         return title, body
 
+    def generate_squash_message(self, commits: str, stat: str, details: str) -> tuple[str, str]:
+        """
+        Generate the commit message for squash-merging a branch.
+
+        Args:
+            commits: The branch's commit log (oneline format).
+            stat: The diffstat summary vs the base branch.
+            details: PR description, explanation or diff describing the change.
+
+        Returns:
+            tuple: (subject, body) strings; body may be empty.
+        """
+        style_instructions = STYLE_INSTRUCTIONS.get(self.style, STYLE_INSTRUCTIONS["conventional"])
+        sections = dict(
+            commits=Section(commits, fit=compress_commit_log),
+            stat=Section(stat, fit=compress_stat),
+            details=Section(details, DIFF_WEIGHT, compact=compact_diff),
+        )
+        response = self._send(
+            SQUASH_PROMPT_TEMPLATE,
+            sections,
+            {"style_instructions": style_instructions},
+            temperature=0,
+        )
+
+        lines = response.choices[0].message.content.strip().split("\n", 1)
+        return lines[0].strip(), lines[1].strip() if len(lines) > 1 else ""
+
     def generate_branch_name(self, description: str) -> str:
         """
         Generate a git branch name from a natural language description.
@@ -107,13 +199,10 @@ class AIClient:
         Returns:
             str: The generated branch name (e.g., "feat/add-login-page").
         """
-        prompt = BRANCH_PROMPT_TEMPLATE.format(description=description)
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
+        sections = dict(description=Section(description))
+        response = self._send(
+            BRANCH_PROMPT_TEMPLATE,
+            sections,
             temperature=0,
         )
 
@@ -130,19 +219,63 @@ class AIClient:
         Returns:
             str: The explanation text.
         """
-        prompt = EXPLAIN_PROMPT_TEMPLATE.format(diff=diff, context=context)
+        sections = dict(diff=Section(diff, DIFF_WEIGHT, compact=compact_diff), context=Section(context))
+        response = self._send(
+            EXPLAIN_PROMPT_TEMPLATE,
+            sections,
+            temperature=0,
+        )
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
+        return response.choices[0].message.content.strip()
+
+    def generate_chunk_explanation(self, scope: str, files: list[str], diff: str, context: str = "") -> str:
+        """
+        Explain one part of a change that is too large for a single request.
+
+        Args:
+            scope: The module/area this part covers.
+            files: Files in this part.
+            diff: The diff of those files.
+            context: Optional context string (e.g., commit message).
+
+        Returns:
+            str: Bullet points describing this part.
+        """
+        sections = dict(
+            files=Section(", ".join(files)),
+            diff=Section(diff, DIFF_WEIGHT, compact=compact_diff),
+            context=Section(context),
+        )
+        response = self._send(
+            EXPLAIN_CHUNK_PROMPT_TEMPLATE,
+            sections,
+            {"scope": scope},
+            temperature=0,
+        )
+
+        return response.choices[0].message.content.strip()
+
+    def generate_explanation_summary(self, file_stats: str, context: str = "") -> str:
+        """
+        Summarize a large change from its file list alone.
+
+        Args:
+            file_stats: One line per changed file with added/removed line counts.
+            context: Optional context string (e.g., commit message).
+
+        Returns:
+            str: A one-line summary followed by a short overview.
+        """
+        sections = dict(files=Section(file_stats, DIFF_WEIGHT, compress_stat), context=Section(context))
+        response = self._send(
+            EXPLAIN_SUMMARY_PROMPT_TEMPLATE,
+            sections,
             temperature=0,
         )
 
         return response.choices[0].message.content.strip()
 
-    def generate_scoped_commit_message(self, scope: str, files: list[str], diff: str) -> str:
+    def generate_scoped_commit_message(self, scope: str, files: list[str], diff: str, repo_context: str = "") -> str:
         """
         Generate a commit message scoped to a specific module/group.
 
@@ -150,24 +283,222 @@ class AIClient:
             scope: The module or directory name (e.g., "cli", "ai").
             files: List of file paths in this group.
             diff: The combined diff text for this group.
+            repo_context: Optional summary of the repo's commit conventions.
 
         Returns:
             str: The generated scoped commit message.
         """
         style_instructions = STYLE_INSTRUCTIONS.get(self.style, STYLE_INSTRUCTIONS["conventional"])
-        prompt = SCOPED_COMMIT_PROMPT_TEMPLATE.format(
-            scope=scope,
-            file_list=", ".join(files),
-            diff=diff,
-            style_instructions=style_instructions,
+        sections = dict(
+            file_list=Section(", ".join(files)),
+            diff=Section(diff, DIFF_WEIGHT, compact=compact_diff),
+            repo_context=Section(repo_context),
+        )
+        response = self._send(
+            SCOPED_COMMIT_PROMPT_TEMPLATE,
+            sections,
+            {"scope": scope, "style_instructions": style_instructions},
+            temperature=0,
+        )
+
+        return response.choices[0].message.content.strip()
+
+    def generate_split_commit_messages(self, groups: list[tuple[str, list[str]]], diff: str, repo_context: str = "") -> list[tuple[str, list[str], str]]:
+        """
+        Generate all split-commit messages (and file assignments) in one request.
+
+        Args:
+            groups: Suggested (scope, files) groups covering every staged file.
+            diff: The full staged diff.
+            repo_context: Optional summary of the repo's commit conventions.
+
+        Returns:
+            list: (scope, files, message) per commit. The files partition the
+            staged files exactly, though the model may regroup them.
+
+        Raises:
+            StructuredOutputError: If no valid response could be obtained.
+        """
+        style_instructions = STYLE_INSTRUCTIONS.get(self.style, STYLE_INSTRUCTIONS["conventional"])
+        group_list = format_group_list(groups)
+        # Every file must stay listed: the response is validated against them
+        sections = dict(
+            group_list=Section(group_list, fit=None),
+            diff=Section(diff, DIFF_WEIGHT, compact=compact_diff),
+            repo_context=Section(repo_context),
+        )
+        all_files = [f for _, files in groups for f in files]
+
+        return self._complete_json(
+            SPLIT_COMMITS_PROMPT_TEMPLATE,
+            sections,
+            {"style_instructions": style_instructions},
+            "split_commits",
+            SPLIT_COMMITS_SCHEMA,
+            lambda data: validate_split_commits(data, all_files),
         )
 
-        response = self.client.chat.completions.create(
+    def _fit(self, sections: dict[str, Section], level: int = 0) -> dict[str, str]:
+        """
+        Shrink a template's variable sections to fit the prompt budget together.
+
+        The budget (max_diff_tokens, else max_diff_chars) covers everything that varies with the
+        change, so a prompt never grows past the template plus the budget
+        however many commits or files a branch has. At a compaction level
+        above 0, sections that support it drop detail first (see compact_diff).
+        """
+        if level:
+            sections = {
+                name: replace(s, text=s.compact(s.text, level)) if s.compact else s
+                for name, s in sections.items()
+            }
+        return fit_sections(sections, self.prompt_budget)
+
+    def _send(self, template: str, sections: dict[str, Section], values: dict | None = None, **kwargs):
+        """
+        Render template with its sections fitted to the budget and send it.
+
+        When the provider rejects the prompt as longer than the model's
+        context window, the window it reports is remembered (see
+        context_limits) and the prompt is rebuilt at the next compaction
+        level, until only file stats are left.
+
+        Raises:
+            ContextLengthError: If even the most compact prompt does not fit.
+        """
+        previous = None
+        for level in range(MAX_COMPACTION + 1):
+            prompt = template.format(**(values or {}), **self._fit(sections, level))
+            if prompt == previous:
+                # Nothing left to drop at this level
+                continue
+            previous = prompt
+            try:
+                return self._create(
+                    model=self.model,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    **kwargs,
+                )
+            except (BadRequestError, ReplayedBadRequestError) as e:
+                if not is_context_length_error(e):
+                    raise
+                self._learn_context_limit(str(e))
+                error = e
+        raise ContextLengthError(f"The prompt does not fit {self.model}'s context window, even reduced to file stats: {error}")
+
+    def _learn_context_limit(self, message: str) -> None:
+        """Lower the prompt budget to the context window a provider error reports, and remember it."""
+        limit = parse_context_limit(message)
+        if limit is None:
+            return
+        self.prompt_budget = self.prompt_budget.capped(int(limit * CONTEXT_PROMPT_SHARE))
+        if load_context_limit(self.base_url, self.model) != limit:
+            save_context_limit(self.base_url, self.model, limit)
+
+    def _complete_json(
+        self,
+        template: str,
+        sections: dict[str, Section],
+        values: dict,
+        name: str,
+        schema: dict,
+        validate: Callable[[dict], object],
+    ):
+        """
+        Request a JSON response matching schema and return validate(data).
+
+        The prompt is template rendered with values and the fitted sections.
+        On invalid output, one cheap repair request is made that sends only
+        the bad JSON and the validation error, not the original prompt.
+
+        Raises:
+            StructuredOutputError: If the provider rejects structured output
+                or the repaired response is still invalid.
+            ContextLengthError: If the prompt cannot be made to fit the model.
+        """
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {"name": name, "schema": schema, "strict": True},
+        }
+
+        try:
+            response = self._send(template, sections, values, temperature=0, response_format=response_format)
+        except (BadRequestError, ReplayedBadRequestError) as e:
+            raise StructuredOutputError(f"Provider does not support structured output: {e}")
+
+        output = response.choices[0].message.content or ""
+        try:
+            return validate(_parse_json(output))
+        except StructuredOutputError as e:
+            error = str(e)
+
+        repair_prompt = JSON_REPAIR_PROMPT_TEMPLATE.format(
+            error=error,
+            schema=json.dumps(schema),
+            output=output,
+        )
+        response = self._create(
             model=self.model,
             messages=[
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": repair_prompt}
             ],
             temperature=0,
+            response_format=response_format,
+        )
+        return validate(_parse_json(response.choices[0].message.content or ""))
+
+    def _create(self, **kwargs):
+        """
+        Send a chat completion request through the rate-limit scheduler.
+
+        Waits for request and token budget before sending, feeds the
+        x-ratelimit-* response headers back into the scheduler, and after a
+        429 pauses every caller until the provider's reset time before
+        retrying.
+
+        With a replay cassette the recorded response is returned without
+        touching the network; with a recording cassette each response (or
+        rejection) is appended to it.
+        """
+        cassette = get_cassette()
+        if cassette and cassette.replaying:
+            return cassette.replay(kwargs)
+
+        tokens = estimate_request_tokens(
+            kwargs["messages"], kwargs.get("max_tokens"), kwargs.get("n") or 1, self.estimator.count
         )
 
-        return response.choices[0].message.content.strip()
\ No newline at end of file
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.scheduler.acquire(tokens)
+            started = time.monotonic()
+            try:
+                raw = self.client.chat.completions.with_raw_response.create(**kwargs)
+            except RateLimitError as e:
+                self.scheduler.penalize(e.response.headers)
+                if attempt == RATE_LIMIT_RETRIES:
+                    raise
+                continue
+            except BadRequestError as e:
+                if cassette:
+                    cassette.record(kwargs, (time.monotonic() - started) * 1000, error=str(e))
+                raise
+            self.scheduler.observe(raw.headers)
+            response = raw.parse()
+            if cassette:
+                cassette.record(kwargs, (time.monotonic() - started) * 1000, response=response)
+            return response
+
+
+def _parse_json(text: str) -> dict:
+    """Parse a JSON object, tolerating a surrounding markdown code fence."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"Response is not valid JSON: {e}")
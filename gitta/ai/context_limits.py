@@ -0,0 +1,78 @@
+# ai/context_limits.py
+# Purpose: Learn model context windows from context-length errors.
+#
+# Responsibilities:
+#   - Recognize context-length-exceeded errors across providers
+#   - Parse the context window they report, when they do
+#   - Remember it per provider/model so later runs size prompts to fit
+
+import json
+import os
+import re
+import threading
+
+from gitta.constants import MODEL_LIMITS_FILE
+
+# Phrases providers use when a prompt does not fit the context window
+_CONTEXT_ERROR_RE = re.compile(
+    r"context[_ ]length|context window|maximum context|prompt is too long|input is too long|too many (input )?tokens",
+    re.IGNORECASE,
+)
+
+# "maximum context length is 8192 tokens", "context window of 8192 tokens",
+# "prompt is too long: 210000 tokens > 200000 maximum"
+_LIMIT_RES = (
+    re.compile(r"maximum context length is (\d+)", re.IGNORECASE),
+    re.compile(r"context (?:window|length) (?:of|is) (\d+)", re.IGNORECASE),
+    re.compile(r"\d+ tokens > (\d+) maximum", re.IGNORECASE),
+)
+
+_lock = threading.Lock()
+
+
+def is_context_length_error(error: Exception) -> bool:
+    """Whether a rejected request failed because the prompt was too long."""
+    return getattr(error, "code", None) == "context_length_exceeded" or bool(_CONTEXT_ERROR_RE.search(str(error)))
+
+
+def parse_context_limit(message: str) -> int | None:
+    """The context window (in tokens) reported in an error message, if any."""
+    for pattern in _LIMIT_RES:
+        match = pattern.search(message)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _key(base_url: str, model: str) -> str:
+    return f"{base_url} {model}"
+
+
+def _load() -> dict:
+    try:
+        data = json.loads(MODEL_LIMITS_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_context_limit(base_url: str, model: str) -> int | None:
+    """The context window learned for a provider/model, or None."""
+    value = _load().get(_key(base_url, model))
+    return value if isinstance(value, int) and value > 0 else None
+
+
+def save_context_limit(base_url: str, model: str, tokens: int) -> None:
+    """Remember a provider/model's context window; failures are ignored."""
+    try:
+        with _lock:
+            data = _load()
+            data[_key(base_url, model)] = tokens
+            MODEL_LIMITS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent runs never read a partial file
+            tmp = MODEL_LIMITS_FILE.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, indent=2))
+            os.replace(tmp, MODEL_LIMITS_FILE)
+    except OSError:
+        # Only an optimization: the next run would learn the limit again
+        pass
@@ -0,0 +1,118 @@
+# ai/probe.py
+# Purpose: Measure latency to the configured AI provider.
+#
+# Responsibilities:
+#   - Time TCP connect and TLS handshake to the endpoint
+#   - Time first token and streaming throughput of a tiny completion
+#   - Aggregate over a few samples
+
+import socket
+import ssl
+import statistics
+import time
+from urllib.parse import urlparse
+
+from openai import OpenAI
+
+PROBE_PROMPT = "Count from 1 to 20 separated by spaces."
+PROBE_MAX_TOKENS = 48
+
+
+def probe_latency(base_url: str, api_key: str, model: str, samples: int = 3, timeout: float = 10.0) -> dict:
+    """
+    Measure connection and generation latency against an OpenAI-compatible endpoint.
+
+    Args:
+        base_url: The provider base URL.
+        api_key: The provider API key.
+        model: The model to stream a short completion from.
+        samples: Number of measurements to take.
+        timeout: Per-request timeout in seconds.
+
+    Returns:
+        dict: Median values in milliseconds (connect_ms, tls_ms, ttft_ms) and
+        tokens_per_sec, plus the raw per-sample measurements under "samples".
+
+    Raises:
+        RuntimeError: If the endpoint cannot be reached.
+    """
+    parsed = urlparse(base_url)
+    host = parsed.hostname
+    if not host:
+        raise RuntimeError(f"Invalid base_url: {base_url}")
+    use_tls = parsed.scheme == "https"
+    port = parsed.port or (443 if use_tls else 80)
+
+    client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+
+    runs = []
+    for _ in range(samples):
+        run = _probe_connection(host, port, use_tls, timeout)
+        run.update(_probe_generation(client, model))
+        runs.append(run)
+
+    summary = {}
+    for key in ("connect_ms", "tls_ms", "ttft_ms", "tokens_per_sec"):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        summary[key] = round(statistics.median(values), 1) if values else None
+    summary["samples"] = runs
+    return summary
+
+
+def _probe_connection(host: str, port: int, use_tls: bool, timeout: float) -> dict:
+    """Time a fresh TCP connect and, for https, the TLS handshake."""
+    try:
+        start = time.perf_counter()
+        sock = socket.create_connection((host, port), timeout=timeout)
+        connected = time.perf_counter()
+    except OSError as e:
+        raise RuntimeError(f"Could not connect to {host}:{port}: {e}")
+
+    tls_ms = None
+    try:
+        if use_tls:
+            context = ssl.create_default_context()
+            with context.wrap_socket(sock, server_hostname=host):
+                tls_ms = (time.perf_counter() - connected) * 1000
+    except (OSError, ssl.SSLError) as e:
+        raise RuntimeError(f"TLS handshake with {host} failed: {e}")
+    finally:
+        sock.close()
+
+    return {"connect_ms": (connected - start) * 1000, "tls_ms": tls_ms}
+
+
+def _probe_generation(client: OpenAI, model: str) -> dict:
+    """Stream a short completion and time the first token and throughput."""
+    start = time.perf_counter()
+    first = None
+    chunks = 0
+    usage_tokens = None
+
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": PROBE_PROMPT}],
+        max_tokens=PROBE_MAX_TOKENS,
+        temperature=0,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    for chunk in stream:
+        if chunk.usage is not None:
+            usage_tokens = chunk.usage.completion_tokens
+        if chunk.choices and chunk.choices[0].delta.content:
+            if first is None:
+                first = time.perf_counter()
+            chunks += 1
+    end = time.perf_counter()
+
+    if first is None:
+        return {"ttft_ms": None, "tokens_per_sec": None}
+
+    # Providers that omit usage in streams send roughly one token per chunk
+    tokens = usage_tokens or chunks
+    duration = end - first
+    return {
+        "ttft_ms": (first - start) * 1000,
+        "tokens_per_sec": tokens / duration if duration > 0 else None,
+    }
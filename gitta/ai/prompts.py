@@ -26,6 +26,8 @@ Generate a concise commit message based on the following git diff.
 
 {style_instructions}
 
+{repo_context}
+
 Git diff:
 {diff}
 """
@@ -38,6 +40,8 @@ The changes affect these files: {file_list}
 
 {style_instructions}
 
+{repo_context}
+
 Git diff:
 {diff}
 """
@@ -77,6 +81,63 @@ Diff:
 {diff}
 """
 
+EXPLAIN_CHUNK_PROMPT_TEMPLATE = """
+You are an expert software engineer explaining part of a larger change to a teammate.
+
+The change is too large to explain at once, so it is explained in parts.
+This part covers the `{scope}` area: {files}
+
+Rules:
+- List the key changes in this part as bullet points
+- Mention any potential side effects or things a reviewer should watch for
+- Do not write an overall summary; the other parts are explained separately
+- Keep it concise but thorough
+- Use simple language — avoid jargon where possible
+
+{context}
+
+Diff:
+{diff}
+"""
+
+EXPLAIN_SUMMARY_PROMPT_TEMPLATE = """
+You are an expert software engineer summarizing a large code change for a teammate.
+
+You are given the change's context and its changed files with added/removed
+line counts, not the full diff. Each area is explained separately below your summary.
+
+Rules:
+- Start with a one-line summary of the overall change
+- Then 1-3 sentences on its purpose and overall scope
+- Do not list individual files or repeat per-area details
+
+{context}
+
+Changed files:
+{files}
+"""
+
+SQUASH_PROMPT_TEMPLATE = """
+You are an expert software engineer.
+
+Generate the commit message for a squash merge, which combines all of a
+branch's commits into a single commit on the base branch.
+
+{style_instructions}
+
+Rules:
+- Describe the branch's overall change, not the individual commits
+- Do not mention the pull request, squashing or commit hashes
+
+Commits:
+{commits}
+
+File changes:
+{stat}
+
+{details}
+"""
+
 PR_PROMPT_TEMPLATE = """
 You are an expert software engineer writing a pull request description.
 
@@ -105,3 +166,64 @@ File stats:
 Diff (may be truncated):
 {diff}
 """
+
+PR_JSON_PROMPT_TEMPLATE = """
+You are an expert software engineer writing a pull request description.
+
+Based on the following commits, file stats, and diff, generate:
+1. "title": a short PR title (under 70 characters, no prefix)
+2. "body": a markdown body with:
+   - A "## Summary" section with 1-3 bullet points explaining what changed and why
+   - A "## Changes" section listing key modifications
+
+Keep it concise and focused on what a reviewer needs to know.
+The diff may be truncated — use the file stats and commits for full coverage.
+
+Respond with a single JSON object: {{"title": "...", "body": "..."}}
+
+Branch: {branch}
+
+Commits:
+{commits}
+
+File stats:
+{stat}
+
+Diff (may be truncated):
+{diff}
+"""
+
+SPLIT_COMMITS_PROMPT_TEMPLATE = """
+You are an expert software engineer.
+
+The staged changes below will be committed as several focused commits.
+A suggested grouping by module is given; keep it unless files clearly
+belong together differently. Every file must appear in exactly one commit.
+
+For each commit, write a commit message for its changes.
+
+{style_instructions}
+
+{repo_context}
+
+Suggested groups:
+{group_list}
+
+Respond with a single JSON object:
+{{"commits": [{{"scope": "<module>", "files": ["<path>", ...], "message": "<commit message>"}}]}}
+
+Git diff:
+{diff}
+"""
+
+JSON_REPAIR_PROMPT_TEMPLATE = """
+The following JSON does not match the required schema: {error}
+
+Schema:
+{schema}
+
+Invalid JSON:
+{output}
+
+Respond with ONLY the corrected JSON object.
+"""
@@ -0,0 +1,184 @@
+# ai/scheduler.py
+# Purpose: Keep AI requests within provider rate limits.
+#
+# Responsibilities:
+#   - Estimate a request's token cost before it is sent
+#   - Enforce requests-per-minute and tokens-per-minute token buckets
+#   - Adapt the buckets from x-ratelimit-* response headers
+#   - Pause every caller after a 429 until the provider's reset time
+
+import re
+import threading
+import time
+from collections.abc import Callable
+
+from gitta.ai.tokens import estimate_tokens
+
+# Assumed completion size when a request does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 500
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def estimate_request_tokens(
+    messages: list[dict],
+    max_tokens: int | None = None,
+    n: int = 1,
+    count: Callable[[str], int] = estimate_tokens,
+) -> int:
+    """Estimate prompt plus completion tokens for a chat request, counting text with count."""
+    prompt_tokens = sum(count(m.get("content") or "") for m in messages)
+    completion = max_tokens or DEFAULT_COMPLETION_TOKENS
+    return prompt_tokens + completion * max(n, 1)
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Parse a reset duration such as '1s', '6m0s' or '20ms' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    matches = _DURATION_RE.findall(value)
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+class TokenBucket:
+    """A bucket refilled continuously at capacity per minute. Capacity 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.capacity:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if available now)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / self.capacity
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+    def observe(self, limit: int | None, remaining: int | None, now: float) -> None:
+        """Align the bucket with the provider's reported limit and remaining budget."""
+        learned = False
+        if limit:
+            self._refill(now)
+            # An unlimited bucket (level 0) learning its limit starts from what is left
+            learned = not self.capacity
+            self.capacity = float(limit)
+        if learned:
+            self.level = float(remaining) if remaining is not None else self.capacity
+        elif remaining is not None and self.capacity:
+            self.level = min(self.level, float(remaining))
+
+
+class RateLimitScheduler:
+    """
+    Thread-safe request/token budget for one provider and model.
+
+    Callers call acquire() before each request and observe() with the
+    response headers afterwards; concurrent fan-out paths share one
+    scheduler so together they stay under the limits.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until a request costing about `tokens` may be sent.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(
+                    self.blocked_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def observe(self, headers) -> None:
+        """Update the buckets from x-ratelimit-* response headers."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.observe(
+                _int_header(headers, "x-ratelimit-limit-requests"),
+                _int_header(headers, "x-ratelimit-remaining-requests"),
+                now,
+            )
+            self.tokens.observe(
+                _int_header(headers, "x-ratelimit-limit-tokens"),
+                _int_header(headers, "x-ratelimit-remaining-tokens"),
+                now,
+            )
+
+    def penalize(self, headers) -> float:
+        """
+        Pause all callers after a 429 response.
+
+        Returns:
+            Seconds until requests resume.
+        """
+        delay = (
+            parse_reset(headers.get("retry-after"))
+            or max(
+                parse_reset(headers.get("x-ratelimit-reset-requests")) or 0,
+                parse_reset(headers.get("x-ratelimit-reset-tokens")) or 0,
+            )
+            or 1.0
+        )
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        return delay
+
+
+def _int_header(headers, name: str) -> int | None:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# One scheduler per (base_url, model), shared by every client in the process
+_schedulers: dict[tuple[str, str], RateLimitScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(base_url: str, model: str, rpm: int = 0, tpm: int = 0) -> RateLimitScheduler:
+    """Return the shared scheduler for a provider and model, creating it on first use."""
+    key = (base_url, model)
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = RateLimitScheduler(rpm, tpm)
+        return _schedulers[key]
@@ -0,0 +1,114 @@
+# ai/schemas.py
+# Purpose: JSON schemas and validators for structured AI responses.
+#
+# Responsibilities:
+#   - Describe the expected JSON for PR descriptions and split commits
+#   - Validate parsed responses before they are used
+
+from gitta.utils.errors import StructuredOutputError
+
+PR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "body": {"type": "string"},
+    },
+    "required": ["title", "body"],
+    "additionalProperties": False,
+}
+
+SPLIT_COMMITS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "commits": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "scope": {"type": "string"},
+                    "files": {"type": "array", "items": {"type": "string"}},
+                    "message": {"type": "string"},
+                },
+                "required": ["scope", "files", "message"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["commits"],
+    "additionalProperties": False,
+}
+
+
+def validate_pr(data: dict) -> tuple[str, str]:
+    """
+    Validate a structured PR response.
+
+    Returns:
+        tuple: (title, body)
+
+    Raises:
+        StructuredOutputError: If the title is missing or the fields have the wrong type.
+    """
+    if not isinstance(data, dict):
+        raise StructuredOutputError("Expected a JSON object.")
+
+    title = data.get("title")
+    body = data.get("body")
+    if not isinstance(title, str) or not title.strip():
+        raise StructuredOutputError("'title' must be a non-empty string.")
+    if not isinstance(body, str):
+        raise StructuredOutputError("'body' must be a string.")
+
+    return title.strip(), body.strip()
+
+
+def validate_split_commits(data: dict, files: list[str]) -> list[tuple[str, list[str], str]]:
+    """
+    Validate a structured split-commit response against the staged files.
+
+    Every staged file must be assigned to exactly one commit.
+
+    Returns:
+        list: (scope, files, message) per commit, in response order.
+
+    Raises:
+        StructuredOutputError: If the response is malformed or the file
+            assignment is not an exact partition of the staged files.
+    """
+    commits = data.get("commits") if isinstance(data, dict) else None
+    if not isinstance(commits, list) or not commits:
+        raise StructuredOutputError("'commits' must be a non-empty array.")
+
+    expected = set(files)
+    seen: set[str] = set()
+    result = []
+
+    for i, commit in enumerate(commits):
+        if not isinstance(commit, dict):
+            raise StructuredOutputError(f"commits[{i}] must be an object.")
+
+        scope = commit.get("scope")
+        message = commit.get("message")
+        commit_files = commit.get("files")
+
+        if not isinstance(scope, str) or not scope.strip():
+            raise StructuredOutputError(f"commits[{i}].scope must be a non-empty string.")
+        if not isinstance(message, str) or not message.strip():
+            raise StructuredOutputError(f"commits[{i}].message must be a non-empty string.")
+        if not isinstance(commit_files, list) or not commit_files:
+            raise StructuredOutputError(f"commits[{i}].files must be a non-empty array.")
+
+        for path in commit_files:
+            if path not in expected:
+                raise StructuredOutputError(f"commits[{i}] lists unknown file '{path}'.")
+            if path in seen:
+                raise StructuredOutputError(f"File '{path}' is assigned to more than one commit.")
+            seen.add(path)
+
+        result.append((scope.strip(), list(commit_files), message.strip()))
+
+    missing = expected - seen
+    if missing:
+        raise StructuredOutputError(f"Files not assigned to any commit: {', '.join(sorted(missing))}.")
+
+    return result
@@ -10,8 +10,8 @@ import typer
 
 from gitta.git.repository import GitRepository
 from gitta.core.commit_service import CommitService
-from gitta.config.settings import Settings
-from gitta.cli.confirm import confirm_and_commit, confirm_and_commit_groups
+from gitta.config.settings import get_settings
+from gitta.cli.confirm import confirm_and_commit, confirm_and_commit_groups, resume_pending_split
 from gitta.utils.console import print_error, print_info, print_success, print_warning
 from gitta.utils.loading import show_loading
 
@@ -34,6 +34,19 @@ def add_command(
         print_error("Error: Not inside a Git repository.")
         raise typer.Exit(code=1)
 
+    try:
+        settings = get_settings()
+        settings.validate_api_key()
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    use_split = split if split is not None else settings.multi_file
+
+    # An interrupted split is finished (or discarded) before anything new is staged
+    if use_split and resume_pending_split() is not None:
+        return
+
     previously_staged = GitRepository.get_staged_files()
 
     try:
@@ -48,14 +61,6 @@ def add_command(
     staged = GitRepository.get_staged_files()
     print_success(f"Staged {len(staged)} file(s): {', '.join(staged)}")
 
-    try:
-        settings = Settings()
-        settings.validate_api_key()
-    except RuntimeError as e:
-        print_error(f"Error: {e}")
-        raise typer.Exit(code=1)
-
-    use_split = split if split is not None else settings.multi_file
     service = CommitService()
 
     if use_split:
@@ -70,9 +75,9 @@ def add_command(
             print_warning("Warning: Diff was too large and was truncated. The commit messages may not cover all changes.")
 
         if len(grouped) == 1:
-            committed = confirm_and_commit(grouped[0][1])
+            committed = confirm_and_commit(grouped[0][1], service)
         else:
-            committed = confirm_and_commit_groups(grouped)
+            committed = confirm_and_commit_groups(grouped, service)
     else:
         try:
             with show_loading("Generating commit message..."):
@@ -84,7 +89,7 @@ def add_command(
         if was_truncated:
             print_warning("Warning: Diff was too large and was truncated. The commit message may not cover all changes.")
 
-        committed = confirm_and_commit(message)
+        committed = confirm_and_commit(message, service)
 
     if not committed:
         GitRepository.unstage_files(staged)
@@ -3,18 +3,20 @@
 #
 # Responsibilities:
 #   - Accept a natural language description
-#   - Generate a branch name via AI
+#   - Generate a branch name via AI, or locally when the AI is slow to
+#     answer before a checkout
 #   - Optionally create and checkout the branch
 
-import subprocess
-
 import typer
 
-from gitta.ai.client import AIClient
-from gitta.config.settings import Settings
+from gitta.config.settings import get_settings
+from gitta.constants import BRANCH_NAME_DEADLINE
+from gitta.core.branch_namer import name_branch
 from gitta.git.repository import GitRepository
+from gitta.git.runner import run_git
 from gitta.utils.console import print_error, print_info, print_success
 from gitta.utils.loading import show_loading
+from gitta.worker.branch_name import start_branch_naming
 
 
 def branch_command(
@@ -25,6 +27,10 @@ def branch_command(
     Generate a branch name from a natural language description.
 
     Uses AI to convert a description into a conventional branch name.
+    With --checkout, if the AI does not answer within a few hundred
+    milliseconds, a name derived locally from the description is used
+    instead, and a background process caches the AI name for the next
+    request.
 
     Usage:
         gitta branch "fix login timeout"
@@ -35,33 +41,32 @@ def branch_command(
         raise typer.Exit(code=1)
 
     try:
-        Settings().validate_api_key()
+        get_settings().validate_api_key()
     except RuntimeError as e:
         print_error(f"Error: {e}")
         raise typer.Exit(code=1)
 
-    try:
-        with show_loading("Generating branch name..."):
-            client = AIClient()
-            branch_name = client.generate_branch_name(description)
-    except Exception as e:
-        print_error(f"Error: {e}")
-        raise typer.Exit(code=1)
+    with show_loading("Generating branch name..."):
+        # Only a checkout is worth not waiting for: a printed name is just a suggestion
+        branch_name, source = name_branch(description, BRANCH_NAME_DEADLINE if checkout else None)
 
     print_success(f"\n  {branch_name}")
+    if source == "local":
+        if checkout:
+            print_info("  (named locally: the AI suggestion did not arrive in time)")
+        else:
+            print_info("  (named locally: the AI suggestion failed)")
 
     if not checkout:
         print_info("\nUse --checkout to create and switch to this branch.")
         return
 
-    result = subprocess.run(
-        ["git", "checkout", "-b", branch_name],
-        capture_output=True,
-        text=True,
-    )
+    if source == "local":
+        # The AI name is cached for the next request, without waiting for it here
+        start_branch_naming(description)
 
+    result = run_git(["checkout", "-b", branch_name])
     if result.returncode != 0:
         print_error(f"Error creating branch: {result.stderr.strip()}")
         raise typer.Exit(code=1)
-
     print_success(f"\nSwitched to new branch '{branch_name}'.")
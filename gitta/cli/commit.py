@@ -9,8 +9,8 @@
 import typer
 
 from gitta.core.commit_service import CommitService
-from gitta.config.settings import Settings
-from gitta.cli.confirm import confirm_and_commit, confirm_and_commit_groups
+from gitta.config.settings import get_settings
+from gitta.cli.confirm import confirm_and_commit, confirm_and_commit_groups, resume_pending_split
 from gitta.utils.console import print_error, print_info, print_warning
 from gitta.utils.loading import show_loading
 
@@ -30,7 +30,7 @@ def commit_command(
         gitta commit --split
     """
     try:
-        settings = Settings()
+        settings = get_settings()
         settings.validate_api_key()
     except RuntimeError as e:
         print_error(f"Error: {e}")
@@ -40,6 +40,9 @@ def commit_command(
     service = CommitService()
 
     if use_split:
+        if not dry_run and resume_pending_split() is not None:
+            return
+
         try:
             with show_loading("Analyzing changes and generating commit messages..."):
                 grouped, was_truncated = service.run_split()
@@ -57,9 +60,9 @@ def commit_command(
 
         # Single group falls through to normal confirm flow
         if len(grouped) == 1:
-            confirm_and_commit(grouped[0][1])
+            confirm_and_commit(grouped[0][1], service)
         else:
-            confirm_and_commit_groups(grouped)
+            confirm_and_commit_groups(grouped, service)
     else:
         try:
             with show_loading("Generating commit message..."):
@@ -75,4 +78,4 @@ def commit_command(
             print_info(message)
             return
 
-        confirm_and_commit(message)
+        confirm_and_commit(message, service)
@@ -15,7 +15,17 @@ from gitta.utils.console import print_error, print_info, print_success
 config_app = typer.Typer(help="View or update configuration.")
 
 
-ALLOWED_KEYS = ["provider", "base_url", "model", "style", "api_key", "max_diff_chars"]
+ALLOWED_KEYS = ["provider", "base_url", "model", "style", "api_key", "max_diff_chars", "max_diff_tokens", "multi_file", "candidates", "repo_context", "reuse_similar", "rpm", "tpm", "rename_threshold", "copy_threshold"]
+
+INT_KEYS = ["max_diff_chars", "max_diff_tokens", "candidates", "rpm", "tpm", "rename_threshold", "copy_threshold"]
+
+# Integer keys where 0 means "off": budget in characters, limits learned from headers
+ZERO_ALLOWED_KEYS = ["max_diff_tokens", "rpm", "tpm"]
+
+# Similarity thresholds, in percent
+PERCENT_KEYS = ["rename_threshold", "copy_threshold"]
+
+BOOL_KEYS = ["multi_file", "repo_context", "reuse_similar"]
 
 
 @config_app.command(name="list")
@@ -76,16 +86,31 @@ def config_set(
         print_error(f"Invalid style '{value}'. Must be one of: {', '.join(VALID_STYLES)}")
         raise typer.Exit(code=1)
 
-    if key == "max_diff_chars":
+    if key in INT_KEYS:
+        minimum = 0 if key in ZERO_ALLOWED_KEYS else 1
         try:
             int_val = int(value)
-            if int_val <= 0:
+            if int_val < minimum:
                 raise ValueError
         except ValueError:
-            print_error("max_diff_chars must be a positive integer.")
+            kind = "a non-negative integer (0 to turn it off)" if minimum == 0 else "a positive integer"
+            print_error(f"{key} must be {kind}.")
             raise typer.Exit(code=1)
 
+    if key in PERCENT_KEYS and int(value) > 100:
+        print_error(f"{key} must be between 1 and 100.")
+        raise typer.Exit(code=1)
+
+    if key in BOOL_KEYS and value.lower() not in ("true", "false"):
+        print_error(f"{key} must be 'true' or 'false'.")
+        raise typer.Exit(code=1)
+
     data = load_config()
-    data[key] = int(value) if key == "max_diff_chars" else value
+    if key in INT_KEYS:
+        data[key] = int(value)
+    elif key in BOOL_KEYS:
+        data[key] = value.lower() == "true"
+    else:
+        data[key] = value
     save_config(data)
     print_success(f"{key} updated.")
@@ -3,35 +3,51 @@
 #
 # Responsibilities:
 #   - Display generated commit message
-#   - Prompt user to confirm, cancel, or edit
+#   - Prompt user to confirm, cancel, edit, or cycle cached candidates
 #   - Commit via GitRepository
+#   - Record split progress and resume interrupted splits
 
 import typer
 
 from gitta.git.repository import GitRepository
 from gitta.core.commit_service import CommitService
+from gitta.core.job_journal import finish_split, load_pending_split, record_split_commit, start_split
+from gitta.git.diff import find_renames_args
 from gitta.git.diff_parser import DiffGroup
 from gitta.utils.editor import open_editor_with_message
 from gitta.utils.console import print_error, print_success, print_info, print_warning
+from gitta.utils.loading import show_loading
 
 
-def confirm_and_commit(message: str) -> bool:
+def confirm_and_commit(message: str, service: CommitService | None = None) -> bool:
     """
-    Show the commit message and prompt the user to confirm, cancel, or edit.
+    Show the commit message and prompt the user to confirm, cancel, edit,
+    or regenerate.
 
     Args:
         message: The generated commit message.
+        service: The CommitService that generated the message. When given,
+            [r]egenerate cycles through its cached candidates instantly.
 
     Returns:
         True if the commit was made, False if cancelled.
     """
 
+    if service is None or not service.has_candidates():
+        service = None
+
+    if service and service.reused_from:
+        sha, score = service.reused_from
+        print_info(f"\nReusing the message of similar commit {sha[:7]} ({score:.0%} similar). Press r for a fresh AI message.")
+
     print_success("\nGenerated commit message:\n")
     print_info(message)
 
+    options = "y/n/e/r" if service else "y/n/e"
+
     while True:
         choice = typer.prompt(
-            "\nCommit with this message? [y/n/e]",
+            f"\nCommit with this message? [{options}]",
             default="y"
         ).strip().lower()
 
@@ -45,27 +61,46 @@ def confirm_and_commit(message: str) -> bool:
             return False
 
         elif choice == "e":
-            message = open_editor_with_message(message)
+            edited = open_editor_with_message(message)
 
-            if not message.strip():
+            if not edited.strip():
                 print_error("\nCommit message cannot be empty.")
-                service = CommitService()
-                message, _ = service.run(dry_run=True)
+                try:
+                    if service:
+                        edited, _, _ = service.next_candidate()
+                    else:
+                        edited, _ = CommitService().run(dry_run=True)
+                except Exception as e:
+                    # Keep the message as it was before the edit
+                    print_error(f"\nCould not regenerate: {e}")
+                    continue
+            message = edited
 
             print_success("\nUpdated commit message:\n")
             print_info(message)
 
+        elif choice == "r" and service:
+            try:
+                message, position, total = service.next_candidate()
+            except Exception as e:
+                print_error(f"\nCould not regenerate: {e}")
+                continue
+
+            print_success(f"\nAlternative commit message ({position}/{total}):\n")
+            print_info(message)
+
         else:
-            print_error("\nInvalid option. Enter y, n, or e.\n\n")
+            print_error(f"\nInvalid option. Enter {options.replace('/', ', ')}.\n\n")
 
 
-def confirm_and_commit_groups(grouped_messages: list[tuple[DiffGroup, str]]) -> bool:
+def confirm_and_commit_groups(grouped_messages: list[tuple[DiffGroup, str]], service: CommitService | None = None) -> bool:
     """
     Present multiple scoped commits for user review and execute them.
 
     Displays all proposed commits, then prompts the user to:
       [a]ll  - commit each group as a separate commit
       [m]erge - combine all messages into a single commit
+      [r]egenerate - generate fresh messages (only with a service)
       [c]ancel - abort without committing
 
     For 'all' mode, files are unstaged and restaged per group to create
@@ -73,20 +108,25 @@ def confirm_and_commit_groups(grouped_messages: list[tuple[DiffGroup, str]]) ->
 
     Args:
         grouped_messages: List of (DiffGroup, message) tuples.
+        service: The service that generated them; enables [r]egenerate,
+            which bypasses the messages journaled for the staged tree.
 
     Returns:
         True if any commits were made, False if cancelled.
     """
-    print_success(f"\nGenerated {len(grouped_messages)} scoped commit(s):\n")
+    def show(title: str) -> None:
+        print_success(f"\n{title} {len(grouped_messages)} scoped commit(s):\n")
+        for i, (group, message) in enumerate(grouped_messages, 1):
+            files_str = ", ".join(group.files)
+            print_info(f"[{i}] ({group.scope}) {files_str}")
+            print_info(f"    {message}\n")
 
-    for i, (group, message) in enumerate(grouped_messages, 1):
-        files_str = ", ".join(group.files)
-        print_info(f"[{i}] ({group.scope}) {files_str}")
-        print_info(f"    {message}\n")
+    show("Generated")
+    regenerate = " / [r]egenerate" if service else ""
 
     while True:
         choice = typer.prompt(
-            "\n[a]ll as separate commits / [m]erge into one / [c]ancel",
+            f"\n[a]ll as separate commits / [m]erge into one{regenerate} / [c]ancel",
             default="a"
         ).strip().lower()
 
@@ -99,42 +139,131 @@ def confirm_and_commit_groups(grouped_messages: list[tuple[DiffGroup, str]]) ->
             print_success("\nCommit successful (merged).")
             return True
 
+        elif choice == "r" and service:
+            try:
+                with show_loading("Regenerating commit messages..."):
+                    grouped_messages, _ = service.run_split(regenerate=True)
+            except Exception as e:
+                print_error(f"\nCould not regenerate: {e}")
+                continue
+            show("Regenerated")
+
         elif choice == "c":
             print_error("\nCommit cancelled.")
             return False
 
         else:
-            print_error("\nInvalid option. Enter a, m, or c.\n")
+            print_error(f"\nInvalid option. Enter a, m, {'r, ' if service else ''}or c.\n")
+
+
+def resume_pending_split() -> bool | None:
+    """
+    Offer to finish a split that was interrupted part way through.
+
+    Returns:
+        None if there was no pending split; otherwise whether any of its
+        remaining groups were committed (False when it was discarded).
+    """
+    try:
+        pending = load_pending_split()
+    except (RuntimeError, OSError):
+        return None
+    if not pending:
+        return None
+
+    tree, grouped, committed = pending
+    print_warning(f"\nAn interrupted split commit was found ({committed}/{len(grouped)} committed). Remaining:\n")
+    for i, (group, message) in enumerate(grouped[committed:], committed + 1):
+        print_info(f"[{i}] ({group.scope}) {', '.join(group.files)}")
+        print_info(f"    {message}\n")
+
+    if not typer.confirm("Resume it?", default=True):
+        _journal_quietly(finish_split)
+        print_info("Discarded the interrupted split.")
+        return False
+
+    return _commit_groups_separately(grouped, tree=tree, start=committed)
+
+
+def _journal_quietly(func, *args) -> None:
+    """Update the split journal; it only enables resuming, so never fail a commit over it."""
+    try:
+        func(*args)
+    except (RuntimeError, OSError):
+        pass
+
+
+def _commit_groups_separately(grouped_messages: list[tuple[DiffGroup, str]], tree: str | None = None, start: int = 0) -> bool:
+    """
+    Commit each group as a separate commit via unstage/restage cycle.
+
+    Each group's files are staged from the staged tree as it was when the
+    split was generated, so later edits in the working tree are not swept
+    in. Progress is journaled after every commit, so an interrupted split
+    can be resumed with resume_pending_split().
+
+    Args:
+        grouped_messages: List of (DiffGroup, message) tuples.
+        tree: Staged tree the groups were generated from; defaults to the
+            current index.
+        start: Number of leading groups that are already committed.
+    """
+    if tree is None:
+        try:
+            tree = GitRepository.write_tree()
+        except RuntimeError:
+            tree = None
+        if tree:
+            _journal_quietly(start_split, tree, grouped_messages)
+
+    # A renamed file's old path is staged with it, so its commit records the
+    # deletion as well instead of leaving the rename half-applied
+    renamed: dict[str, str] = {}
+    if tree:
+        try:
+            renamed = GitRepository.get_renamed_paths(tree, find_renames_args())
+        except RuntimeError:
+            pass
 
+    def paths(files: list[str]) -> list[str]:
+        return files + [renamed[f] for f in files if f in renamed]
 
-def _commit_groups_separately(grouped_messages: list[tuple[DiffGroup, str]]) -> bool:
-    """Commit each group as a separate commit via unstage/restage cycle."""
-    all_staged = GitRepository.get_staged_files()
     committed_count = 0
+    total = len(grouped_messages)
 
-    for i, (group, message) in enumerate(grouped_messages, 1):
+    for i, (group, message) in enumerate(grouped_messages[start:], start + 1):
         try:
             # Unstage everything, then stage only this group's files
             remaining_staged = GitRepository.get_staged_files()
             if remaining_staged:
                 GitRepository.unstage_files(remaining_staged)
-            GitRepository.stage_files(group.files)
+            if tree:
+                GitRepository.stage_from_tree(tree, paths(group.files))
+            else:
+                GitRepository.stage_files(group.files)
             GitRepository.commit(message)
             committed_count += 1
-            print_success(f"  [{i}/{len(grouped_messages)}] Committed: {message.splitlines()[0]}")
+            _journal_quietly(record_split_commit, i)
+            print_success(f"  [{i}/{total}] Committed: {message.splitlines()[0]}")
         except RuntimeError as e:
-            print_error(f"\n  [{i}/{len(grouped_messages)}] Failed: {e}")
+            print_error(f"\n  [{i}/{total}] Failed: {e}")
             # Restage remaining files so user can retry
             remaining_files = []
-            for _, (g, _) in enumerate(grouped_messages[i:]):
+            for _, (g, _) in enumerate(grouped_messages[i - 1:]):
                 remaining_files.extend(g.files)
             if remaining_files:
                 try:
-                    GitRepository.stage_files(remaining_files)
+                    if tree:
+                        GitRepository.stage_from_tree(tree, paths(remaining_files))
+                    else:
+                        GitRepository.stage_files(remaining_files)
                 except RuntimeError:
                     pass
+            # Staged again, so a plain rerun regenerates or reuses the journaled messages
+            _journal_quietly(finish_split)
             print_warning(f"\n{committed_count} commit(s) succeeded. Remaining files are still staged.")
             return committed_count > 0
 
-    print_success(f"\nAll {committed_count} commit(s) successful.")
+    _journal_quietly(finish_split)
+    print_success(f"\nAll {total - start} commit(s) successful.")
     return True
@@ -7,91 +7,289 @@
 #   - Check API key
 #   - Check provider connectivity
 #   - Check model availability
+#   - Check repository performance settings (and fix them with --fix)
+#   - Probe provider latency (--latency)
+#   - Benchmark read-only plumbing against porcelain (--bench)
+#   - Run slow checks concurrently, each with its own deadline
 
+import json
 import shutil
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+import typer
 
 from gitta.constants import CONFIG_FILE
 from gitta.config.storage import load_config
+from gitta.git.health import apply_fix, check_repo_health, time_git_calls, time_read_paths
 from gitta.git.repository import GitRepository
-from gitta.utils.console import print_error, print_info, print_success
+from gitta.git.runner import enable_read_only
+from gitta.utils.console import console, print_error, print_info, print_success, print_warning
+
+# Deadlines (seconds) for the concurrent checks
+REPO_CHECK_TIMEOUT = 30.0
+REPO_FIX_TIMEOUT = 600.0
+DEFAULT_NETWORK_TIMEOUT = 10.0
+
+
+@dataclass
+class CheckResult:
+    name: str
+    status: str  # "ok", "warn", "fail", "fixed" or "info"
+    message: str
+    data: dict = field(default_factory=dict)
+
 
-def doctor_command():
+def doctor_command(
+    fix: bool = typer.Option(False, "--fix", help="Enable missing repository performance features"),
+    latency: bool = typer.Option(False, "--latency", help="Measure connect, TLS, first-token latency and throughput"),
+    samples: int = typer.Option(3, "--samples", help="Number of latency samples to take"),
+    timeout: float = typer.Option(DEFAULT_NETWORK_TIMEOUT, "--timeout", help="Deadline in seconds for each network check"),
+    bench: bool = typer.Option(False, "--bench", help="Time read-only plumbing against the porcelain it replaced (takes optional locks)"),
+    json_output: bool = typer.Option(False, "--json", help="Print results as JSON"),
+):
     """
     Diagnose common issues with your Gitta setup.
 
     Checks git, configuration, API key, provider connectivity,
-    and model availability.
+    model availability, and repository performance settings.
+    Slow checks run concurrently, each bounded by its own deadline.
 
     Usage:
         gitta doctor
+        gitta doctor --fix
+        gitta doctor --latency --json
+        gitta doctor --bench
     """
+    if not fix:
+        enable_read_only()
 
-    print_info("Running diagnostics...\n")
-    all_passed = True
+    if not json_output:
+        print_info("Running diagnostics...\n")
+
+    results: list[CheckResult] = []
 
     # 1. Check git is installed
     if shutil.which("git"):
-        print_success("[OK] Git is installed")
+        results.append(CheckResult("git", "ok", "Git is installed"))
     else:
-        print_error("[FAIL] Git is not installed. Install it from https://git-scm.com")
-        all_passed = False
+        results.append(CheckResult("git", "fail", "Git is not installed. Install it from https://git-scm.com"))
 
     # 2. Check inside a git repo
-    if GitRepository.is_git_repo():
-        print_success("[OK] Inside a Git repository")
+    in_repo = GitRepository.is_git_repo()
+    if in_repo:
+        results.append(CheckResult("repository", "ok", "Inside a Git repository"))
     else:
-        print_error("[FAIL] Not inside a Git repository. Run 'git init' or navigate to a repo.")
-        all_passed = False
+        results.append(CheckResult("repository", "fail", "Not inside a Git repository. Run 'git init' or navigate to a repo."))
+
+    # 3-5. Config file, fields and API key (local and fast)
+    config = _check_config(results)
+
+    tasks: list[tuple[str, float, Callable[[], list[CheckResult]]]] = []
+
+    # 6. Check repository performance settings
+    if in_repo:
+        repo_timeout = REPO_FIX_TIMEOUT if fix else REPO_CHECK_TIMEOUT
+        tasks.append(("repository performance", repo_timeout, lambda: _check_repo_performance(fix, bench)))
+
+    # 7. Check provider connectivity and model availability
+    base_url = config.get("base_url", "")
+    model = config.get("model", "")
+    api_key = config.get("api_key", "")
+
+    if base_url and model and api_key:
+        tasks.append(("provider", timeout, lambda: _check_provider(base_url, api_key, model, timeout)))
+
+        # 8. Probe latency
+        if latency:
+            probe_timeout = timeout * max(samples, 1) * 2
+            tasks.append(("latency", probe_timeout, lambda: _check_latency(base_url, api_key, model, samples, timeout)))
+
+    results.extend(_run_with_deadlines(tasks))
 
-    # 3. Check config file exists
+    all_passed = not any(r.status == "fail" for r in results)
+
+    if json_output:
+        console.print_json(json.dumps({"passed": all_passed, "checks": [asdict(r) for r in results]}))
+    else:
+        _print_results(results)
+        if all_passed:
+            print_success("\nAll checks passed!")
+        else:
+            print_error("\nSome checks failed. Review the issues above.")
+
+    if not all_passed:
+        raise typer.Exit(code=1)
+
+
+def _check_config(results: list[CheckResult]) -> dict:
+    """Check the config file, required fields and API key. Returns the config (or {})."""
     if not CONFIG_FILE.exists():
-        print_error("[FAIL] Config file not found. Run 'gitta init' to set up.")
-        print_error("\nSome checks failed. Review the issues above.")
-        return
+        results.append(CheckResult("config", "fail", "Config file not found. Run 'gitta init' to set up."))
+        return {}
 
-    print_success(f"[OK] Config file found at {CONFIG_FILE}")
+    results.append(CheckResult("config", "ok", f"Config file found at {CONFIG_FILE}"))
 
-    # 4. Load and validate config
     try:
         config = load_config()
     except Exception as e:
-        print_error(f"[FAIL] Could not read config: {e}")
-        print_error("\nSome checks failed. Review the issues above.")
-        return
+        results.append(CheckResult("config", "fail", f"Could not read config: {e}"))
+        return {}
 
     required_fields = ["provider", "base_url", "model", "style"]
-    for field in required_fields:
-        if config.get(field):
-            print_success(f"[OK] Config field '{field}' is set: {config[field]}")
+    for field_name in required_fields:
+        if config.get(field_name):
+            results.append(CheckResult("config", "ok", f"Config field '{field_name}' is set: {config[field_name]}"))
         else:
-            print_error(f"[FAIL] Config field '{field}' is missing or empty. Run 'gitta init' to fix.")
-            all_passed = False
-
-    # 5. Check API key in config
-    api_key = config.get("api_key", "")
+            results.append(CheckResult("config", "fail", f"Config field '{field_name}' is missing or empty. Run 'gitta init' to fix."))
 
-    if api_key:
-        print_success("[OK] API key found in config")
+    if config.get("api_key", ""):
+        results.append(CheckResult("api_key", "ok", "API key found in config"))
     else:
-        print_error("[FAIL] No API key found in config. Run 'gitta init'.")
-        all_passed = False
+        results.append(CheckResult("api_key", "fail", "No API key found in config. Run 'gitta init'."))
 
-    # 6. Check provider connectivity and model availability
-    base_url = config.get("base_url", "")
-    model = config.get("model", "")
+    return config
 
-    if base_url and model and api_key:
+
+def _run_with_deadlines(tasks: list[tuple[str, float, Callable[[], list[CheckResult]]]]) -> list[CheckResult]:
+    """
+    Run independent checks concurrently and collect their results in order.
+
+    Each task gets its own deadline measured from the common start time.
+    Tasks that miss it (or crash) are reported as warnings: they are
+    advisory, and only the hard checks (git, repository, config, api_key)
+    or a check's own "fail" result fail the run. Their daemon threads are
+    abandoned so a hung endpoint can never hold up the doctor run.
+    """
+    start = time.monotonic()
+    running = []
+
+    for name, deadline, fn in tasks:
+        box: dict = {}
+
+        def target(fn=fn, box=box):
+            try:
+                box["results"] = fn()
+            except Exception as e:
+                box["error"] = e
+
+        thread = threading.Thread(target=target, name=f"doctor-{name}", daemon=True)
+        thread.start()
+        running.append((name, deadline, thread, box))
+
+    results = []
+    for name, deadline, thread, box in running:
+        thread.join(max(0.0, start + deadline - time.monotonic()))
+        if thread.is_alive():
+            results.append(CheckResult(name, "warn", f"Check '{name}' did not finish within {deadline:.0f}s."))
+        elif "error" in box:
+            results.append(CheckResult(name, "warn", f"Check '{name}' failed: {box['error']}"))
+        else:
+            results.extend(box["results"])
+    return results
+
+
+def _check_repo_performance(fix: bool, bench: bool = False) -> list[CheckResult]:
+    """
+    Report repository settings that slow down gitta's git calls.
+
+    These are advisories and never fail the doctor run. With fix=True the
+    missing features are enabled and the same git calls are timed again
+    so the speed-up is visible. With bench=True the read-only query paths
+    are also timed against porcelain, which takes optional locks, so a
+    plain run only ever runs lock-free plumbing.
+    """
+    checks = check_repo_health()
+    failing = [c for c in checks if not c.ok]
+    results = [CheckResult(c.name, "ok" if c.ok else "warn", f"{c.name}: {c.detail}") for c in checks]
+
+    try:
+        base = GitRepository.get_default_branch()
+    except RuntimeError:
+        base = None
+
+    before = time_git_calls(base)
+    if bench:
+        results.append(_read_only_savings())
+
+    if not failing or not fix:
+        summary = ", ".join(f"git {label}: {ms:.1f} ms" for label, ms in before.items())
+        results.append(CheckResult("git timings", "info", summary, {"timings_ms": before}))
+        if failing:
+            results.append(CheckResult("repository performance", "info", "Run 'gitta doctor --fix' to enable the missing features."))
+        return results
+
+    for check in failing:
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key, base_url=base_url)
-            client.models.retrieve(model)
-            print_success(f"[OK] Model '{model}' is available from provider")
-        except Exception as e:
-            print_error(f"[FAIL] Could not reach provider or model: {e}. Check your base_url and model in 'gitta init'.")
-            all_passed = False
-
-    # Summary
-    if all_passed:
-        print_success("\nAll checks passed!")
-    else:
-        print_error("\nSome checks failed. Review the issues above.")
+            apply_fix(check)
+            results.append(CheckResult(check.name, "fixed", check.name))
+        except RuntimeError as e:
+            results.append(CheckResult(check.name, "fail", f"Could not fix {check.name}: {e}"))
+
+    after = time_git_calls(base)
+    summary = ", ".join(f"git {label}: {before[label]:.1f} ms -> {ms:.1f} ms" for label, ms in after.items())
+    results.append(CheckResult("git timings", "info", summary, {"before_ms": before, "after_ms": after}))
+    return results
+
+
+def _read_only_savings() -> CheckResult:
+    """Report how much faster the read-only query paths are than porcelain."""
+    timings = time_read_paths()
+    saved = sum(max(t["porcelain_ms"] - t["read_only_ms"], 0.0) for t in timings.values())
+    summary = ", ".join(
+        f"{label}: {t['read_only_ms']:.1f} ms (porcelain {t['porcelain_ms']:.1f} ms)" for label, t in timings.items()
+    )
+    return CheckResult(
+        "read-only git",
+        "info",
+        f"{summary}; saves {saved:.1f} ms per query run",
+        {"timings_ms": timings, "saved_ms": saved},
+    )
+
+
+def _check_provider(base_url: str, api_key: str, model: str, timeout: float) -> list[CheckResult]:
+    """Check provider connectivity and model availability with a bounded request."""
+    try:
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+        client.models.retrieve(model)
+        return [CheckResult("provider", "ok", f"Model '{model}' is available from provider")]
+    except Exception as e:
+        return [CheckResult("provider", "fail", f"Could not reach provider or model: {e}. Check your base_url and model in 'gitta init'.")]
+
+
+def _check_latency(base_url: str, api_key: str, model: str, samples: int, timeout: float) -> list[CheckResult]:
+    """Measure endpoint latency over a few samples."""
+    from gitta.ai.probe import probe_latency
+
+    try:
+        metrics = probe_latency(base_url, api_key, model, samples=samples, timeout=timeout)
+    except Exception as e:
+        return [CheckResult("latency", "fail", f"Latency probe failed: {e}")]
+
+    def fmt(value, unit):
+        return f"{value:.1f} {unit}" if value is not None else "n/a"
+
+    message = (
+        f"connect {fmt(metrics['connect_ms'], 'ms')}, TLS {fmt(metrics['tls_ms'], 'ms')}, "
+        f"first token {fmt(metrics['ttft_ms'], 'ms')}, {fmt(metrics['tokens_per_sec'], 'tokens/s')} "
+        f"(median of {samples})"
+    )
+    return [CheckResult("latency", "ok", message, metrics)]
+
+
+def _print_results(results: list[CheckResult]) -> None:
+    """Print check results in the classic [OK]/[FAIL] format."""
+    for result in results:
+        if result.status == "ok":
+            print_success(f"[OK] {result.message}")
+        elif result.status == "fixed":
+            print_success(f"[FIXED] {result.message}")
+        elif result.status == "warn":
+            print_warning(f"[WARN] {result.message}")
+        elif result.status == "fail":
+            print_error(f"[FAIL] {result.message}")
+        else:
+            print_info(f"       {result.message}")
@@ -5,15 +5,20 @@
 #   - Accept a commit hash or file path
 #   - Retrieve the relevant diff
 #   - Generate a plain English explanation via AI
-
-import subprocess
+#   - Reuse the explanation of a file change seen before (by blob IDs)
 
 import typer
 
-from gitta.ai.client import AIClient
-from gitta.config.settings import Settings
+from gitta.ai.tokens import get_prompt_budget
+from gitta.config.settings import get_settings
 from gitta.constants import DEFAULT_MAX_DIFF_CHARS
+from gitta.core.artifacts import save_artifact
+from gitta.core.explainer import explain_diff
+from gitta.core.file_cache import load_file_result, save_file_result
+from gitta.git.diff import find_renames_args
+from gitta.git.diff_parser import compact_renames, parse_diff_by_file
 from gitta.git.repository import GitRepository
+from gitta.git.runner import enable_read_only, run_git, submit_git
 from gitta.utils.console import print_error, print_info, print_warning
 from gitta.utils.loading import show_loading
 
@@ -31,93 +36,90 @@ def explain_command(
         gitta explain abc1234
         gitta explain src/main.py
     """
+    enable_read_only()
+
     if not GitRepository.is_git_repo():
         print_error("Error: Not inside a Git repository.")
         raise typer.Exit(code=1)
 
     try:
-        Settings().validate_api_key()
+        settings = get_settings()
+        settings.validate_api_key()
     except RuntimeError as e:
         print_error(f"Error: {e}")
         raise typer.Exit(code=1)
 
-    diff, context = _get_diff(target)
+    diff, context, commit_sha = _get_diff(target)
 
     if not diff:
         print_info("No changes found to explain.")
         raise typer.Exit(code=0)
 
-    # Truncate if too large
-    settings = Settings()
-    max_chars = settings.max_diff_chars
+    # A single file change is cached by content, shared with commit generation
+    file_diffs = parse_diff_by_file(diff)
+    blob_key = file_diffs[0].blob_key if len(file_diffs) == 1 else None
+    explanation = load_file_result(blob_key, "explanation") if blob_key else None
     was_truncated = False
-    if len(diff) > max_chars:
-        diff = diff[:max_chars]
-        was_truncated = True
 
-    try:
-        with show_loading("Generating explanation..."):
-            client = AIClient()
-            explanation = client.generate_explanation(diff=diff, context=context)
-    except Exception as e:
-        print_error(f"Error: {e}")
-        raise typer.Exit(code=1)
+    # Diffs over the prompt budget are explained in parts, concurrently
+    if explanation is None:
+        try:
+            with show_loading("Generating explanation..."):
+                explanation, was_truncated = explain_diff(diff, context, get_prompt_budget(settings))
+        except Exception as e:
+            print_error(f"Error: {e}")
+            raise typer.Exit(code=1)
+
+        if blob_key and not was_truncated:
+            save_file_result(blob_key, "explanation", explanation)
 
     if was_truncated:
         print_warning("Warning: Diff was too large and was truncated.")
 
     print_info(f"\n{explanation}")
 
+    # Reused by `gitta merge --squash` when this commit is a branch head
+    if commit_sha:
+        save_artifact(commit_sha, "explanation", explanation)
 
-def _get_diff(target: str) -> tuple[str, str]:
+
+def _get_diff(target: str) -> tuple[str, str, str | None]:
     """
     Resolve the target to a diff and context string.
 
     Tries commit hash first, then falls back to file path.
-    Returns (diff, context).
+    Returns (diff, context, commit SHA or None for a file).
     """
     # Try as a commit hash
-    result = subprocess.run(
-        ["git", "rev-parse", "--verify", f"{target}^{{commit}}"],
-        capture_output=True,
-        text=True,
-    )
+    result = run_git(["rev-parse", "--verify", f"{target}^{{commit}}"])
     if result.returncode == 0:
-        # It's a valid commit
-        msg_result = subprocess.run(
-            ["git", "log", "-1", "--format=%s", target],
-            capture_output=True,
-            text=True,
-        )
+        # It's a valid commit: read the subject and the diff concurrently
+        msg_future = submit_git(["log", "-1", "--format=%s", target])
+        diff_future = submit_git(["diff-tree", "-p", "--full-index", "--cc", "--root", "--no-commit-id"] + find_renames_args() + [target])
+
+        msg_result = msg_future.result()
         commit_message = msg_result.stdout.strip() if msg_result.returncode == 0 else ""
 
-        diff_result = subprocess.run(
-            ["git", "show", "--format=", target],
-            capture_output=True,
-            text=True,
-        )
+        diff_result = diff_future.result()
         if diff_result.returncode != 0:
             raise RuntimeError(f"Failed to get diff for commit {target}")
 
         context = f"Commit: {target}\nMessage: {commit_message}" if commit_message else f"Commit: {target}"
-        return diff_result.stdout.strip(), context
-
-    # Try as a file path (uncommitted changes: staged + unstaged)
-    diff_result = subprocess.run(
-        ["git", "diff", "HEAD", "--", target],
-        capture_output=True,
-        text=True,
-    )
+        # Pure renames and copies take one line each instead of a full header
+        diff = "".join(compact_renames(diff_result.stdout.splitlines(keepends=True)))
+        return diff.strip(), context, result.stdout.strip()
+
+    # Try as a file path (uncommitted changes: staged + unstaged), with the
+    # staged-only diff for new files fetched alongside
+    worktree_future = submit_git(["diff-index", "-p", "--full-index", "-M", "HEAD", "--", target])
+    staged_future = submit_git(["diff-index", "--cached", "-p", "--full-index", "-M", "HEAD", "--", target])
+
+    diff_result = worktree_future.result()
     if diff_result.returncode == 0 and diff_result.stdout.strip():
-        return diff_result.stdout.strip(), f"File: {target}"
-
-    # Try staged-only diff for new files
-    diff_result = subprocess.run(
-        ["git", "diff", "--cached", "--", target],
-        capture_output=True,
-        text=True,
-    )
+        return diff_result.stdout.strip(), f"File: {target}", None
+
+    diff_result = staged_future.result()
     if diff_result.returncode == 0 and diff_result.stdout.strip():
-        return diff_result.stdout.strip(), f"File: {target} (staged)"
+        return diff_result.stdout.strip(), f"File: {target} (staged)", None
 
-    return "", ""
+    return "", "", None
@@ -0,0 +1,86 @@
+# cli/hook.py
+# Purpose: Handles `gitta hook`.
+#
+# Responsibilities:
+#   - Install / uninstall the prepare-commit-msg hook
+#   - Run the warm background worker the hook talks to
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import typer
+
+from gitta.constants import WORKER_SOCKET
+from gitta.git.repository import GitRepository
+from gitta.utils.console import print_error, print_info, print_success
+
+hook_app = typer.Typer(help="Generate messages for plain 'git commit' via a git hook.")
+
+HOOK_NAME = "prepare-commit-msg"
+HOOK_MARKER = "# Installed by gitta"
+
+HOOK_TEMPLATE = """#!/bin/sh
+{marker}
+exec "{python}" -m gitta.worker.client "$@"
+"""
+
+
+def _hook_path() -> Path:
+    return Path(GitRepository.get_hooks_dir()) / HOOK_NAME
+
+
+@hook_app.command(name="install")
+def hook_install(
+    force: bool = typer.Option(False, "--force", "-f", help="Overwrite an existing prepare-commit-msg hook"),
+):
+    """Install the prepare-commit-msg hook in the current repository."""
+    if not GitRepository.is_git_repo():
+        print_error("Error: Not inside a Git repository.")
+        raise typer.Exit(code=1)
+
+    path = _hook_path()
+    if path.exists() and HOOK_MARKER not in path.read_text() and not force:
+        print_error(f"Error: {path} already exists. Use --force to overwrite it.")
+        raise typer.Exit(code=1)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HOOK_TEMPLATE.format(marker=HOOK_MARKER, python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    print_success(f"Installed {HOOK_NAME} hook at {path}.")
+    print_info("Plain 'git commit' will now start with an AI-generated message.")
+
+
+@hook_app.command(name="uninstall")
+def hook_uninstall():
+    """Remove the gitta prepare-commit-msg hook from the current repository."""
+    if not GitRepository.is_git_repo():
+        print_error("Error: Not inside a Git repository.")
+        raise typer.Exit(code=1)
+
+    path = _hook_path()
+    if not path.exists() or HOOK_MARKER not in path.read_text():
+        print_error("No gitta hook installed in this repository.")
+        raise typer.Exit(code=1)
+
+    os.remove(path)
+    print_success(f"Removed {HOOK_NAME} hook.")
+
+
+@hook_app.command(name="serve")
+def hook_serve():
+    """
+    Run the warm commit-message worker in the foreground.
+
+    The hook starts this automatically in the background when needed.
+    """
+    from gitta.worker.server import serve
+
+    try:
+        print_info(f"gitta worker listening on {WORKER_SOCKET}")
+        serve()
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
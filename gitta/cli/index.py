@@ -0,0 +1,46 @@
+# cli/index.py
+# Purpose: Handles `gitta index`.
+#
+# Responsibilities:
+#   - Rebuild the local history indexes (conventions and similar diffs)
+#     to a chosen depth
+
+import typer
+
+from gitta.core.context_index import update_index
+from gitta.core.similarity_index import update_similarity_index
+from gitta.git.repository import GitRepository
+from gitta.utils.console import print_error, print_success
+from gitta.utils.loading import show_loading
+
+
+def index_command(
+    depth: int = typer.Option(10000, "--depth", help="Number of recent commits to index."),
+):
+    """
+    Rebuild gitta's local history indexes.
+
+    The indexes are updated incrementally on every commit; use this to
+    index deeper history than the default first build.
+
+    Usage:
+        gitta index
+        gitta index --depth 100000
+    """
+    if not GitRepository.is_git_repo():
+        print_error("Error: Not inside a Git repository.")
+        raise typer.Exit(code=1)
+
+    if depth <= 0:
+        print_error("Error: --depth must be a positive integer.")
+        raise typer.Exit(code=1)
+
+    try:
+        with show_loading(f"Indexing the last {depth} commits..."):
+            index = update_index(max_commits=depth)
+            added = update_similarity_index(max_commits=depth)
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    print_success(f"Indexed {index['commits']} commit message(s) and {added} diff signature(s).")
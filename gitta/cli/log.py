@@ -3,49 +3,83 @@
 #
 # Responsibilities:
 #   - Show recent git commits with formatted output
+#   - Stream large histories in batches so output starts immediately
 
-import subprocess
 import typer
 
 from gitta.git.repository import GitRepository
+from gitta.git.runner import enable_read_only
 from gitta.utils.console import console, print_error
 
+from rich import box
+from rich.markup import escape
 from rich.table import Table
 
+# Rows rendered per table after the first screen
+BATCH_SIZE = 200
+
 
 def log_command(
     count: int = typer.Option(10, "--count", "-n", help="Number of commits to show."),
+    since: str = typer.Option(None, "--since", help="Only show commits more recent than a date (e.g. '2 weeks ago')."),
+    author: str = typer.Option(None, "--author", help="Only show commits by a matching author."),
+    paths: list[str] = typer.Argument(None, help="Only show commits touching these paths."),
 ):
     """Show recent commits in a formatted table."""
+    enable_read_only()
 
     if not GitRepository.is_git_repo():
         print_error("Error: Not inside a Git repository.")
         raise typer.Exit(code=1)
 
-    result = subprocess.run(
-        ["git", "log", f"-{count}", "--pretty=format:%h|%s|%an|%ar"],
-        capture_output=True,
-        text=True,
-    )
+    # First batch fills roughly one screen so it appears without delay
+    batch_size = max(console.height - 5, 10)
+    batch: list[tuple[str, str, str, str]] = []
+    shown = 0
 
-    if result.returncode != 0:
-        print_error(f"Error: {result.stderr.strip()}")
+    try:
+        for record in GitRepository.iter_log(count, since=since, author=author, paths=paths):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                console.print(_build_table(batch, first=shown == 0))
+                shown += len(batch)
+                batch = []
+                batch_size = BATCH_SIZE
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
         raise typer.Exit(code=1)
 
-    lines = result.stdout.strip().split("\n")
-    if not lines or lines == [""]:
+    if batch:
+        console.print(_build_table(batch, first=shown == 0))
+        shown += len(batch)
+
+    if not shown:
         print_error("No commits found.")
         raise typer.Exit(code=0)
 
-    table = Table(title="Recent Commits", show_lines=False)
-    table.add_column("Hash", style="yellow", width=8)
-    table.add_column("Message", style="white")
-    table.add_column("Author", style="cyan")
-    table.add_column("When", style="green")
 
-    for line in lines:
-        parts = line.split("|", 3)
-        if len(parts) == 4:
-            table.add_row(parts[0], parts[1], parts[2], parts[3])
+def _build_table(rows: list[tuple[str, str, str, str]], first: bool) -> Table:
+    """
+    Build one batch of the commit table.
+
+    Column widths are fixed so consecutive batches line up as one table;
+    only the first batch carries the title and header.
+    """
+    table = Table(
+        title="Recent Commits" if first else None,
+        show_header=first,
+        show_lines=False,
+        box=box.SIMPLE_HEAD,
+        pad_edge=False,
+        expand=True,
+    )
+    table.add_column("Hash", style="yellow", width=9, no_wrap=True)
+    table.add_column("Message", style="white", ratio=1, no_wrap=True, overflow="ellipsis")
+    table.add_column("Author", style="cyan", width=20, no_wrap=True, overflow="ellipsis")
+    table.add_column("When", style="green", width=16, no_wrap=True)
+
+    for row in rows:
+        # Subjects like "[WIP] ..." must not be parsed as markup
+        table.add_row(*(escape(value) for value in row))
 
-    console.print(table)
+    return table
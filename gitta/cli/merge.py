@@ -3,14 +3,20 @@
 #
 # Responsibilities:
 #   - Show PR status for the current branch
+#   - Refuse to merge a PR whose head is not the local branch head
 #   - Merge the PR via gh CLI
+#   - Use a pre-generated squash commit message (cached by head SHA)
 
 import subprocess
 
 import typer
 
+from gitta.config.settings import get_settings
+from gitta.core.squash import prepare_squash_message
 from gitta.git.repository import GitRepository
-from gitta.utils.console import print_error, print_info, print_success
+from gitta.utils.console import print_error, print_info, print_success, print_warning
+from gitta.utils.editor import open_editor_with_message
+from gitta.utils.loading import show_loading
 
 
 def merge_command(
@@ -22,6 +28,9 @@ def merge_command(
     Merge the pull request for the current branch.
 
     Finds the open PR for your current branch and merges it via the GitHub CLI.
+    With --squash, the squash commit message is generated from the branch
+    (reusing any PR description or explanation gitta produced for its
+    head commit) and cached until the head moves.
 
     Usage:
         gitta merge
@@ -44,7 +53,7 @@ def merge_command(
 
     # Show PR info
     result = subprocess.run(
-        ["gh", "pr", "view", "--json", "title,number,state,url"],
+        ["gh", "pr", "view", "--json", "title,number,state,url,headRefOid,baseRefName"],
         capture_output=True,
         text=True,
     )
@@ -62,8 +71,21 @@ def merge_command(
     print_info(f"PR #{pr['number']}: {pr['title']}")
     print_info(f"  {pr['url']}")
 
-    # Build merge command
-    gh_args = ["gh", "pr", "merge"]
+    # What gets merged (and what a squash message describes) must be what is checked out here
+    try:
+        head_sha = GitRepository.get_head_sha()
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+    if pr["headRefOid"] != head_sha:
+        print_error(
+            f"PR #{pr['number']} is at {pr['headRefOid'][:7]} but '{branch}' is at {head_sha[:7]}. "
+            "Push or pull so they match, then merge."
+        )
+        raise typer.Exit(code=1)
+
+    # Build merge command; GitHub refuses it if the head moves before it runs
+    gh_args = ["gh", "pr", "merge", "--match-head-commit", head_sha]
 
     if squash:
         gh_args.append("--squash")
@@ -75,15 +97,34 @@ def merge_command(
     if delete_branch:
         gh_args.append("--delete-branch")
 
-    # Confirm
-    choice = typer.prompt(
-        "\nMerge this PR? [y/n]",
-        default="y",
-    ).strip().lower()
+    squash_message = _squash_message(pr) if squash else None
+    options = "y/n/e" if squash_message else "y/n"
 
-    if choice != "y":
-        print_error("\nMerge cancelled.")
-        return
+    # Confirm
+    while True:
+        choice = typer.prompt(
+            f"\nMerge this PR? [{options}]",
+            default="y",
+        ).strip().lower()
+
+        if choice == "e" and squash_message:
+            edited = open_editor_with_message("\n\n".join(part for part in squash_message if part))
+            lines = edited.split("\n", 1)
+            if not lines[0].strip():
+                print_error("\nSquash commit subject cannot be empty.")
+                continue
+            squash_message = (lines[0].strip(), lines[1].strip() if len(lines) > 1 else "")
+            _display_squash_message(*squash_message)
+            continue
+
+        if choice != "y":
+            print_error("\nMerge cancelled.")
+            return
+        break
+
+    if squash_message:
+        subject, body = squash_message
+        gh_args += ["--subject", subject, "--body", body]
 
     result = subprocess.run(gh_args, capture_output=True, text=True)
     if result.returncode != 0:
@@ -93,6 +134,32 @@ def merge_command(
     print_success(f"\nPR #{pr['number']} merged successfully.")
 
 
+def _squash_message(pr: dict) -> tuple[str, str] | None:
+    """
+    Get the squash commit message for the PR's head, or None to let GitHub build it.
+
+    Cached messages are returned instantly; otherwise one is generated now.
+    """
+    try:
+        get_settings().validate_api_key()
+        with show_loading("Preparing squash-merge message..."):
+            subject, body = prepare_squash_message(pr["baseRefName"], pr["headRefOid"])
+    except Exception as e:
+        print_warning(f"Could not generate a squash message ({e}); GitHub's default will be used.")
+        return None
+
+    _display_squash_message(subject, body)
+    return subject, body
+
+
+def _display_squash_message(subject: str, body: str) -> None:
+    """Display the squash commit message."""
+    print_success("\nSquash commit message:\n")
+    print_info(subject)
+    if body:
+        print_info(f"\n{body}")
+
+
 def _gh_available() -> bool:
     """Check if the gh CLI is installed."""
     result = subprocess.run(
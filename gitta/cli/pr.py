@@ -2,18 +2,22 @@
 # Purpose: Handles `gitta pr`.
 #
 # Responsibilities:
-#   - Gather commits and diff vs base branch
-#   - Generate PR title + description via AI
+#   - Reuse a description prepared in the background for the head commit
+#   - Otherwise generate PR title + description via AI
 #   - Optionally create PR via gh CLI
 
 import subprocess
+import threading
 
 import typer
 
-from gitta.ai.client import AIClient
 from gitta.git.repository import GitRepository
-from gitta.config.settings import Settings
-from gitta.constants import DEFAULT_MAX_DIFF_CHARS
+from gitta.git.runner import enable_read_only
+from gitta.config.settings import get_settings
+from gitta.core.pr_service import load_pr_description, prepare_pr_description, save_pr_description
+from gitta.core.squash import prepare_squash_message
+from gitta.constants import PR_PREFETCH_WAIT
+from gitta.worker.pr_prefetch import is_pr_prefetch_running, wait_for_pr_prefetch
 from gitta.utils.console import print_error, print_info, print_success, print_warning
 from gitta.utils.editor import open_editor_with_message
 from gitta.utils.loading import show_loading
@@ -26,6 +30,7 @@ def pr_command(
     create: bool = typer.Option(False, "--create", "-c", help="Create the PR on GitHub using gh CLI"),
     draft: bool = typer.Option(False, "--draft", "-d", help="Create as draft PR (requires --create)"),
     dry_run: bool = typer.Option(False, "--dry-run", help="Generate PR description without creating"),
+    fresh: bool = typer.Option(False, "--fresh", help="Ignore a description prepared earlier for this commit"),
 ):
     """
     Generate a PR title and description from branch commits.
@@ -38,7 +43,12 @@ def pr_command(
         gitta pr --base main
         gitta pr --create
         gitta pr --create --draft
+        gitta pr --fresh
     """
+    # Only --create pushes; everything else just reads the repository
+    if dry_run or not create:
+        enable_read_only()
+
     if not GitRepository.is_git_repo():
         print_error("Error: Not inside a Git repository.")
         raise typer.Exit(code=1)
@@ -66,58 +76,31 @@ def pr_command(
         raise typer.Exit(code=1)
 
     try:
-        Settings().validate_api_key()
+        get_settings().validate_api_key()
+        head_sha = GitRepository.get_head_sha()
     except RuntimeError as e:
         print_error(f"Error: {e}")
         raise typer.Exit(code=1)
 
-    # Gather commits, stat, and diff
-    try:
-        commits = GitRepository.get_commits_between(base)
-    except RuntimeError as e:
-        print_error(f"Error getting commits: {e}")
-        raise typer.Exit(code=1)
-
-    if not commits:
-        print_info(f"No commits found between '{base}' and '{branch}'.")
-        raise typer.Exit(code=0)
-
-    try:
-        stat = GitRepository.get_diff_stat(base)
-    except RuntimeError as e:
-        print_error(f"Error getting diff stat: {e}")
-        raise typer.Exit(code=1)
-
-    try:
-        diff = GitRepository.get_diff_between(base)
-    except RuntimeError as e:
-        print_error(f"Error getting diff: {e}")
-        raise typer.Exit(code=1)
-
-    # Truncate diff if too large (stat + commits still provide full coverage)
-    settings = Settings()
-    max_chars = settings.max_diff_chars
-    was_truncated = False
-    if len(diff) > max_chars:
-        diff = diff[:max_chars]
-        was_truncated = True
+    # `gitta ship --pr` (or an earlier `gitta pr`) may have prepared it already
+    prepared = None if fresh else _load_prepared(base, branch, head_sha)
+    if prepared:
+        print_info("Using the PR description prepared earlier for this commit (--fresh to regenerate).")
+    else:
+        try:
+            with show_loading("Generating PR description..."):
+                prepared = prepare_pr_description(base, branch, head_sha)
+        except Exception as e:
+            print_error(f"Error: {e}")
+            raise typer.Exit(code=1)
 
-    # Generate PR description
-    try:
-        with show_loading("Generating PR description..."):
-            client = AIClient()
-            title, body = client.generate_pr_description(
-                branch=branch,
-                commits=commits,
-                stat=stat,
-                diff=diff,
-            )
-    except Exception as e:
-        print_error(f"Error: {e}")
-        raise typer.Exit(code=1)
+        if prepared is None:
+            print_info(f"No commits found between '{base}' and '{branch}'.")
+            raise typer.Exit(code=0)
 
-    if was_truncated:
-        print_warning("Warning: Diff was too large and was truncated. File stats and commits were used for full coverage.")
+    title, body = prepared["title"], prepared["body"]
+    if prepared["truncated"]:
+        print_warning("Warning: The branch was too large for one request. Commits and file stats were summarized and the diff was truncated.")
 
     # Display the result
     _display_pr(title, body)
@@ -166,6 +149,12 @@ def pr_command(
         else:
             print_error("\nInvalid option. Enter y, n, or e.\n")
 
+    save_pr_description(base, branch, head_sha, title, body, prepared["truncated"])
+
+    # Prepare the squash-merge message while pushing and creating the PR
+    squash_thread = threading.Thread(target=_precompute_squash, args=(base,), daemon=True)
+    squash_thread.start()
+
     # Push branch if needed
     try:
         GitRepository.push_with_upstream(branch)
@@ -187,6 +176,25 @@ def pr_command(
     pr_url = result.stdout.strip()
     print_success(f"\nPR created: {pr_url}")
 
+    with show_loading("Preparing squash-merge message..."):
+        squash_thread.join()
+
+
+def _load_prepared(base: str, branch: str, head_sha: str) -> dict | None:
+    """The description prepared for head_sha, waiting for a preparation still running."""
+    if is_pr_prefetch_running(branch):
+        with show_loading("Waiting for the PR description being prepared..."):
+            wait_for_pr_prefetch(branch, PR_PREFETCH_WAIT)
+    return load_pr_description(base, branch, head_sha)
+
+
+def _precompute_squash(base: str) -> None:
+    """Generate and cache the squash message for HEAD; failures only mean merge generates it later."""
+    try:
+        prepare_squash_message(base, GitRepository.get_head_sha())
+    except Exception:
+        pass
+
 
 def _display_pr(title: str, body: str) -> None:
     """Display a PR title and body."""
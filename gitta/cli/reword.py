@@ -0,0 +1,160 @@
+# cli/reword.py
+# Purpose: Handles `gitta reword`.
+#
+# Responsibilities:
+#   - Read a range of commits and their diffs
+#   - Generate new messages concurrently
+#   - Let the user review and edit them in one batch
+#   - Rewrite the range with commit-tree chaining
+
+import typer
+from rich.markup import escape
+
+from gitta.ai.tokens import get_prompt_budget
+from gitta.config.settings import get_settings
+from gitta.core.generator import generate_messages_for_diffs
+from gitta.git.repository import GitRepository
+from gitta.git.rewrite import RangeCommit, move_head, read_range, rewrite_messages
+from gitta.utils.console import print_error, print_info, print_success, print_warning
+from gitta.utils.editor import open_editor_with_message
+from gitta.utils.loading import show_loading
+
+# Marks the start of each commit's section in the batch editor
+EDIT_MARKER = "#### "
+
+EDIT_HEADER = """# Edit the new commit messages below, one section per commit (oldest first).
+# Lines starting with '#' are ignored. Leave a section empty to keep the
+# commit's original message.
+"""
+
+
+def reword_command(
+    revision_range: str = typer.Argument(..., help="Commits to reword, e.g. main..HEAD or HEAD~5.."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show the new messages without rewriting"),
+):
+    """
+    Generate better messages for a range of commits and rewrite them.
+
+    Messages are generated concurrently from each commit's diff, reviewed
+    in one batch, and applied in a single pass without an interactive
+    rebase. Trees and authors are kept; only the messages change.
+
+    Usage:
+        gitta reword main..HEAD
+        gitta reword HEAD~5.. --dry-run
+    """
+    if not GitRepository.is_git_repo():
+        print_error("Error: Not inside a Git repository.")
+        raise typer.Exit(code=1)
+
+    try:
+        settings = get_settings()
+        settings.validate_api_key()
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    try:
+        commits = read_range(revision_range)
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    # Empty commits have nothing to describe and keep their message
+    targets = [c for c in commits if c.patch]
+    budget = get_prompt_budget(settings)
+    diffs = [budget.cut(c.patch) for c in targets]
+
+    try:
+        with show_loading(f"Generating {len(targets)} commit message(s)..."):
+            generated = generate_messages_for_diffs(diffs)
+    except Exception as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    messages = {c.sha: m for c, m in zip(targets, generated) if m}
+
+    if any(len(diff) < len(c.patch) for c, diff in zip(targets, diffs)):
+        print_warning("Warning: Some diffs were too large and were truncated.")
+
+    _show_batch(commits, messages)
+
+    if dry_run:
+        return
+
+    while True:
+        choice = typer.prompt(
+            "\nRewrite these commits? [y/n/e]",
+            default="y"
+        ).strip().lower()
+
+        if choice == "y":
+            break
+
+        elif choice == "n":
+            print_error("\nReword cancelled.")
+            return
+
+        elif choice == "e":
+            messages = _edit_batch(commits, messages)
+            _show_batch(commits, messages)
+
+        else:
+            print_error("\nInvalid option. Enter y, n, or e.\n")
+
+    old_tip = commits[-1].sha
+    try:
+        new_tip = rewrite_messages(commits, messages)
+        if new_tip != old_tip:
+            move_head(new_tip, old_tip)
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    changed = sum(1 for c in commits if messages.get(c.sha, c.message) != c.message)
+    print_success(f"\nReworded {changed} commit(s).")
+    print_info(f"Undo with: git reset --soft {old_tip[:12]}")
+
+
+def _show_batch(commits: list[RangeCommit], messages: dict[str, str]) -> None:
+    """Show each commit's original subject and its new message."""
+    print_success(f"\nProposed messages for {len(commits)} commit(s):\n")
+    for i, commit in enumerate(commits, 1):
+        old_subject = commit.message.splitlines()[0] if commit.message else ""
+        new = messages.get(commit.sha, commit.message)
+        print_info(f"[{i}] {commit.sha[:7]} {escape(old_subject)}")
+        if new == commit.message:
+            print_info("    (unchanged)\n")
+        else:
+            print_info(f"    {escape(new)}\n")
+
+
+def _edit_batch(commits: list[RangeCommit], messages: dict[str, str]) -> dict[str, str]:
+    """Open every proposed message in one editor session and parse the result."""
+    sections = [EDIT_HEADER]
+    for commit in commits:
+        old_subject = commit.message.splitlines()[0] if commit.message else ""
+        sections.append(f"{EDIT_MARKER}{commit.sha[:12]} {old_subject}\n{messages.get(commit.sha, commit.message)}\n")
+
+    edited = open_editor_with_message("\n".join(sections))
+
+    by_prefix = {c.sha[:12]: c for c in commits}
+    result: dict[str, str] = {}
+    current: RangeCommit | None = None
+    lines: list[str] = []
+
+    def flush() -> None:
+        message = "\n".join(lines).strip()
+        if current and message:
+            result[current.sha] = message
+
+    for line in edited.splitlines():
+        if line.startswith(EDIT_MARKER):
+            flush()
+            current = by_prefix.get(line[len(EDIT_MARKER):].split(" ", 1)[0])
+            lines = []
+        elif not line.startswith("#"):
+            lines.append(line)
+    flush()
+
+    return result
@@ -6,18 +6,21 @@
 #   - Generate commit message
 #   - Confirm and commit
 #   - Push to current branch
+#   - Optionally prepare the PR description in the background
 
 import typer
 
 from gitta.git.repository import GitRepository
 from gitta.core.commit_service import CommitService
-from gitta.config.settings import Settings
-from gitta.cli.confirm import confirm_and_commit, confirm_and_commit_groups
+from gitta.config.settings import get_settings
+from gitta.cli.confirm import confirm_and_commit, confirm_and_commit_groups, resume_pending_split
 from gitta.utils.console import print_error, print_info, print_success, print_warning
 from gitta.utils.loading import show_loading
+from gitta.worker.pr_prefetch import start_pr_prefetch
 
 def ship_command(
     split: bool = typer.Option(None, "--split/--no-split", help="Split changes into multiple scoped commits"),
+    pr: bool = typer.Option(False, "--pr", help="Prepare the PR description in the background after pushing"),
 ):
     """
     Stage all changes, generate a commit message, and push.
@@ -28,6 +31,7 @@ def ship_command(
     Usage:
         gitta ship
         gitta ship --split
+        gitta ship --pr
     """
 
     if not GitRepository.is_git_repo():
@@ -39,6 +43,24 @@ def ship_command(
         print_error("Error: Cannot ship from a detached HEAD. Check out a branch first.")
         raise typer.Exit(code=1)
 
+    try:
+        settings = get_settings()
+        settings.validate_api_key()
+    except RuntimeError as e:
+        print_error(f"Error: {e}")
+        raise typer.Exit(code=1)
+
+    use_split = split if split is not None else settings.multi_file
+
+    # An interrupted split is finished (or discarded) before anything new is
+    # staged; the commits it completes are shipped like any others
+    if use_split:
+        resumed = resume_pending_split()
+        if resumed is not None:
+            if resumed:
+                _push_resumed(branch, pr)
+            return
+
     try:
         GitRepository.stage_files(["."])
     except RuntimeError as e:
@@ -53,14 +75,6 @@ def ship_command(
 
     print_success(f"Staged {len(staged)} file(s): {', '.join(staged)}")
 
-    try:
-        settings = Settings()
-        settings.validate_api_key()
-    except RuntimeError as e:
-        print_error(f"Error: {e}")
-        raise typer.Exit(code=1)
-
-    use_split = split if split is not None else settings.multi_file
     service = CommitService()
 
     if use_split:
@@ -75,9 +89,9 @@ def ship_command(
             print_warning("Warning: Diff was too large and was truncated. The commit messages may not cover all changes.")
 
         if len(grouped) == 1:
-            committed = confirm_and_commit(grouped[0][1])
+            committed = confirm_and_commit(grouped[0][1], service)
         else:
-            committed = confirm_and_commit_groups(grouped)
+            committed = confirm_and_commit_groups(grouped, service)
     else:
         try:
             with show_loading("Generating commit message..."):
@@ -89,7 +103,7 @@ def ship_command(
         if was_truncated:
             print_warning("Warning: Diff was too large and was truncated. The commit message may not cover all changes.")
 
-        committed = confirm_and_commit(message)
+        committed = confirm_and_commit(message, service)
 
     if not committed:
         GitRepository.unstage_files(staged)
@@ -104,3 +118,41 @@ def ship_command(
         GitRepository.revert_last_commit()
         print_info("Commit has been reverted. Changes are still staged.")
         raise typer.Exit(code=1)
+
+    if pr:
+        _prepare_pr(branch)
+
+
+def _push_resumed(branch: str, pr: bool) -> None:
+    """Push the commits of a resumed split (kept on failure: they predate this run)."""
+    try:
+        GitRepository.push()
+        print_success(f"Pushed to '{branch}'.")
+    except RuntimeError as e:
+        print_error(f"Error pushing: {e}")
+        print_info("The commits are kept; push them with `git push`.")
+        raise typer.Exit(code=1)
+
+    if pr:
+        _prepare_pr(branch)
+
+
+def _prepare_pr(branch: str) -> None:
+    """Start preparing the PR description for the pushed head, so `gitta pr --create` is instant."""
+    try:
+        base = GitRepository.get_default_branch()
+        head_sha = GitRepository.get_head_sha()
+    except RuntimeError as e:
+        print_warning(f"Warning: Not preparing a PR description: {e}")
+        return
+
+    if base == branch:
+        print_info(f"Not preparing a PR description: '{branch}' is the base branch.")
+        return
+
+    try:
+        start_pr_prefetch(base, branch, head_sha)
+    except OSError as e:
+        print_warning(f"Warning: Could not start preparing the PR description: {e}")
+        return
+    print_info("Preparing the PR description in the background; `gitta pr --create` will use it.")
@@ -3,18 +3,49 @@
 #
 # Responsibilities:
 #   - Read config file
+#   - Apply per-repo (.gitta.toml) and environment overrides
 #   - Validate required fields
-#   - Return structured config object
+#   - Return structured config object (cached per process)
 
-from gitta.config.storage import load_config
-from gitta.constants import DEFAULT_MAX_DIFF_CHARS, DEFAULT_MULTI_FILE, VALID_STYLES
+import os
+from pathlib import Path
+
+from gitta.config.storage import load_config, load_toml_cached
+from gitta.constants import (
+    CONFIG_FILE,
+    DEFAULT_CANDIDATES,
+    DEFAULT_COPY_THRESHOLD,
+    DEFAULT_MAX_DIFF_CHARS,
+    DEFAULT_MAX_DIFF_TOKENS,
+    DEFAULT_MULTI_FILE,
+    DEFAULT_RENAME_THRESHOLD,
+    DEFAULT_REPO_CONTEXT,
+    DEFAULT_REUSE_SIMILAR,
+    DEFAULT_RPM,
+    DEFAULT_TPM,
+    ENV_PREFIX,
+    REPO_CONFIG_FILENAME,
+    REPO_OVERRIDABLE_KEYS,
+    VALID_STYLES,
+)
 
 REQUIRED_FIELDS = ["provider", "base_url", "model", "style"]
 
+ENV_KEYS = ["provider", "base_url", "model", "style", "api_key", "max_diff_chars", "max_diff_tokens", "multi_file", "candidates", "repo_context", "reuse_similar", "rpm", "tpm", "rename_threshold", "copy_threshold"]
+
+# (fingerprint, Settings) of the last resolved configuration
+_cached: tuple[tuple, "Settings"] | None = None
+
 
 class Settings:
-    def __init__(self):
-        data = load_config()
+    def __init__(self, data: dict | None = None, sources: dict[str, str] | None = None):
+        if data is None:
+            sources = {}
+            data = resolve_config(sources)
+        sources = sources or {}
+
+        def to_int(key: str, value) -> int:
+            return _to_int(value, key, sources.get(key, "the config"))
 
         missing = [f for f in REQUIRED_FIELDS if not data.get(f)]
         if missing:
@@ -32,8 +63,25 @@ class Settings:
         self.model = data["model"]
         self.style = data["style"]
         self.api_key = data.get("api_key", "")
-        self.max_diff_chars = int(data.get("max_diff_chars", DEFAULT_MAX_DIFF_CHARS))
-        self.multi_file = bool(data.get("multi_file", DEFAULT_MULTI_FILE))
+        self.max_diff_chars = to_int("max_diff_chars", data.get("max_diff_chars", DEFAULT_MAX_DIFF_CHARS))
+        # A [models."<model>"] table sets budgets for one model only
+        model_overrides = data.get("models", {}).get(self.model, {})
+        if "max_diff_tokens" in model_overrides:
+            self.max_diff_tokens = max(0, _to_int(
+                model_overrides["max_diff_tokens"],
+                f'models."{self.model}".max_diff_tokens',
+                sources.get("models", "the config"),
+            ))
+        else:
+            self.max_diff_tokens = max(0, to_int("max_diff_tokens", data.get("max_diff_tokens", DEFAULT_MAX_DIFF_TOKENS)))
+        self.multi_file = _to_bool(data.get("multi_file", DEFAULT_MULTI_FILE))
+        self.candidates = max(1, to_int("candidates", data.get("candidates", DEFAULT_CANDIDATES)))
+        self.repo_context = _to_bool(data.get("repo_context", DEFAULT_REPO_CONTEXT))
+        self.reuse_similar = _to_bool(data.get("reuse_similar", DEFAULT_REUSE_SIMILAR))
+        self.rpm = max(0, to_int("rpm", data.get("rpm", DEFAULT_RPM)))
+        self.tpm = max(0, to_int("tpm", data.get("tpm", DEFAULT_TPM)))
+        self.rename_threshold = min(100, max(1, to_int("rename_threshold", data.get("rename_threshold", DEFAULT_RENAME_THRESHOLD))))
+        self.copy_threshold = min(100, max(1, to_int("copy_threshold", data.get("copy_threshold", DEFAULT_COPY_THRESHOLD))))
 
     def validate_api_key(self) -> None:
         """Check that an API key exists in the config."""
@@ -41,3 +89,101 @@ class Settings:
             raise RuntimeError(
                 "API key not found. Run 'gitta init' to configure."
             )
+
+
+def get_settings() -> Settings:
+    """
+    Return the validated Settings for this process.
+
+    The config is parsed and validated once, then reused until the user
+    config file, the repo's .gitta.toml or a GITTA_* environment variable
+    changes (so long-running modes pick up edits without a restart).
+    """
+    global _cached
+
+    repo_file = find_repo_config()
+    fingerprint = (_mtime(CONFIG_FILE), repo_file, _mtime(repo_file), _env_overrides_key())
+
+    if _cached is not None and _cached[0] == fingerprint:
+        return _cached[1]
+
+    settings = Settings()
+    _cached = (fingerprint, settings)
+    return settings
+
+
+def resolve_config(sources: dict[str, str] | None = None) -> dict:
+    """
+    Merge all config layers in a single pass.
+
+    Precedence (lowest to highest): ~/.gitta/config.toml, the repo's
+    .gitta.toml (non-secret keys only), then GITTA_* environment variables.
+
+    Args:
+        sources: Filled with where each key's value came from (a file
+            path or an environment variable), for error messages.
+    """
+    if sources is None:
+        sources = {}
+    data = load_config()
+    sources.update(dict.fromkeys(data, str(CONFIG_FILE)))
+
+    repo_file = find_repo_config()
+    if repo_file is not None:
+        repo_data = load_toml_cached(repo_file) or {}
+        for key in REPO_OVERRIDABLE_KEYS:
+            if key in repo_data:
+                data[key] = repo_data[key]
+                sources[key] = str(repo_file)
+
+    for key in ENV_KEYS:
+        value = os.environ.get(ENV_PREFIX + key.upper())
+        if value:
+            data[key] = value
+            sources[key] = ENV_PREFIX + key.upper()
+
+    return data
+
+
+def find_repo_config(start: Path | None = None) -> Path | None:
+    """
+    Find the nearest .gitta.toml from the working directory upwards.
+
+    The search stops at the repository root (the first directory
+    containing .git) so settings never leak in from outside the repo.
+    """
+    current = (start or Path.cwd()).resolve()
+    for directory in (current, *current.parents):
+        candidate = directory / REPO_CONFIG_FILENAME
+        if candidate.is_file():
+            return candidate
+        if (directory / ".git").exists():
+            return None
+    return None
+
+
+def _mtime(path: Path | None) -> int | None:
+    if path is None:
+        return None
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _env_overrides_key() -> tuple:
+    return tuple(os.environ.get(ENV_PREFIX + key.upper()) for key in ENV_KEYS)
+
+
+def _to_int(value, key: str, source: str) -> int:
+    """Parse an integer setting, naming the key and where it was set when it is not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise RuntimeError(f"Invalid value {value!r} for '{key}' in {source}: expected an integer.") from None
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
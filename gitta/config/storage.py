@@ -6,11 +6,17 @@
 #   - Save config file
 #   - Delete config
 #   - Set file permissions
+#   - Cache parsed TOML files until their mtime changes
 
 import tomllib 
 import tomli_w
+from pathlib import Path
+
 from gitta.constants import CONFIG_DIR, CONFIG_FILE
 
+# Parsed TOML files keyed by path: (mtime_ns, data)
+_toml_cache: dict[Path, tuple[int, dict]] = {}
+
 def ensure_config_dir():
     """Ensure the configuration directory exists."""
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
@@ -20,11 +26,41 @@ def save_config(data: dict):
     ensure_config_dir()
     with open (CONFIG_FILE, "wb") as f:
         f.write(tomli_w.dumps(data).encode())
+    _toml_cache.pop(CONFIG_FILE, None)
+
+def load_toml_cached(path: Path) -> dict | None:
+    """
+    Load a TOML file, reusing the parsed result while its mtime is unchanged.
+
+    Returns:
+        The parsed data, or None if the file does not exist.
+
+    Raises:
+        RuntimeError: If the file is not valid TOML.
+    """
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _toml_cache.pop(path, None)
+        return None
+
+    cached = _toml_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "rb") as f:
+        try:
+            data = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise RuntimeError(f"Invalid TOML in {path}: {e}") from None
+    _toml_cache[path] = (mtime, data)
+    return data
 
 def load_config() -> dict:
     """Load configuration data from the config file."""
-    if not CONFIG_FILE.exists():
+    data = load_toml_cached(CONFIG_FILE)
+    if data is None:
         raise RuntimeError("Configuration file not found. Please run 'gitta init' to set up your configuration.")
-    
-    with open(CONFIG_FILE, "rb") as f:
-        return tomllib.load(f)
\ No newline at end of file
+
+    # Callers may mutate and save the result, so never hand out the cached dict
+    return dict(data)
@@ -15,6 +15,65 @@ CONFIG_FILE = CONFIG_DIR / "config.toml"
 
 VALID_STYLES = ["conventional", "simple", "detailed"]
 
-DEFAULT_MAX_DIFF_CHARS = 32000  # ~8k tokens, safe for most models
+DEFAULT_MAX_DIFF_CHARS = 32000  # ~8k tokens of typical code; see max_diff_tokens
+DEFAULT_MAX_DIFF_TOKENS = 0  # 0: budget prompts in characters (max_diff_chars)
 
-DEFAULT_MULTI_FILE = False
\ No newline at end of file
+DEFAULT_MULTI_FILE = False
+
+# Rename/copy detection similarity thresholds, in percent (git's -M/-C)
+DEFAULT_RENAME_THRESHOLD = 50
+DEFAULT_COPY_THRESHOLD = 50
+
+# Commit message candidates fetched per request (cycled with [r]egenerate)
+DEFAULT_CANDIDATES = 3
+CANDIDATE_TEMPERATURE = 0.7
+
+# Inject a summary of the repo's commit conventions into commit prompts
+DEFAULT_REPO_CONTEXT = True
+
+# Reuse messages of past commits with near-identical diffs
+DEFAULT_REUSE_SIMILAR = True
+SIMILAR_REUSE_THRESHOLD = 0.9  # propose the past message without an API call
+SIMILAR_EXAMPLE_THRESHOLD = 0.6  # include the past message as an example
+
+# Client-side rate limits per provider/model (0 = learn from response headers)
+DEFAULT_RPM = 0
+DEFAULT_TPM = 0
+RATE_LIMIT_RETRIES = 2  # extra attempts after a 429, once the provider's reset time passes
+MAX_CONCURRENT_REQUESTS = 4  # upper bound on in-flight requests for fan-out paths
+
+# Seconds `gitta branch --checkout` waits for the AI name before using the local one
+BRANCH_NAME_DEADLINE = 0.4
+
+# Total diff tokens sent when a large change is explained in parts
+EXPLAIN_MAX_TOTAL_TOKENS = 50000
+
+# Context windows learned from context-length errors, per provider/model
+MODEL_LIMITS_FILE = CONFIG_DIR / "model_limits.json"
+CONTEXT_PROMPT_SHARE = 0.7  # share of a learned context window given to the prompt budget
+
+# Record/replay of AI requests (see gitta/ai/cassette.py)
+CASSETTE_ENV = "GITTA_CASSETTE"
+CASSETTE_MODE_ENV = "GITTA_CASSETTE_MODE"
+CASSETTE_LATENCY_ENV = "GITTA_CASSETTE_LATENCY"
+
+# Upper bound on concurrent git processes
+GIT_MAX_WORKERS = 8
+
+# Per-repository overrides, looked up from the working directory upwards
+REPO_CONFIG_FILENAME = ".gitta.toml"
+REPO_OVERRIDABLE_KEYS = ["model", "style", "max_diff_chars", "max_diff_tokens", "multi_file", "candidates", "repo_context", "reuse_similar", "rename_threshold", "copy_threshold"]
+
+# Environment overrides: GITTA_MODEL, GITTA_API_KEY, ...
+ENV_PREFIX = "GITTA_"
+
+# Warm background worker used by the prepare-commit-msg hook
+WORKER_SOCKET = CONFIG_DIR / "worker.sock"
+WORKER_LOCK = CONFIG_DIR / "worker.lock"  # held while a starting worker binds the socket
+WORKER_LOG = CONFIG_DIR / "worker.log"
+WORKER_IDLE_TIMEOUT = 1800  # seconds without requests before the worker exits
+WORKER_REQUEST_TIMEOUT = 120  # seconds the hook waits for a message
+
+# Background preparation of PR descriptions (`gitta ship --pr`)
+PR_PREFETCH_LOG = CONFIG_DIR / "pr_prefetch.log"
+PR_PREFETCH_WAIT = 60  # seconds `gitta pr` waits for a preparation still running
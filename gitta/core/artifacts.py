@@ -0,0 +1,72 @@
+# core/artifacts.py
+# Purpose: Cache generated text per commit SHA so later commands reuse it.
+#
+# Responsibilities:
+#   - Store PR descriptions, explanations and squash messages by head SHA
+#   - Look them up without touching the network
+#   - Keep the cache small and safe against interrupted and concurrent writes
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from gitta.git.repository import GitRepository
+from gitta.utils.locks import file_lock
+
+ARTIFACTS_FILENAME = "artifacts.json"
+ARTIFACTS_VERSION = 1
+
+# Head SHAs remembered; the oldest are dropped
+MAX_HEADS = 50
+
+_lock = threading.Lock()
+
+
+def _artifacts_path() -> Path:
+    return Path(GitRepository.get_git_common_dir()) / "gitta" / ARTIFACTS_FILENAME
+
+
+def _load() -> dict:
+    try:
+        data = json.loads(_artifacts_path().read_text())
+    except (OSError, ValueError):
+        return {"version": ARTIFACTS_VERSION, "heads": {}}
+    if data.get("version") != ARTIFACTS_VERSION:
+        return {"version": ARTIFACTS_VERSION, "heads": {}}
+    return data
+
+
+def load_artifact(head_sha: str, kind: str):
+    """
+    Return the cached artifact of kind ("pr", "explanation", "squash") for head_sha.
+
+    Returns None when nothing is cached or the cache cannot be read.
+    """
+    try:
+        return _load()["heads"].get(head_sha, {}).get(kind)
+    except RuntimeError:
+        return None
+
+
+def save_artifact(head_sha: str, kind: str, value) -> None:
+    """Cache a JSON-serializable artifact for head_sha; failures are ignored."""
+    try:
+        path = _artifacts_path()
+        # Background jobs (e.g. `gitta ship --pr`) write from other processes
+        with _lock, file_lock(path.with_suffix(".lock")):
+            data = _load()
+            entry = data["heads"].pop(head_sha, {})
+            entry[kind] = value
+            data["heads"][head_sha] = entry
+            while len(data["heads"]) > MAX_HEADS:
+                data["heads"].pop(next(iter(data["heads"])))
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+    except (RuntimeError, OSError):
+        # The cache is an optimization; never fail a command over it
+        pass
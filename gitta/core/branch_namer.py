@@ -0,0 +1,170 @@
+# core/branch_namer.py
+# Purpose: Name branches from descriptions without waiting on the network.
+#
+# Responsibilities:
+#   - Slug a description locally (prefix by keywords, stopwords removed)
+#   - Race the AI name against a short deadline, falling back to the slug
+#   - Cache names by description so repeated requests are instant, including
+#     AI names requested again after the deadline (see worker/branch_name.py)
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from gitta.ai.client import AIClient
+from gitta.git.repository import GitRepository
+
+BRANCH_NAMES_FILENAME = "branch_names.json"
+BRANCH_NAMES_VERSION = 1
+
+# Descriptions remembered; the oldest are dropped
+MAX_NAMES = 200
+
+# Words after the prefix in a local name
+MAX_SLUG_WORDS = 5
+
+# Prefix chosen by the first keyword found in the description
+PREFIX_KEYWORDS = {
+    "fix": {"fix", "fixes", "fixed", "bug", "bugfix", "hotfix", "crash", "error", "broken", "repair", "resolve", "patch"},
+    "docs": {"doc", "docs", "documentation", "readme", "changelog", "docstring", "docstrings"},
+    "test": {"test", "tests", "testing", "coverage", "spec", "specs"},
+    "refactor": {"refactor", "refactoring", "cleanup", "restructure", "simplify", "rename", "reorganize", "extract"},
+    "perf": {"perf", "performance", "speed", "faster", "optimize", "optimise", "latency", "cache"},
+    "ci": {"ci", "pipeline", "workflow", "workflows", "github-actions"},
+    "chore": {"chore", "bump", "upgrade", "deps", "dependency", "dependencies", "release", "version"},
+}
+DEFAULT_PREFIX = "feat"
+
+# Verbs that only restate the prefix ("add login" is a feat already)
+PREFIX_VERBS = {"add", "adds", "implement", "introduce", "create", "support", "update", "fix", "fixes", "refactor", "bump", "upgrade", "optimize", "document"}
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "for", "with", "by", "at", "from", "into",
+    "is", "are", "be", "it", "its", "this", "that", "these", "those", "when", "so", "as", "we", "our",
+    "some", "new", "please", "should", "make", "allow", "can", "not", "no",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+_lock = threading.Lock()
+
+
+def slugify_description(description: str) -> str:
+    """
+    Name a branch locally: `<prefix>/<up to MAX_SLUG_WORDS words>`.
+
+    The prefix comes from the first keyword of PREFIX_KEYWORDS in the
+    description (feat/ otherwise); stopwords and a leading verb that only
+    restates the prefix are dropped.
+    """
+    words = _WORD_RE.findall(description.lower())
+    prefix = next(
+        (prefix for word in words for prefix, keywords in PREFIX_KEYWORDS.items() if word in keywords),
+        DEFAULT_PREFIX,
+    )
+    if words and words[0] in PREFIX_VERBS | PREFIX_KEYWORDS.get(prefix, set()):
+        words = words[1:]
+    slug = [word for word in words if word not in STOPWORDS][:MAX_SLUG_WORDS]
+    return f"{prefix}/{'-'.join(slug) or 'update'}"
+
+
+def _clean_name(text: str) -> str:
+    """The branch name in an AI response, reduced to git-safe characters (may be empty)."""
+    line = text.strip().strip("`'\"").splitlines()[0] if text.strip() else ""
+    name = re.sub(r"[^a-z0-9/._-]+", "-", line.strip().lower())
+    name = re.sub(r"-{2,}", "-", name)
+    name = re.sub(r"/{2,}|\.{2,}", "/", name)
+    return name.strip("-/.")
+
+
+def _cache_key(description: str) -> str:
+    return " ".join(description.lower().split())
+
+
+def _names_path() -> Path:
+    return Path(GitRepository.get_git_common_dir()) / "gitta" / BRANCH_NAMES_FILENAME
+
+
+def _load() -> dict:
+    try:
+        data = json.loads(_names_path().read_text())
+    except (OSError, ValueError, RuntimeError):
+        return {"version": BRANCH_NAMES_VERSION, "names": {}}
+    if data.get("version") != BRANCH_NAMES_VERSION:
+        return {"version": BRANCH_NAMES_VERSION, "names": {}}
+    return data
+
+
+def _save(description: str, name: str) -> None:
+    """Cache an AI branch name; failures are ignored."""
+    try:
+        path = _names_path()
+        with _lock:
+            data = _load()
+            data["names"].pop(_cache_key(description), None)
+            data["names"][_cache_key(description)] = name
+            while len(data["names"]) > MAX_NAMES:
+                data["names"].pop(next(iter(data["names"])))
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+    except (RuntimeError, OSError):
+        pass
+
+
+def request_ai_name(description: str) -> str | None:
+    """Ask the AI for a branch name and cache it; None if the request fails or the name is unusable."""
+    try:
+        name = _clean_name(AIClient().generate_branch_name(description))
+    except Exception:
+        # Any failure falls back to the local name
+        return None
+    if not name:
+        return None
+    _save(description, name)
+    return name
+
+
+def cache_ai_name(description: str) -> bool:
+    """Make sure an AI name for description is cached; whether one is."""
+    return bool(_load()["names"].get(_cache_key(description)) or request_ai_name(description))
+
+
+def name_branch(description: str, deadline: float | None = None) -> tuple[str, str]:
+    """
+    Name a branch, waiting at most deadline seconds for the AI.
+
+    A name cached for the description is returned at once. Otherwise the
+    AI request runs in a daemon thread; without a deadline it is waited
+    for, and the local slug is only used if it fails. With a deadline, a
+    request that has not produced a usable name in time falls back to the
+    slug and is abandoned when the process exits; callers that want the
+    AI name for next time hand it to start_branch_naming().
+
+    Returns:
+        tuple: (branch_name, source) where source is "cache", "ai" or "local".
+    """
+    cached = _load()["names"].get(_cache_key(description))
+    if cached:
+        return cached, "cache"
+
+    result: list[str] = []
+
+    def request() -> None:
+        name = request_ai_name(description)
+        if name:
+            result.append(name)
+
+    worker = threading.Thread(target=request, daemon=True)
+    worker.start()
+    local = slugify_description(description)
+    worker.join(deadline)
+
+    if result:
+        return result[0], "ai"
+    return local, "local"
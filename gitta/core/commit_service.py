@@ -6,18 +6,43 @@
 #   - Get staged diff
 #   - Call generator
 #   - Return generated message
+#   - Cache alternative candidates for instant regeneration
+#   - Add repository conventions from the context index to prompts
+#   - Reuse messages of near-identical past commits
+#   - Add cached explanations of the staged file changes to prompts
+#   - Journal split-commit messages so interrupted runs resume
 
+import sqlite3
+
+from gitta.ai.budget import exceeds_budget, format_group_list
+from gitta.ai.tokens import get_prompt_budget
 from gitta.git.repository import GitRepository
 from gitta.git.diff import get_staged_diff
-from gitta.config.settings import Settings
-from gitta.core.generator import generate_commit_message, generate_grouped_commit_messages
-from gitta.git.diff_parser import DiffGroup, parse_diff_by_file, group_diffs_by_module
+from gitta.config.settings import get_settings
+from gitta.constants import SIMILAR_EXAMPLE_THRESHOLD, SIMILAR_REUSE_THRESHOLD
+from gitta.core.context_index import build_repo_context, update_index
+from gitta.core.file_cache import build_explanation_context
+from gitta.core.job_journal import JobJournal
+from gitta.core.similarity_index import find_similar_commit, update_similarity_index
+from gitta.core.generator import generate_commit_messages, generate_grouped_commit_messages, generate_split_commit_messages
+from gitta.git.diff_parser import DiffGroup, FileDiff, parse_diff_by_file, group_diffs_by_module
+from gitta.utils.errors import StructuredOutputError
 
 
 class CommitService:
     """
     Orchestrates the commit workflow.
     """
+    def __init__(self):
+        # Candidates for the last generated diff; cycled by next_candidate()
+        self._diff: str | None = None
+        self._diff_context = ""
+        self._candidates: list[str] = []
+        self._index = 0
+        self._context_index: dict | None = None
+        # (sha, similarity) when the first candidate was reused from history
+        self.reused_from: tuple[str, float] | None = None
+
     def run(self, dry_run: bool = False) -> tuple[str, bool]:
         """
         Executes the commit workflow.
@@ -32,19 +57,23 @@ class CommitService:
         if not GitRepository.is_git_repo():
             raise RuntimeError("Not a Git repository.")
 
-        settings = Settings()
-        diff, was_truncated = get_staged_diff(max_chars=settings.max_diff_chars)
+        diff, was_truncated = get_staged_diff()
 
         if not diff:
             raise RuntimeError("No staged changes to commit.")
 
-        return generate_commit_message(diff), was_truncated
+        message = self._generate_candidates(diff)
+        return message, was_truncated or self._cut_in_prompt(diff, self._diff_context)
 
-    def run_split(self) -> tuple[list[tuple[DiffGroup, str]], bool]:
+    def run_split(self, regenerate: bool = False) -> tuple[list[tuple[DiffGroup, str]], bool]:
         """
         Run the split-commit workflow: parse diff by file, group by module,
         and generate one scoped commit message per group.
 
+        Args:
+            regenerate: Generate fresh messages instead of reusing those
+                journaled for the staged tree; the new ones replace them.
+
         Returns:
             tuple: (list of (DiffGroup, message) tuples, was_truncated)
 
@@ -54,8 +83,7 @@ class CommitService:
         if not GitRepository.is_git_repo():
             raise RuntimeError("Not a Git repository.")
 
-        settings = Settings()
-        diff, was_truncated = get_staged_diff(max_chars=settings.max_diff_chars)
+        diff, was_truncated = get_staged_diff()
 
         if not diff:
             raise RuntimeError("No staged changes to commit.")
@@ -63,9 +91,185 @@ class CommitService:
         file_diffs = parse_diff_by_file(diff)
         groups = group_diffs_by_module(file_diffs)
 
+        # Messages finished by an earlier (possibly interrupted) run on the same staged tree
+        journal = self._journal()
+        if journal and not regenerate:
+            cached = self._journal_call(journal.get_result, {fd.file_path: fd for fd in file_diffs})
+            if cached:
+                return _released(cached), was_truncated
+
         # Single group: fall back to standard generation
         if len(groups) == 1:
-            message = generate_commit_message(diff)
-            return [(groups[0], message)], was_truncated
+            cached = self._journal_call(journal.get_message, groups[0]) if journal and not regenerate else None
+            if cached:
+                self._use_message(diff, cached, "")
+                message = cached
+            else:
+                message = self._generate_candidates(diff)
+                if journal:
+                    self._journal_call(journal.record_message, groups[0], message)
+            was_truncated = was_truncated or self._cut_in_prompt(diff, self._diff_context)
+            return _released([(groups[0], message)]), was_truncated
+
+        # Whole diff fits (with the context and file list it shares the
+        # prompt with): one structured request replaces one call per group
+        repo_context = "" if was_truncated else self._context(file_diffs)
+        group_list = format_group_list([(g.scope, g.files) for g in groups])
+        if not was_truncated and not self._cut_in_prompt(group_list, diff, repo_context):
+            try:
+                results = generate_split_commit_messages(file_diffs, groups, diff, repo_context)
+            except StructuredOutputError:
+                pass
+            else:
+                if journal:
+                    self._journal_call(journal.record_result, results)
+                return _released(results), was_truncated
+
+        done = {}
+        if journal and not regenerate:
+            for group in groups:
+                message = self._journal_call(journal.get_message, group)
+                if message:
+                    done[group.scope] = message
+
+        def record(group: DiffGroup, message: str) -> None:
+            if journal:
+                self._journal_call(journal.record_message, group, message)
+
+        missing = [g for g in groups if g.scope not in done]
+        by_path = {fd.file_path: fd for fd in file_diffs}
+        repo_contexts = {g.scope: self._context([by_path[f] for f in g.files]) for g in missing}
+        if missing:
+            was_truncated = was_truncated or any(
+                self._cut_in_prompt(", ".join(g.files), g.combined_diff, repo_contexts[g.scope]) for g in missing
+            )
+            done.update((g.scope, m) for g, m in generate_grouped_commit_messages(missing, repo_contexts, record))
+
+        results = [(g, done[g.scope]) for g in groups]
+        if journal:
+            self._journal_call(journal.record_result, results)
+        return _released(results), was_truncated
+
+    def has_candidates(self) -> bool:
+        """Whether run() has produced candidates that next_candidate() can cycle."""
+        return self._diff is not None
+
+    def next_candidate(self) -> tuple[str, int, int]:
+        """
+        Return the next cached candidate for the last generated diff.
+
+        A new request is made only once every cached candidate has been shown.
+
+        Returns:
+            tuple: (message, position, total) with a 1-based position.
+
+        Raises:
+            RuntimeError: If run() has not generated anything yet.
+        """
+        if self._diff is None:
+            raise RuntimeError("No commit message has been generated yet.")
+
+        self._index += 1
+        if self._index >= len(self._candidates):
+            # Sampled: with candidates = 1 the deterministic answer is the one already shown
+            fresh = generate_commit_messages(self._diff, get_settings().candidates, self._diff_context, sample=True)
+            fresh = [c for c in fresh if c not in self._candidates]
+            if fresh:
+                self._candidates.extend(fresh)
+            else:
+                # The model keeps repeating itself: cycle what we already have
+                self._index = 0
+
+        return self._candidates[self._index], self._index + 1, len(self._candidates)
+
+    def _generate_candidates(self, diff: str) -> str:
+        """Fetch a batch of candidates for diff, cache them, and return the first."""
+        repo_context = self._context(parse_diff_by_file(diff))
+        self.reused_from = None
+
+        similar = self._find_similar(diff)
+        if similar:
+            sha, message, score = similar
+            example = f"A very similar past change was committed as:\n{message}\nFollow its wording where it still applies."
+            repo_context = f"{repo_context}\n\n{example}" if repo_context else example
+
+            # Near-repeat: propose the historical message without a round trip
+            if score >= SIMILAR_REUSE_THRESHOLD:
+                self._use_message(diff, message, repo_context)
+                self.reused_from = (sha, score)
+                return message
+
+        candidates = generate_commit_messages(diff, get_settings().candidates, repo_context)
+        if not candidates:
+            raise RuntimeError("The AI provider returned an empty commit message.")
+
+        self._diff = diff
+        self._diff_context = repo_context
+        self._candidates = candidates
+        self._index = 0
+        return candidates[0]
+
+    def _use_message(self, diff: str, message: str, repo_context: str) -> None:
+        """Offer a message obtained without a request; [r]egenerate fetches fresh candidates."""
+        self._diff = diff
+        self._diff_context = repo_context
+        self._candidates = [message]
+        self._index = 0
+
+    def _journal(self) -> JobJournal | None:
+        """Journal for the staged tree, or None if it cannot be determined."""
+        try:
+            return JobJournal(GitRepository.write_tree())
+        except RuntimeError:
+            return None
+
+    def _journal_call(self, method, *args):
+        """Call a journal method; the journal is an optimization, never fail a commit over it."""
+        try:
+            return method(*args)
+        except (RuntimeError, OSError):
+            return None
+
+    def _cut_in_prompt(self, *texts: str) -> bool:
+        """Whether texts sharing one prompt exceed the budget, so the client will cut them."""
+        return exceeds_budget(get_prompt_budget(get_settings()), *texts)
+
+    def _context(self, file_diffs: list[FileDiff]) -> str:
+        """Repo conventions plus cached explanations for the changes in file_diffs."""
+        parts = (
+            self._repo_context([fd.file_path for fd in file_diffs]),
+            build_explanation_context(file_diffs),
+        )
+        return "\n\n".join(part for part in parts if part)
+
+    def _repo_context(self, files: list[str]) -> str:
+        """Summarize repo conventions for files; the index is updated once per service."""
+        if not get_settings().repo_context:
+            return ""
+
+        try:
+            if self._context_index is None:
+                self._context_index = update_index()
+            return build_repo_context(files, self._context_index)
+        except (RuntimeError, OSError):
+            # The index is an optimization; never fail a commit over it
+            return ""
+
+    def _find_similar(self, diff: str) -> tuple[str, str, float] | None:
+        """Look up a near-identical past commit, updating the index first."""
+        if not get_settings().reuse_similar:
+            return None
+
+        try:
+            update_similarity_index()
+            return find_similar_commit(diff, SIMILAR_EXAMPLE_THRESHOLD)
+        except (RuntimeError, OSError, sqlite3.Error):
+            # The index is an optimization; never fail a commit over it
+            return None
+
 
-        return generate_grouped_commit_messages(groups), was_truncated
+def _released(grouped: list[tuple[DiffGroup, str]]) -> list[tuple[DiffGroup, str]]:
+    """Drop the groups' diff references once their messages exist, so the staged diff is freed during review."""
+    for group, _ in grouped:
+        group.release()
+    return grouped
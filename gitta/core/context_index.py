@@ -0,0 +1,190 @@
+# core/context_index.py
+# Purpose: Local index of the repository's commit conventions.
+#
+# Responsibilities:
+#   - Incrementally index commit subjects and touched paths from git log
+#   - Track conventional types, scopes and subject style
+#   - Build a compact context summary for commit prompts
+
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path, PurePosixPath
+
+from gitta.git.repository import GitRepository
+
+INDEX_FILENAME = "context_index.json"
+INDEX_VERSION = 1
+
+# First build reads only this many recent commits; later runs are incremental
+INITIAL_INDEX_COMMITS = 2000
+
+# Newest commits read by one incremental update (it runs inside `gitta
+# commit`); after a larger pull the older new commits are skipped
+INCREMENTAL_INDEX_COMMITS = 500
+
+# Recent subjects kept per directory
+SUBJECTS_PER_PATH = 5
+
+# Upper bound on the summary injected into prompts (~300 tokens)
+MAX_CONTEXT_CHARS = 1200
+
+CONVENTIONAL_RE = re.compile(r"^(\w+)(?:\(([^)]+)\))?!?: ")
+TICKET_RE = re.compile(r"^\[?[A-Z][A-Z0-9]+-\d+\]?")
+
+
+def _index_path() -> Path:
+    return Path(GitRepository.get_git_common_dir()) / "gitta" / INDEX_FILENAME
+
+
+def _empty_index() -> dict:
+    return {
+        "version": INDEX_VERSION,
+        "head": None,
+        "commits": 0,
+        "conventional": 0,
+        "ticket_prefix": 0,
+        "subject_chars": 0,
+        "types": {},
+        "scopes": {},
+        "paths": {},
+    }
+
+
+def _path_key(file_path: str) -> str:
+    """Directory used to bucket recent subjects (up to two levels deep)."""
+    parts = PurePosixPath(file_path).parts[:-1]
+    return "/".join(parts[:2]) if parts else "."
+
+
+def load_index() -> dict:
+    """Load the index for the current repository, or an empty one."""
+    try:
+        data = json.loads(_index_path().read_text())
+    except (OSError, ValueError):
+        return _empty_index()
+    if data.get("version") != INDEX_VERSION:
+        return _empty_index()
+    return data
+
+
+def update_index(max_commits: int | None = None) -> dict:
+    """
+    Bring the index up to date with HEAD and save it.
+
+    Only commits after the last indexed SHA are read, at most the
+    INCREMENTAL_INDEX_COMMITS newest of them. If history was rewritten so
+    that SHA is no longer an ancestor of HEAD, the index is rebuilt from
+    the most recent INITIAL_INDEX_COMMITS commits.
+
+    Args:
+        max_commits: Force a rebuild from this many recent commits.
+
+    Returns:
+        The updated index.
+    """
+    index = load_index()
+
+    try:
+        head = GitRepository.get_head_sha()
+    except RuntimeError:
+        # No commits yet
+        return index
+
+    if index["head"] == head and max_commits is None:
+        return index
+
+    if index["head"] and max_commits is None and GitRepository.is_ancestor(index["head"]):
+        commits = GitRepository.iter_commit_files(f"{index['head']}..{head}", max_count=INCREMENTAL_INDEX_COMMITS)
+    else:
+        index = _empty_index()
+        commits = GitRepository.iter_commit_files(head, max_count=max_commits or INITIAL_INDEX_COMMITS)
+
+    types = Counter(index["types"])
+    scopes = Counter(index["scopes"])
+    new_subjects: dict[str, list[str]] = {}
+
+    for _, subject, files in commits:
+        index["commits"] += 1
+        index["subject_chars"] += len(subject)
+
+        match = CONVENTIONAL_RE.match(subject)
+        if match:
+            index["conventional"] += 1
+            types[match.group(1).lower()] += 1
+            if match.group(2):
+                scopes[match.group(2).lower()] += 1
+        if TICKET_RE.match(subject):
+            index["ticket_prefix"] += 1
+
+        # Commits arrive newest first
+        for key in {_path_key(f) for f in files}:
+            bucket = new_subjects.setdefault(key, [])
+            if len(bucket) < SUBJECTS_PER_PATH:
+                bucket.append(subject)
+
+    for key, subjects in new_subjects.items():
+        index["paths"][key] = (subjects + index["paths"].get(key, []))[:SUBJECTS_PER_PATH]
+
+    index["types"] = dict(types)
+    index["scopes"] = dict(scopes)
+    index["head"] = head
+
+    path = _index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so an interrupted write never corrupts the index
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(index))
+    os.replace(tmp, path)
+    return index
+
+
+def build_repo_context(files: list[str], index: dict | None = None) -> str:
+    """
+    Summarize the repository's conventions relevant to the given files.
+
+    Args:
+        files: Paths of the files being committed.
+        index: A loaded index; defaults to update_index().
+
+    Returns:
+        A short plain-text summary, or "" if there is no history yet.
+    """
+    if index is None:
+        index = update_index()
+
+    total = index["commits"]
+    if not total:
+        return ""
+
+    lines = ["Repository conventions (from recent history):"]
+
+    conventional = index["conventional"] * 100 // total
+    lines.append(f"- {conventional}% of commits use the type(scope): summary format")
+
+    if index["types"]:
+        top_types = [t for t, _ in Counter(index["types"]).most_common(6)]
+        lines.append(f"- Common types: {', '.join(top_types)}")
+
+    if index["scopes"]:
+        top_scopes = [s for s, _ in Counter(index["scopes"]).most_common(10)]
+        lines.append(f"- Common scopes: {', '.join(top_scopes)}")
+
+    if index["ticket_prefix"] * 2 > total:
+        lines.append("- Subjects usually start with a ticket ID (e.g. ABC-123)")
+
+    lines.append(f"- Typical subject length: ~{index['subject_chars'] // total} characters")
+
+    keys = sorted({_path_key(f) for f in files})
+    recent = [(key, index["paths"][key]) for key in keys if key in index["paths"]]
+    if recent:
+        lines.append("Recent commit subjects for these paths:")
+        for key, subjects in recent:
+            for subject in subjects[:3]:
+                lines.append(f"- {key}: {subject}")
+
+    context = "\n".join(lines)
+    if len(context) > MAX_CONTEXT_CHARS:
+        context = context[:MAX_CONTEXT_CHARS].rsplit("\n", 1)[0]
+    return context
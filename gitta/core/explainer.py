@@ -0,0 +1,128 @@
+# core/explainer.py
+# Purpose: Explain a diff using the AI client, in parts when it is large.
+#
+# Responsibilities:
+#   - Explain diffs that fit in one request directly
+#   - Split large diffs by module into request-sized chunks
+#   - Explain chunks concurrently, within a total token budget
+#   - Merge the parts under a summary
+
+from concurrent.futures import ThreadPoolExecutor
+
+from gitta.ai.client import AIClient
+from gitta.ai.tokens import PromptBudget
+from gitta.constants import EXPLAIN_MAX_TOTAL_TOKENS, MAX_CONCURRENT_REQUESTS
+from gitta.git.diff_parser import DiffGroup, FileDiff, group_diffs_by_module, parse_diff_by_file
+
+
+def explain_diff(diff: str, context: str, budget: PromptBudget) -> tuple[str, bool]:
+    """
+    Explain a diff, chunking it when it exceeds the budget.
+
+    Each chunk holds at most one budget of diff. The chunks and a summary
+    (built from the file list, not the diff) are requested concurrently,
+    so a large change takes about as long as one request.
+
+    Args:
+        diff: The diff to explain.
+        context: Context string (e.g., commit message, file path).
+        budget: Largest diff sent in one request.
+
+    Returns:
+        tuple: (explanation, was_truncated). was_truncated is set when a
+        file had to be cut or files were left out to stay within
+        EXPLAIN_MAX_TOTAL_TOKENS.
+    """
+    client = AIClient()
+
+    # The context shares the request's budget with the diff
+    if len(diff) <= budget.max_chars and budget.measure(diff) + budget.measure(context) <= budget.limit:
+        return client.generate_explanation(diff=diff, context=context), False
+
+    file_diffs = parse_diff_by_file(diff)
+    chunks, was_truncated = _build_chunks(file_diffs, budget, budget.from_tokens(EXPLAIN_MAX_TOTAL_TOKENS))
+
+    # A single file (or an unparseable diff): explain its first budget's worth
+    if len(chunks) <= 1:
+        return client.generate_explanation(diff=budget.cut(diff), context=context), True
+
+    explained = {f for chunk in chunks for f in chunk.files}
+    omitted = [fd.file_path for fd in file_diffs if fd.file_path not in explained]
+
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REQUESTS, len(chunks) + 1)) as pool:
+        summary_future = pool.submit(client.generate_explanation_summary, _file_stats(file_diffs), context)
+        part_futures = [
+            pool.submit(client.generate_chunk_explanation, chunk.scope, chunk.files, chunk.combined_diff, context)
+            for chunk in chunks
+        ]
+        summary = summary_future.result()
+        parts = [f.result() for f in part_futures]
+
+    sections = [summary]
+    for chunk, part in zip(chunks, parts):
+        sections.append(f"## {chunk.scope}\n{part}")
+    if omitted:
+        sections.append("## Not explained\n" + "\n".join(f"- {path}" for path in omitted))
+    return "\n\n".join(sections), was_truncated
+
+
+def _build_chunks(file_diffs: list[FileDiff], budget: PromptBudget, total: int) -> tuple[list[DiffGroup], bool]:
+    """
+    Pack module groups into chunks of at most one budget each.
+
+    Groups larger than the budget are split across several chunks by file;
+    a single file larger than the budget is cut. Files that would push the
+    total (in the budget's unit) past total are left out.
+
+    Returns:
+        tuple: (chunks, was_truncated)
+    """
+    by_path = {fd.file_path: fd for fd in file_diffs}
+    chunks: list[DiffGroup] = []
+    was_truncated = False
+    used = 0
+
+    for group in group_diffs_by_module(file_diffs):
+        parts: list[DiffGroup] = []
+        part_size = 0
+        for path in group.files:
+            fd = by_path[path]
+            # Only what could fit is measured, however large the file
+            text = fd.head(budget.max_chars + 1).diff_text
+            size = budget.measure(text)
+            if size > budget.limit or len(text) > budget.max_chars:
+                text = budget.cut(text)
+                fd = fd.head(len(text))
+                size = budget.measure(text)
+                was_truncated = True
+            if used + size > total:
+                was_truncated = True
+                continue
+            used += size
+
+            if not parts or part_size + size + 1 > budget.limit:
+                parts.append(DiffGroup(scope=group.scope))
+                part_size = 0
+            parts[-1].add(fd)
+            part_size += size + 1
+
+        if len(parts) > 1:
+            for i, part in enumerate(parts, 1):
+                part.scope = f"{group.scope} ({i}/{len(parts)})"
+        chunks.extend(parts)
+
+    return chunks, was_truncated
+
+
+def _file_stats(file_diffs: list[FileDiff]) -> str:
+    """One line per file with added/removed line counts, like `git diff --stat`."""
+    lines = []
+    for fd in file_diffs:
+        added = removed = 0
+        for line in fd.diff_text.splitlines():
+            if line.startswith("+") and not line.startswith("+++"):
+                added += 1
+            elif line.startswith("-") and not line.startswith("---"):
+                removed += 1
+        lines.append(f"{fd.file_path} | +{added} -{removed}")
+    return "\n".join(lines)
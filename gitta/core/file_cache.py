@@ -0,0 +1,108 @@
+# core/file_cache.py
+# Purpose: Cache per-file results by content, shared across commands.
+#
+# Responsibilities:
+#   - Store results (e.g. explanations) by a file change's blob IDs
+#   - Look them up without touching the network
+#   - Summarize cached explanations as compact context for commit prompts
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from gitta.git.diff_parser import FileDiff
+from gitta.git.repository import GitRepository
+
+FILE_CACHE_FILENAME = "file_cache.json"
+FILE_CACHE_VERSION = 1
+
+# File changes remembered; the oldest are dropped
+MAX_CHANGES = 500
+
+# Characters of one explanation quoted in a commit prompt
+EXPLANATION_CONTEXT_CHARS = 300
+
+_lock = threading.Lock()
+
+
+def _cache_path() -> Path:
+    return Path(GitRepository.get_git_common_dir()) / "gitta" / FILE_CACHE_FILENAME
+
+
+def _load() -> dict:
+    try:
+        data = json.loads(_cache_path().read_text())
+    except (OSError, ValueError):
+        return {"version": FILE_CACHE_VERSION, "changes": {}}
+    if data.get("version") != FILE_CACHE_VERSION:
+        return {"version": FILE_CACHE_VERSION, "changes": {}}
+    return data
+
+
+def load_file_results(blob_keys: list[str], kind: str) -> dict[str, object]:
+    """
+    Return the cached results of kind for each blob key that has one.
+
+    A blob key is the `old..new` object IDs of a file change (see
+    FileDiff.blob_key), so a result is found again by any command that
+    sees the same change, whatever the path or the diff around it.
+    """
+    try:
+        changes = _load()["changes"]
+    except RuntimeError:
+        return {}
+    found = {}
+    for key in blob_keys:
+        value = changes.get(key, {}).get(kind)
+        if value is not None:
+            found[key] = value
+    return found
+
+
+def load_file_result(blob_key: str, kind: str):
+    """Return the cached result of kind for one file change, or None."""
+    return load_file_results([blob_key], kind).get(blob_key)
+
+
+def save_file_result(blob_key: str, kind: str, value) -> None:
+    """Cache a JSON-serializable result for a file change; failures are ignored."""
+    try:
+        path = _cache_path()
+        with _lock:
+            data = _load()
+            entry = data["changes"].pop(blob_key, {})
+            entry[kind] = value
+            data["changes"][blob_key] = entry
+            while len(data["changes"]) > MAX_CHANGES:
+                data["changes"].pop(next(iter(data["changes"])))
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, path)
+    except (RuntimeError, OSError):
+        # The cache is an optimization; never fail a command over it
+        pass
+
+
+def build_explanation_context(file_diffs: list[FileDiff]) -> str:
+    """
+    Summarize cached explanations of file_diffs for a commit prompt.
+
+    Only the start of each explanation (its summary) is quoted. Returns
+    "" when none of the changes has been explained.
+    """
+    by_key = {fd.blob_key: fd.file_path for fd in file_diffs if fd.blob_key}
+    explanations = load_file_results(list(by_key), "explanation")
+    if not explanations:
+        return ""
+
+    lines = ["Earlier explanations of some of these changes:"]
+    for key, text in explanations.items():
+        summary = " ".join(line.strip() for line in text.splitlines() if line.strip())
+        if len(summary) > EXPLANATION_CONTEXT_CHARS:
+            summary = summary[:EXPLANATION_CONTEXT_CHARS].rsplit(" ", 1)[0] + " ..."
+        lines.append(f"- {by_key[key]}: {summary}")
+    return "\n".join(lines)
@@ -6,8 +6,12 @@
 #   - Call AI client
 #   - Return clean commit message
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
 from gitta.ai.client import AIClient
-from gitta.git.diff_parser import DiffGroup
+from gitta.constants import MAX_CONCURRENT_REQUESTS
+from gitta.git.diff_parser import DiffGroup, FileDiff
 
 
 def generate_commit_message(diff: str) -> str:
@@ -25,23 +29,107 @@ def generate_commit_message(diff: str) -> str:
     return client.generate_commit_message(diff)
 
 
-def generate_grouped_commit_messages(groups: list[DiffGroup]) -> list[tuple[DiffGroup, str]]:
+def generate_commit_messages(diff: str, n: int, repo_context: str = "", sample: bool = False) -> list[str]:
+    """
+    Generate up to n alternative commit messages from one request.
+
+    Args:
+        diff (str): The git diff representing the staged changes.
+        n (int): Number of candidates to request.
+        repo_context (str): Optional summary of the repo's commit conventions.
+        sample (bool): Sample even a single candidate, instead of the
+            deterministic answer (for candidates beyond the first batch).
+
+    Returns:
+        list[str]: Distinct candidate messages, best first.
+    """
+
+    client = AIClient()
+    return client.generate_commit_messages(diff, n, repo_context, sample)
+
+
+def generate_messages_for_diffs(diffs: list[str]) -> list[str]:
+    """
+    Generate one commit message per diff, concurrently.
+
+    Requests are bounded by MAX_CONCURRENT_REQUESTS and paced by the
+    client's rate-limit scheduler.
+
+    Args:
+        diffs: Diffs to describe (already truncated to the request budget).
+
+    Returns:
+        Messages in the same order as diffs.
+    """
+    client = AIClient()
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REQUESTS, len(diffs)) or 1) as pool:
+        return list(pool.map(client.generate_commit_message, diffs))
+
+
+def generate_grouped_commit_messages(
+    groups: list[DiffGroup],
+    repo_contexts: dict[str, str] | None = None,
+    on_message: Callable[[DiffGroup, str], None] | None = None,
+) -> list[tuple[DiffGroup, str]]:
     """
     Generate one commit message per DiffGroup.
 
+    Groups are requested concurrently; the client's rate-limit scheduler
+    paces the requests to the provider's limits.
+
     Args:
         groups: List of DiffGroup objects to generate messages for.
+        repo_contexts: Optional repo convention summaries keyed by group scope.
+        on_message: Called with each group and its message as soon as that
+            request completes (from a worker thread).
 
     Returns:
         List of (group, message) tuples.
     """
+    repo_contexts = repo_contexts or {}
     client = AIClient()
-    results = []
-    for group in groups:
+
+    def generate(group: DiffGroup) -> str:
         message = client.generate_scoped_commit_message(
             scope=group.scope,
             files=group.files,
             diff=group.combined_diff,
+            repo_context=repo_contexts.get(group.scope, ""),
         )
+        if on_message:
+            on_message(group, message)
+        return message
+
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REQUESTS, len(groups)) or 1) as pool:
+        messages = list(pool.map(generate, groups))
+    return list(zip(groups, messages))
+
+
+def generate_split_commit_messages(file_diffs: list[FileDiff], groups: list[DiffGroup], diff: str, repo_context: str = "") -> list[tuple[DiffGroup, str]]:
+    """
+    Generate every group's commit message with a single structured request.
+
+    The model may move files between the suggested groups; the returned
+    groups reflect its final assignment.
+
+    Args:
+        file_diffs: Per-file diffs of the staged changes.
+        groups: Suggested groups covering every file.
+        diff: The full staged diff.
+        repo_context: Optional summary of the repo's commit conventions.
+
+    Returns:
+        List of (group, message) tuples.
+
+    Raises:
+        StructuredOutputError: If the provider cannot return a valid response.
+    """
+    client = AIClient()
+    commits = client.generate_split_commit_messages([(g.scope, g.files) for g in groups], diff, repo_context)
+
+    by_path = {fd.file_path: fd for fd in file_diffs}
+    results = []
+    for scope, files, message in commits:
+        group = DiffGroup(scope=scope, file_diffs=[by_path[f] for f in files])
         results.append((group, message))
-    return results
\ No newline at end of file
+    return results
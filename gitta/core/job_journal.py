@@ -0,0 +1,207 @@
+# core/job_journal.py
+# Purpose: Persist split-commit progress so interrupted runs can resume.
+#
+# Responsibilities:
+#   - Record each generated group message as soon as it completes
+#   - Key messages by staged tree SHA and group content hash
+#   - Record which groups of a split have been committed
+#   - Detect a partially applied split that can be resumed
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from gitta.git.diff_parser import DiffGroup, FileDiff
+from gitta.git.repository import GitRepository
+
+JOURNAL_FILENAME = "journal.json"
+JOURNAL_VERSION = 1
+
+# Staged trees remembered; older entries are dropped
+MAX_TREES = 20
+
+_lock = threading.Lock()
+
+
+def _journal_path() -> Path:
+    return Path(GitRepository.get_git_common_dir()) / "gitta" / JOURNAL_FILENAME
+
+
+def _empty_journal() -> dict:
+    return {"version": JOURNAL_VERSION, "trees": {}, "split": None}
+
+
+def _load() -> dict:
+    try:
+        data = json.loads(_journal_path().read_text())
+    except (OSError, ValueError):
+        return _empty_journal()
+    if data.get("version") != JOURNAL_VERSION:
+        return _empty_journal()
+    return data
+
+
+def _save(data: dict) -> None:
+    path = _journal_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so an interrupted write never corrupts the journal
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def group_key(group: DiffGroup) -> str:
+    """Content hash of a group: its scope, files and diff."""
+    h = hashlib.sha256()
+    h.update(group.scope.encode())
+    h.update(b"\0".join(f.encode() for f in group.files))
+    h.update(b"\0")
+    h.update(group.combined_diff.encode())
+    return h.hexdigest()
+
+
+def _serialize(grouped: list[tuple[DiffGroup, str]]) -> list[dict]:
+    return [{"scope": g.scope, "files": g.files, "message": m} for g, m in grouped]
+
+
+def _deserialize(entries: list[dict], by_path: dict[str, FileDiff]) -> list[tuple[DiffGroup, str]]:
+    return [
+        (
+            DiffGroup(
+                scope=e["scope"],
+                files=e["files"],
+                file_diffs=[by_path[f] for f in e["files"] if f in by_path],
+            ),
+            e["message"],
+        )
+        for e in entries
+    ]
+
+
+class JobJournal:
+    """
+    Generated messages for one staged tree (`git write-tree`).
+
+    Every write goes straight to disk, so messages that completed before
+    an interruption are reused instead of regenerated.
+    """
+
+    def __init__(self, tree: str):
+        self.tree = tree
+
+    def _update(self, change) -> None:
+        with _lock:
+            data = _load()
+            entry = data["trees"].pop(self.tree, None) or {"messages": {}, "result": None}
+            change(entry)
+            entry["updated"] = time.time()
+            # Re-inserting keeps the most recently used trees last
+            data["trees"][self.tree] = entry
+            while len(data["trees"]) > MAX_TREES:
+                data["trees"].pop(next(iter(data["trees"])))
+            _save(data)
+
+    def _entry(self) -> dict:
+        return _load()["trees"].get(self.tree) or {"messages": {}, "result": None}
+
+    def get_message(self, group: DiffGroup) -> str | None:
+        """
+        The message recorded for group, if any.
+
+        The content hash alone identifies the group, so messages recorded
+        under other trees (e.g. before part of a split was committed) are
+        used when this tree has none.
+        """
+        key = group_key(group)
+        trees = _load()["trees"]
+        entry = trees.get(self.tree)
+        if entry and key in entry["messages"]:
+            return entry["messages"][key]
+        for entry in reversed(trees.values()):
+            if key in entry["messages"]:
+                return entry["messages"][key]
+        return None
+
+    def record_message(self, group: DiffGroup, message: str) -> None:
+        """Record a completed group message (safe to call from worker threads)."""
+        self._update(lambda entry: entry["messages"].__setitem__(group_key(group), message))
+
+    def get_result(self, by_path: dict[str, FileDiff]) -> list[tuple[DiffGroup, str]] | None:
+        """
+        The complete grouping recorded for this tree, if any.
+
+        Args:
+            by_path: Per-file diffs, used to rebuild each group's diff.
+
+        Returns:
+            List of (group, message) tuples, or None if the recorded
+            grouping does not cover exactly the given files.
+        """
+        result = self._entry()["result"]
+        if not result:
+            return None
+        files = [f for e in result for f in e["files"]]
+        if sorted(files) != sorted(by_path):
+            return None
+        return _deserialize(result, by_path)
+
+    def record_result(self, grouped: list[tuple[DiffGroup, str]]) -> None:
+        """Record the complete grouping and messages for this tree."""
+        result = _serialize(grouped)
+        self._update(lambda entry: entry.__setitem__("result", result))
+
+
+def start_split(tree: str, grouped: list[tuple[DiffGroup, str]]) -> None:
+    """Record that the groups of tree are about to be committed one by one."""
+    with _lock:
+        data = _load()
+        data["split"] = {
+            "tree": tree,
+            "head": GitRepository.get_head_sha(),
+            "groups": _serialize(grouped),
+            "committed": 0,
+        }
+        _save(data)
+
+
+def record_split_commit(committed: int) -> None:
+    """Record that the first `committed` groups of the current split are committed."""
+    with _lock:
+        data = _load()
+        if data["split"]:
+            data["split"]["committed"] = committed
+            data["split"]["head"] = GitRepository.get_head_sha()
+            _save(data)
+
+
+def finish_split() -> None:
+    """Forget the current split (completed or abandoned)."""
+    with _lock:
+        data = _load()
+        if data["split"]:
+            data["split"] = None
+            _save(data)
+
+
+def load_pending_split() -> tuple[str, list[tuple[DiffGroup, str]], int] | None:
+    """
+    Find a split that was interrupted part way through.
+
+    A split is only resumable while HEAD is still the last commit it made;
+    any other commit in between means the history moved on without it.
+
+    Returns:
+        (tree, all (group, message) tuples, number committed), or None.
+    """
+    split = _load()["split"]
+    if not split or split["committed"] >= len(split["groups"]):
+        return None
+    try:
+        if GitRepository.get_head_sha() != split["head"]:
+            return None
+    except RuntimeError:
+        return None
+    return split["tree"], _deserialize(split["groups"], {}), split["committed"]
@@ -0,0 +1,69 @@
+# core/pr_service.py
+# Purpose: Prepare the title and description of a branch's pull request.
+#
+# Responsibilities:
+#   - Reuse a description already prepared for the branch and head SHA
+#   - Gather commits, stat and diff vs the base branch
+#   - Generate the description and cache it by head SHA
+
+from gitta.ai.budget import exceeds_budget
+from gitta.ai.client import AIClient
+from gitta.ai.tokens import get_prompt_budget
+from gitta.config.settings import get_settings
+from gitta.core.artifacts import load_artifact, save_artifact
+from gitta.git.repository import GitRepository
+
+
+def load_pr_description(base: str, branch: str, head_sha: str) -> dict | None:
+    """
+    Return the description prepared for branch at head_sha against base.
+
+    The cached value holds "title", "body" and "truncated". A description
+    prepared for another base or branch is ignored.
+    """
+    cached = load_artifact(head_sha, "pr")
+    if cached and cached.get("base") == base and cached.get("branch") == branch:
+        return cached
+    return None
+
+
+def save_pr_description(base: str, branch: str, head_sha: str, title: str, body: str, truncated: bool = False) -> None:
+    """Cache a (possibly edited) description, for `gitta pr` and `gitta merge --squash`."""
+    save_artifact(
+        head_sha,
+        "pr",
+        {"base": base, "branch": branch, "title": title, "body": body, "truncated": truncated},
+    )
+
+
+def prepare_pr_description(base: str, branch: str, head_sha: str) -> dict | None:
+    """
+    Generate and cache the PR description for branch at head_sha.
+
+    Args:
+        base: The base branch the PR merges into.
+        branch: The PR's branch.
+        head_sha: The branch's head commit.
+
+    Returns:
+        The cached value (see load_pr_description), or None when the
+        branch has no commits beyond base.
+
+    Raises:
+        RuntimeError: If the branch history cannot be read.
+    """
+    commits = GitRepository.get_commits_between(base, head_sha)
+    if not commits:
+        return None
+    stat = GitRepository.get_diff_stat(base, head_sha)
+    diff = GitRepository.get_diff_between(base, head_sha)
+
+    # The client fits commits, stat and diff into the prompt budget together,
+    # summarizing the log and stat before cutting the diff
+    budget = get_prompt_budget(get_settings())
+    diff = diff[:budget.max_chars]
+    truncated = exceeds_budget(budget, commits, stat, diff)
+
+    title, body = AIClient().generate_pr_description(branch=branch, commits=commits, stat=stat, diff=diff)
+    save_pr_description(base, branch, head_sha, title, body, truncated)
+    return {"base": base, "branch": branch, "title": title, "body": body, "truncated": truncated}
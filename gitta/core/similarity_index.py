@@ -0,0 +1,271 @@
+# core/similarity_index.py
+# Purpose: Find past commits whose diffs closely match the staged diff.
+#
+# Responsibilities:
+#   - Normalize diffs and compute MinHash signatures
+#   - Store signatures in LSH buckets (SQLite under .git/gitta/)
+#   - Index history incrementally from the last indexed SHA
+#   - Look up the most similar past commit in sublinear time
+#   - Adapt version numbers in a reused message to the new diff
+
+import hashlib
+import json
+import re
+import sqlite3
+from pathlib import Path
+
+from gitta.git.repository import GitRepository
+
+INDEX_FILENAME = "similarity.sqlite3"
+INDEX_VERSION = "1"
+
+# MinHash signature of NUM_PERM values split into BANDS bands for LSH.
+# 16 bands x 4 rows puts a 0.5-similar pair in a shared bucket ~65% of the
+# time and a 0.9-similar pair >99.9% of the time.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Shingles per diff are capped so huge diffs stay cheap to sign
+MAX_SHINGLES = 5000
+SHINGLE_SIZE = 3
+MAX_TOKENS = MAX_SHINGLES * 4
+
+# First build reads only this many recent commits; later runs are incremental
+INITIAL_INDEX_COMMITS = 1000
+
+# Newest commits read by one incremental update (it runs inside `gitta
+# commit`); after a larger pull the older new commits are skipped
+INCREMENTAL_INDEX_COMMITS = 200
+
+# Patch characters kept per commit; more than MAX_TOKENS ever needs
+MAX_PATCH_CHARS = MAX_TOKENS * 8
+
+_DENSIFY_STEP = 1 << 58
+
+_HEX_RE = re.compile(r"\b[0-9a-f]{7,40}\b")
+_NUM_RE = re.compile(r"\d+")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_VERSION_RE = re.compile(r"\d+(?:\.\d+)+")
+
+
+def normalize_diff(diff: str) -> list[str]:
+    """
+    Reduce a diff to tokens that describe the change, not its specifics.
+
+    Only changed lines and file names are kept; hashes and numbers are
+    replaced with placeholders so version bumps and regenerated files
+    look alike.
+    """
+    tokens: list[str] = []
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            tokens.append("FILE:" + line.rsplit("/", 1)[-1])
+        elif line.startswith(("+++", "---")):
+            continue
+        elif line.startswith(("+", "-")):
+            text = _HEX_RE.sub("H", line[1:].lower())
+            text = _NUM_RE.sub("0", text)
+            tokens.append(line[0])
+            tokens.extend(_TOKEN_RE.findall(text))
+        if len(tokens) >= MAX_TOKENS:
+            break
+    return tokens
+
+
+def added_versions(diff: str) -> list[str]:
+    """Version-like tokens (e.g. 1.2.3) on added lines, in diff order."""
+    versions = []
+    for line in diff.splitlines():
+        if line.startswith("+") and not line.startswith("+++"):
+            versions.extend(_VERSION_RE.findall(line))
+    return versions
+
+
+def adapt_message(message: str, old_versions: list[str], new_versions: list[str]) -> str:
+    """
+    Rewrite version numbers in a past message to match the new diff.
+
+    Versions are paired by position, so this only applies when both diffs
+    add the same number of version tokens (e.g. the same dependency bump).
+    """
+    if not old_versions or len(old_versions) != len(new_versions):
+        return message
+
+    mapping = dict(zip(old_versions, new_versions))
+    return _VERSION_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), message)
+
+
+def minhash(tokens: list[str]) -> list[int] | None:
+    """
+    Compute a MinHash signature of a token list, or None if it is empty.
+
+    Uses one-permutation hashing: each shingle is hashed once and the hash
+    picks one of NUM_PERM bins, keeping the minimum per bin. Empty bins are
+    filled from the next non-empty bin (rotation densification). This is
+    O(shingles) instead of O(shingles x NUM_PERM).
+    """
+    shingles = set()
+    for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1)):
+        shingles.add(" ".join(tokens[i:i + SHINGLE_SIZE]))
+        if len(shingles) >= MAX_SHINGLES:
+            break
+    shingles.discard("")
+    if not shingles:
+        return None
+
+    bins: list[int | None] = [None] * NUM_PERM
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        slot, value = h % NUM_PERM, h // NUM_PERM
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+
+    signature = []
+    for slot in range(NUM_PERM):
+        offset = 0
+        while bins[(slot + offset) % NUM_PERM] is None:
+            offset += 1
+        # Offset keeps borrowed values distinct from the donor bin's own
+        signature.append(bins[(slot + offset) % NUM_PERM] + offset * _DENSIFY_STEP)
+    return signature
+
+
+def _band_keys(signature: list[int]) -> list[str]:
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def _similarity(a: list[int], b: list[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _encode(signature: list[int]) -> bytes:
+    return b"".join(v.to_bytes(8, "little") for v in signature)
+
+
+def _decode(blob: bytes) -> list[int]:
+    return [int.from_bytes(blob[i:i + 8], "little") for i in range(0, len(blob), 8)]
+
+
+def _connect() -> sqlite3.Connection:
+    path = Path(GitRepository.get_git_common_dir()) / "gitta" / INDEX_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    # Rebuild from scratch when the on-disk layout is from another version
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    if not row or row[0] != INDEX_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS commits; DROP TABLE IF EXISTS buckets; DELETE FROM meta;")
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (INDEX_VERSION,))
+        conn.commit()
+
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS commits (sha TEXT PRIMARY KEY, message TEXT, signature BLOB, versions TEXT);
+        CREATE TABLE IF NOT EXISTS buckets (band_key TEXT, sha TEXT);
+        CREATE INDEX IF NOT EXISTS buckets_by_key ON buckets (band_key);
+        """
+    )
+    return conn
+
+
+def update_similarity_index(max_commits: int | None = None) -> int:
+    """
+    Index commits added since the last run.
+
+    An incremental update reads at most the INCREMENTAL_INDEX_COMMITS
+    newest commits, so a large pull never stalls the commit it runs in;
+    `gitta index` rebuilds deeper history.
+
+    Args:
+        max_commits: Cap for a (re)build; defaults to INITIAL_INDEX_COMMITS.
+
+    Returns:
+        The number of commits added.
+    """
+    try:
+        head = GitRepository.get_head_sha()
+    except RuntimeError:
+        return 0
+
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'head'").fetchone()
+        last = row[0] if row else None
+        if last == head and max_commits is None:
+            return 0
+
+        if last and max_commits is None and GitRepository.is_ancestor(last):
+            commits = GitRepository.iter_commit_patches(
+                f"{last}..{head}", max_count=INCREMENTAL_INDEX_COMMITS, max_patch_chars=MAX_PATCH_CHARS
+            )
+        else:
+            conn.executescript("DELETE FROM commits; DELETE FROM buckets;")
+            commits = GitRepository.iter_commit_patches(
+                head, max_count=max_commits or INITIAL_INDEX_COMMITS, max_patch_chars=MAX_PATCH_CHARS
+            )
+
+        added = 0
+        for sha, message, patch in commits:
+            signature = minhash(normalize_diff(patch))
+            if signature is None or not message:
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?)",
+                (sha, message, _encode(signature), json.dumps(added_versions(patch))),
+            )
+            conn.executemany("INSERT INTO buckets VALUES (?, ?)", [(key, sha) for key in _band_keys(signature)])
+            added += 1
+
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('head', ?)", (head,))
+        conn.commit()
+        return added
+    finally:
+        conn.close()
+
+
+def find_similar_commit(diff: str, min_similarity: float) -> tuple[str, str, float] | None:
+    """
+    Find the indexed commit whose diff is most similar to diff.
+
+    Only commits sharing at least one LSH bucket are compared, so lookup
+    cost depends on the number of near neighbours, not the history size.
+
+    Returns:
+        (sha, message, similarity) of the best match at or above
+        min_similarity, or None. Version numbers in the message are
+        adapted to the new diff where they can be paired up.
+    """
+    signature = minhash(normalize_diff(diff))
+    if signature is None:
+        return None
+
+    conn = _connect()
+    try:
+        keys = _band_keys(signature)
+        placeholders = ",".join("?" * len(keys))
+        rows = conn.execute(
+            f"SELECT c.sha, c.message, c.signature, c.versions FROM commits c "
+            f"WHERE c.sha IN (SELECT DISTINCT sha FROM buckets WHERE band_key IN ({placeholders}))",
+            keys,
+        ).fetchall()
+    finally:
+        conn.close()
+
+    best = None
+    for sha, message, blob, versions in rows:
+        score = _similarity(signature, _decode(blob))
+        if score >= min_similarity and (best is None or score > best[2]):
+            best = (sha, message, score, versions)
+
+    if best is None:
+        return None
+
+    sha, message, score, versions = best
+    return sha, adapt_message(message, json.loads(versions), added_versions(diff)), score
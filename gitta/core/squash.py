@@ -0,0 +1,57 @@
+# core/squash.py
+# Purpose: Prepare the commit message for squash-merging a branch.
+#
+# Responsibilities:
+#   - Reuse a squash message already generated for the head SHA
+#   - Build the prompt from cached PR descriptions and explanations
+#     when available, falling back to the diff
+#   - Cache the result by head SHA
+
+from gitta.ai.client import AIClient
+from gitta.ai.tokens import get_prompt_budget
+from gitta.config.settings import get_settings
+from gitta.core.artifacts import load_artifact, save_artifact
+from gitta.git.repository import GitRepository
+
+
+def prepare_squash_message(base: str, head_sha: str) -> tuple[str, str]:
+    """
+    Return the squash commit (subject, body) for merging head_sha into base.
+
+    A message cached for head_sha is returned without a request, so it is
+    only regenerated once the branch head moves. A PR description or
+    explanation cached for the same SHA replaces the (much larger) diff
+    in the prompt.
+
+    Args:
+        base: The base branch the PR merges into.
+        head_sha: The PR's head commit.
+
+    Raises:
+        RuntimeError: If the branch history cannot be read locally.
+    """
+    cached = load_artifact(head_sha, "squash")
+    if cached:
+        return cached["subject"], cached["body"]
+
+    # The base branch may only exist as a remote-tracking branch locally
+    if not GitRepository.ref_exists(base) and GitRepository.ref_exists(f"origin/{base}"):
+        base = f"origin/{base}"
+
+    commits = GitRepository.get_commits_between(base, head_sha)
+    stat = GitRepository.get_diff_stat(base, head_sha)
+
+    details = []
+    pr = load_artifact(head_sha, "pr")
+    if pr:
+        details.append(f"Pull request description:\n{pr['title']}\n\n{pr['body']}")
+    explanation = load_artifact(head_sha, "explanation")
+    if explanation:
+        details.append(f"Explanation of the change:\n{explanation}")
+    if not details:
+        diff = GitRepository.get_diff_between(base, head_sha)
+        details.append(f"Diff:\n{get_prompt_budget(get_settings()).cut(diff)}")
+
+    subject, body = AIClient().generate_squash_message(commits, stat, "\n\n".join(details))
+    save_artifact(head_sha, "squash", {"subject": subject, "body": body})
+    return subject, body
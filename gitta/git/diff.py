@@ -2,30 +2,41 @@
 # Purpose: Retrieve git diffs.
 #
 # Responsibilities:
-#   - Get staged diff
+#   - Get staged diff (rename/copy aware)
 #   - Get last commit diff
 
-import subprocess
+from gitta.config.settings import get_settings
+from gitta.ai.tokens import PromptBudget, get_prompt_budget
+from gitta.git.diff_parser import compact_renames
+from gitta.git.repository import GitRepository
 
-from gitta.constants import DEFAULT_MAX_DIFF_CHARS
 
+def find_renames_args() -> list[str]:
+    """Rename and copy detection options (-M/-C) at the configured thresholds."""
+    settings = get_settings()
+    return [f"-M{settings.rename_threshold}%", f"-C{settings.copy_threshold}%"]
 
-def get_staged_diff(max_chars: int = DEFAULT_MAX_DIFF_CHARS) -> tuple[str, bool]:
+
+def get_staged_diff(budget: PromptBudget | None = None) -> tuple[str, bool]:
     """
     Get the diff of staged changes, truncating if too large.
 
+    Renames and copies are detected, and pure ones are compacted to one
+    line each, so moving files costs almost none of the budget. The diff
+    is measured while it streams from git and reading stops at the budget.
+    Full blob IDs are kept, so per-file results can be cached by content.
+
+    Args:
+        budget: Size limit; defaults to the configured prompt budget.
+
     Returns:
         tuple: (diff_text, was_truncated)
     """
-    result = subprocess.run(
-        ["git", "diff", "--cached"],
-        capture_output=True,
-        text=True
+    budget = budget or get_prompt_budget(get_settings())
+    return GitRepository.read_diff_index(
+        ["--cached", "-p", "--full-index"] + find_renames_args(),
+        budget.limit,
+        compact_renames,
+        budget.measure,
+        budget.cut,
     )
-    if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip())
-
-    diff = result.stdout.strip()
-    if len(diff) > max_chars:
-        return diff[:max_chars], True
-    return diff, False
\ No newline at end of file
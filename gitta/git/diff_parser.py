@@ -2,53 +2,240 @@
 # Purpose: Parse and group unified diffs by file and module.
 #
 # Responsibilities:
-#   - Split a raw unified diff into per-file chunks
+#   - Split a raw unified diff into per-file chunks (spans of the diff, not copies)
+#   - Parse rename/copy headers and compact pure renames to one line
 #   - Group file diffs by top-level directory (module/scope)
 
 import re
-from dataclasses import dataclass, field
+from collections.abc import Iterable, Iterator
 from pathlib import PurePosixPath
 
 
-@dataclass
 class FileDiff:
-    file_path: str
-    diff_text: str
+    """
+    One file's section of a unified diff.
+
+    The text is not copied out of the diff it came from: a FileDiff keeps
+    a reference to that buffer and the span of its section, and diff_text
+    slices it on demand.
+
+    status is "modified", "added", "deleted", "renamed" or "copied";
+    renames and copies also carry the source path and git's similarity
+    index (percent). blob_key is the `old..new` object IDs from the
+    section's `index` line, which identify the change by content.
+    """
+
+    __slots__ = ("file_path", "_source", "_start", "_end", "status", "old_path", "similarity", "blob_key")
+
+    def __init__(
+        self,
+        file_path: str,
+        source: str,
+        start: int = 0,
+        end: int | None = None,
+        status: str = "modified",
+        old_path: str | None = None,
+        similarity: int | None = None,
+        blob_key: str | None = None,
+    ):
+        self.file_path = file_path
+        self._source = source
+        self._start = start
+        self._end = len(source) if end is None else end
+        self.status = status
+        self.old_path = old_path
+        self.similarity = similarity
+        self.blob_key = blob_key
+
+    def __repr__(self) -> str:
+        if self.old_path:
+            return f"FileDiff(file_path={self.file_path!r}, {self.status} from {self.old_path!r}, size={self.size})"
+        return f"FileDiff(file_path={self.file_path!r}, {self.status}, size={self.size})"
+
+    @property
+    def diff_text(self) -> str:
+        # A span covering the whole buffer returns the buffer itself, not a copy
+        return self._source[self._start:self._end]
+
+    @property
+    def size(self) -> int:
+        """Length of diff_text, without building it."""
+        return self._end - self._start
+
+    def head(self, max_chars: int) -> "FileDiff":
+        """The same section cut to its first max_chars characters."""
+        return FileDiff(
+            self.file_path,
+            self._source,
+            self._start,
+            min(self._end, self._start + max_chars),
+            self.status,
+            self.old_path,
+            self.similarity,
+            self.blob_key,
+        )
 
 
-@dataclass
 class DiffGroup:
-    scope: str
-    files: list[str] = field(default_factory=list)
-    combined_diff: str = ""
+    """
+    Files committed together, with their diffs.
+
+    combined_diff is rendered from the member FileDiffs each time it is
+    read; call release() once prompts are built so the group no longer
+    keeps the original diff alive.
+    """
+
+    __slots__ = ("scope", "files", "_file_diffs")
+
+    def __init__(self, scope: str, files: list[str] | None = None, file_diffs: list[FileDiff] | None = None):
+        self.scope = scope
+        self._file_diffs = list(file_diffs or [])
+        self.files = list(files) if files is not None else [fd.file_path for fd in self._file_diffs]
+
+    def __repr__(self) -> str:
+        return f"DiffGroup(scope={self.scope!r}, files={self.files!r})"
+
+    def add(self, file_diff: FileDiff) -> None:
+        """Append a file and its diff to the group."""
+        self.files.append(file_diff.file_path)
+        self._file_diffs.append(file_diff)
+
+    @property
+    def combined_diff(self) -> str:
+        return "\n".join(fd.diff_text for fd in self._file_diffs)
+
+    @property
+    def size(self) -> int:
+        """Length of combined_diff, without building it."""
+        return sum(fd.size for fd in self._file_diffs) + max(len(self._file_diffs) - 1, 0)
+
+    def release(self) -> None:
+        """Drop the diff references; scope and files stay usable."""
+        self._file_diffs = []
 
 
-# Matches lines like: diff --git a/foo/bar.py b/foo/bar.py
-DIFF_HEADER_RE = re.compile(r"^diff --git a/.+ b/(.+)$", re.MULTILINE)
+# Starts a file section: a `diff --git a/foo b/bar` header, or the one-line
+# summary compact_renames() writes for a pure rename or copy
+SECTION_RE = re.compile(r"^(?:diff --git a/.+ b/(.+)|(rename|copy) (.+) => (.+))$", re.MULTILINE)
+
+# Extended header lines between `diff --git` and the first hunk
+SIMILARITY_RE = re.compile(r"^similarity index (\d+)%$", re.MULTILINE)
+SOURCE_RE = re.compile(r"^(rename|copy) from (.+)$", re.MULTILINE)
+ADDED_RE = re.compile(r"^new file mode ", re.MULTILINE)
+DELETED_RE = re.compile(r"^deleted file mode ", re.MULTILINE)
+BLOBS_RE = re.compile(r"^index ([0-9a-f]+\.\.[0-9a-f]+)", re.MULTILINE)
+
+# Lines that end a section's extended header
+CONTENT_PREFIXES = ("@@", "--- ", "Binary files ", "GIT binary patch")
+
+MOVE_STATUS = {"rename": "renamed", "copy": "copied"}
 
 
 def parse_diff_by_file(raw_diff: str) -> list[FileDiff]:
     """Split a unified diff string into per-file chunks.
 
     Each chunk includes the diff header and all hunks for that file.
-    The file path is extracted from the 'b/' side of the header.
+    The file path is extracted from the 'b/' side of the header, and
+    rename/copy headers are parsed into status, old_path and similarity.
+    Chunks are spans of raw_diff, so no text is copied.
     """
-    matches = list(DIFF_HEADER_RE.finditer(raw_diff))
+    matches = list(SECTION_RE.finditer(raw_diff))
 
     if not matches:
         return []
 
     file_diffs = []
     for i, match in enumerate(matches):
-        file_path = match.group(1)
         start = match.start()
         end = matches[i + 1].start() if i + 1 < len(matches) else len(raw_diff)
-        diff_text = raw_diff[start:end].rstrip("\n")
-        file_diffs.append(FileDiff(file_path=file_path, diff_text=diff_text))
+        # Same as rstrip("\n") on the chunk, without building it
+        while end > start and raw_diff[end - 1] == "\n":
+            end -= 1
+
+        if match.group(2):
+            # Compacted pure rename/copy
+            fd = FileDiff(match.group(4), raw_diff, start, end, MOVE_STATUS[match.group(2)], match.group(3), 100)
+        else:
+            fd = FileDiff(match.group(1), raw_diff, start, end)
+            _parse_header(fd, raw_diff, start, _header_end(raw_diff, start, end))
+        file_diffs.append(fd)
 
     return file_diffs
 
 
+def _header_end(raw_diff: str, start: int, end: int) -> int:
+    """Offset where a section's extended header ends (its first content line)."""
+    ends = [raw_diff.find(f"\n{prefix}", start, end) for prefix in CONTENT_PREFIXES]
+    return min((e for e in ends if e != -1), default=end)
+
+
+def _parse_header(fd: FileDiff, raw_diff: str, start: int, end: int) -> None:
+    """Fill fd's status, old_path, similarity and blob_key from the header lines in raw_diff[start:end]."""
+    blobs = BLOBS_RE.search(raw_diff, start, end)
+    if blobs:
+        fd.blob_key = blobs.group(1)
+    source = SOURCE_RE.search(raw_diff, start, end)
+    if source:
+        fd.status = MOVE_STATUS[source.group(1)]
+        fd.old_path = source.group(2)
+        similarity = SIMILARITY_RE.search(raw_diff, start, end)
+        fd.similarity = int(similarity.group(1)) if similarity else None
+    elif ADDED_RE.search(raw_diff, start, end):
+        fd.status = "added"
+    elif DELETED_RE.search(raw_diff, start, end):
+        fd.status = "deleted"
+
+
+def compact_renames(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yield unified diff lines with every pure rename or copy on one line.
+
+    A section that only moves a file (100% similar, no mode change, no
+    hunks) becomes `rename old => new` (or `copy old => new`), which
+    parse_diff_by_file() still reads as a section. Everything else is
+    passed through unchanged.
+    """
+    header: list[str] | None = None
+
+    def flush() -> Iterator[str]:
+        summary = _move_summary(header) if header else None
+        if summary:
+            yield summary
+        elif header:
+            yield from header
+
+    for line in lines:
+        if line.startswith("diff --git "):
+            yield from flush()
+            header = [line]
+        elif header is not None and not line.startswith(CONTENT_PREFIXES):
+            header.append(line)
+        else:
+            if header is not None:
+                yield from header
+                header = None
+            yield line
+    yield from flush()
+
+
+def _move_summary(header: list[str]) -> str | None:
+    """The one-line form of a header-only section, if it is a pure rename or copy."""
+    if "similarity index 100%\n" not in header:
+        return None
+    source = target = kind = None
+    for line in header[1:]:
+        for prefix in ("rename", "copy"):
+            if line.startswith(f"{prefix} from "):
+                kind, source = prefix, line[len(prefix) + 6:].rstrip("\n")
+            elif line.startswith(f"{prefix} to "):
+                target = line[len(prefix) + 4:].rstrip("\n")
+        if line.startswith(("old mode ", "new mode ")):
+            return None
+    if not (kind and source and target):
+        return None
+    return f"{kind} {source} => {target}\n"
+
+
 def _find_scope_depth(file_diffs: list[FileDiff]) -> int:
     """Find the best path depth for grouping.
 
@@ -96,10 +283,6 @@ def group_diffs_by_module(file_diffs: list[FileDiff]) -> list[DiffGroup]:
         if scope not in groups:
             groups[scope] = DiffGroup(scope=scope)
 
-        groups[scope].files.append(fd.file_path)
-
-        if groups[scope].combined_diff:
-            groups[scope].combined_diff += "\n"
-        groups[scope].combined_diff += fd.diff_text
+        groups[scope].add(fd)
 
     return sorted(groups.values(), key=lambda g: g.scope)
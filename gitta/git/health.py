@@ -0,0 +1,188 @@
+# git/health.py
+# Purpose: Inspect repository settings that affect git performance.
+#
+# Responsibilities:
+#   - Detect missing commit-graph / stale multi-pack-index
+#   - Detect index and working-tree scan settings (untrackedCache, fsmonitor, manyFiles)
+#   - Time the git calls gitta itself makes
+#   - Measure what read-only plumbing saves over porcelain
+#   - Apply fixes on request
+
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from gitta.git.runner import run_git
+
+
+@dataclass
+class RepoCheck:
+    name: str
+    ok: bool
+    detail: str
+    fix_commands: list[list[str]] = field(default_factory=list)
+
+
+# The builtin fsmonitor daemon is only available on macOS and Windows
+FSMONITOR_PLATFORMS = ("darwin", "win32")
+
+# Runs per timed call; the fastest run is reported
+TIMING_RUNS = 3
+
+# Read-only plumbing used on gitta's query paths, and the porcelain
+# (taking optional locks) it replaced
+READ_PATH_CALLS = {
+    "staged files": (["diff-index", "--cached", "--name-only", "HEAD"], ["diff", "--cached", "--name-only"]),
+    "staged diff": (["diff-index", "--cached", "-p", "-M", "HEAD"], ["diff", "--cached"]),
+    "worktree diff": (["diff-index", "-p", "-M", "HEAD"], ["diff", "HEAD"]),
+    "commit diff": (["diff-tree", "-p", "-M", "--cc", "--root", "--no-commit-id", "HEAD"], ["show", "--format=", "HEAD"]),
+}
+
+
+def _config_value(key: str) -> str:
+    result = run_git(["config", "--get", key])
+    return result.stdout.strip().lower() if result.returncode == 0 else ""
+
+
+def _objects_dir() -> Path | None:
+    result = run_git(["rev-parse", "--git-common-dir"])
+    if result.returncode != 0:
+        return None
+    return Path(result.stdout.strip()).resolve() / "objects"
+
+
+def check_repo_health() -> list[RepoCheck]:
+    """
+    Inspect the current repository for settings that slow down git.
+
+    Returns:
+        One RepoCheck per setting, with the commands that would fix it.
+    """
+    objects = _objects_dir()
+    if objects is None:
+        return []
+
+    checks = []
+
+    # Commit-graph: speeds up log, merge-base and ahead/behind walks
+    info = objects / "info"
+    has_graph = (info / "commit-graph").exists() or (info / "commit-graphs").is_dir()
+    checks.append(RepoCheck(
+        name="commit-graph",
+        ok=has_graph,
+        detail="commit-graph file present" if has_graph else "no commit-graph file; history walks parse every commit",
+        fix_commands=[
+            ["commit-graph", "write", "--reachable", "--changed-paths"],
+            ["config", "fetch.writeCommitGraph", "true"],
+        ],
+    ))
+
+    # Multi-pack-index: stale when any pack is newer than the index
+    pack_dir = objects / "pack"
+    packs = list(pack_dir.glob("*.pack")) if pack_dir.is_dir() else []
+    midx = pack_dir / "multi-pack-index"
+    if len(packs) <= 1:
+        checks.append(RepoCheck("multi-pack-index", True, f"{len(packs)} pack file(s), not needed"))
+    elif not midx.exists():
+        checks.append(RepoCheck(
+            "multi-pack-index", False, f"{len(packs)} pack files and no multi-pack-index",
+            [["multi-pack-index", "write"]],
+        ))
+    else:
+        newest_pack = max(p.stat().st_mtime for p in packs)
+        stale = newest_pack > midx.stat().st_mtime
+        checks.append(RepoCheck(
+            "multi-pack-index", not stale,
+            "multi-pack-index is older than the newest pack" if stale else "multi-pack-index is up to date",
+            [["multi-pack-index", "write"]],
+        ))
+
+    # Untracked cache: avoids rescanning unchanged directories on add/status
+    untracked = _config_value("core.untrackedcache") == "true"
+    checks.append(RepoCheck(
+        "core.untrackedCache", untracked,
+        "enabled" if untracked else "disabled; every status/add rescans all directories",
+        [["config", "core.untrackedCache", "true"]],
+    ))
+
+    # Filesystem monitor: only offered where git ships the builtin daemon
+    if sys.platform in FSMONITOR_PLATFORMS:
+        fsmonitor = _config_value("core.fsmonitor") not in ("", "false")
+        checks.append(RepoCheck(
+            "core.fsmonitor", fsmonitor,
+            "enabled" if fsmonitor else "disabled; every status/add lstat()s the whole tree",
+            [["config", "core.fsmonitor", "true"]],
+        ))
+
+    # Index v4 / feature.manyFiles: smaller index, faster to read and write
+    many_files = _config_value("feature.manyfiles") == "true"
+    index_v4 = _config_value("index.version") == "4"
+    checks.append(RepoCheck(
+        "index.version 4", many_files or index_v4,
+        "enabled" if many_files or index_v4 else "feature.manyFiles and index.version 4 are not set",
+        [["config", "feature.manyFiles", "true"], ["update-index", "--index-version", "4"]],
+    ))
+
+    return checks
+
+
+def apply_fix(check: RepoCheck) -> None:
+    """
+    Run the fix commands for a failed check.
+
+    Raises:
+        RuntimeError: If any fix command fails.
+    """
+    for args in check.fix_commands:
+        result = run_git(args)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"git {' '.join(args)} failed")
+
+
+def time_git_calls(base: str | None = None) -> dict[str, float]:
+    """
+    Time the git calls gitta makes most often, in milliseconds.
+
+    Args:
+        base: Optional base branch to time the merge-base walk used by `gitta pr`.
+
+    Returns:
+        Mapping of call label to the fastest of TIMING_RUNS runs.
+    """
+    calls = {
+        "log -200": ["log", "-200", "--format=%h"],
+        "diff-index --cached --name-only": ["diff-index", "--cached", "--name-only", "HEAD"],
+        "status --porcelain": ["status", "--porcelain"],
+    }
+    if base:
+        calls[f"merge-base HEAD {base}"] = ["merge-base", "HEAD", base]
+
+    return {label: _best_time(args) for label, args in calls.items()}
+
+
+def time_read_paths() -> dict[str, dict[str, float]]:
+    """
+    Time gitta's read-only query calls against the porcelain they replaced.
+
+    Returns:
+        Mapping of call label to {"read_only_ms", "porcelain_ms"}.
+    """
+    return {
+        label: {
+            "read_only_ms": _best_time(plumbing),
+            "porcelain_ms": _best_time(porcelain, optional_locks=True),
+        }
+        for label, (plumbing, porcelain) in READ_PATH_CALLS.items()
+    }
+
+
+def _best_time(args: list[str], optional_locks: bool = False) -> float:
+    """Fastest of TIMING_RUNS runs of `git <args>`, in milliseconds."""
+    best = None
+    for _ in range(TIMING_RUNS):
+        start = time.perf_counter()
+        run_git(args, optional_locks=optional_locks)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
@@ -7,107 +7,163 @@
 #   - Commit
 #   - Push
 #   - Amend
+#   - Stream commit history
+#
+# Every command goes through gitta.git.runner.
 
 import subprocess
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+
+from gitta.git.runner import run_git, stream_git
+
+# Longest piece of a line read from git at once when streaming
+READ_CHUNK_CHARS = 1 << 16
 
 class GitRepository:
     
     @staticmethod
     def is_git_repo() -> bool:
-        result = subprocess.run(
-            ["git", "rev-parse", "--is-inside-work-tree"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["rev-parse", "--is-inside-work-tree"])
         return result.returncode == 0
     
     @staticmethod
     def get_staged_files() -> list[str]:
-        result = subprocess.run(
-            ["git", "diff", "--cached", "--name-only"],
-            capture_output=True,
-            text=True
-        )
+        result = GitRepository.diff_index(["--cached", "--name-only"])
         return [f for f in result.stdout.strip().split("\n") if f]
 
+    @staticmethod
+    def diff_index(args: list[str], paths: list[str] | None = None) -> subprocess.CompletedProcess:
+        """
+        Run `git diff-index <args> HEAD`, diffing against the empty tree before the first commit.
+
+        Plumbing works from the index's cached stat data and ignores
+        porcelain-only config (diff.noprefix, external diff, color), so it
+        is cheaper and its output is stable to parse.
+        """
+        tail = ["--"] + paths if paths else []
+        result = run_git(["diff-index"] + args + ["HEAD"] + tail)
+        if result.returncode != 0 and not GitRepository.has_commits():
+            result = run_git(["diff-index"] + args + [GitRepository._empty_tree()] + tail)
+        return result
+
+    @staticmethod
+    def read_diff_index(
+        args: list[str],
+        limit: int,
+        filter_lines: Callable[[Iterable[str]], Iterable[str]] | None = None,
+        measure: Callable[[str], int] = len,
+        cut: Callable[[str, int], str] | None = None,
+    ) -> tuple[str, bool]:
+        """
+        Read `git diff-index <args> HEAD` output up to a size limit.
+
+        The output is streamed and measured line by line, and git is
+        stopped once the limit is reached, so a huge diff is never held in
+        memory in full.
+
+        Args:
+            args: Arguments for diff-index.
+            limit: Maximum size of the returned text, in measure's unit.
+            filter_lines: Optional rewrite of the output lines, applied
+                before the limit (e.g. to compact them).
+            measure: Size of a piece of text; characters by default.
+            cut: Cuts text to a size in measure's unit; slicing by default.
+
+        Returns:
+            tuple: (stripped output, was_truncated)
+
+        Raises:
+            RuntimeError: If git fails.
+        """
+        base = "HEAD" if GitRepository.has_commits() else GitRepository._empty_tree()
+        with stream_git(["diff-index"] + args + [base], capture_stderr=True) as proc:
+            # Bounded reads, so even a single huge line is never read in full
+            lines = iter(partial(proc.stdout.readline, READ_CHUNK_CHARS), "")
+            if filter_lines:
+                lines = iter(filter_lines(lines))
+
+            parts: list[str] = []
+            size = 0
+            for line in lines:
+                parts.append(line)
+                size += measure(line)
+                if size > limit:
+                    text = "".join(parts).strip()
+                    # Any further line (even a blank context line) means the diff was cut
+                    truncated = measure(text) > limit or next(lines, "") != ""
+                    return (cut(text, limit) if cut else text[:limit]), truncated
+
+            stderr = proc.stderr.read()
+            if proc.wait() != 0:
+                raise RuntimeError(stderr.strip())
+        text = "".join(parts).strip()
+        # Token counts of separate lines need not add up to the whole's
+        if measure(text) > limit:
+            return (cut(text, limit) if cut else text[:limit]), True
+        return text, False
+
+    @staticmethod
+    def _empty_tree() -> str:
+        """ID of the empty tree, the diff base before the first commit."""
+        return run_git(["hash-object", "-t", "tree", "--stdin"], input="").stdout.strip()
+
+    @staticmethod
+    def ref_exists(ref: str) -> bool:
+        """Whether ref resolves to a commit."""
+        return run_git(["rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"]).returncode == 0
+
+    @staticmethod
+    def has_commits() -> bool:
+        """Whether HEAD points at a commit (false in a freshly initialized repo)."""
+        return run_git(["rev-parse", "--verify", "--quiet", "HEAD"]).returncode == 0
+
     @staticmethod
     def unstage_files(files: list[str]) -> None:
-        result = subprocess.run(
-            ["git", "reset", "HEAD", "--"] + files,
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["reset", "HEAD", "--"] + files)
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
 
     @staticmethod
     def stage_files(files: list[str]) -> None:
-        result = subprocess.run(
-            ["git", "add"] + files,
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["add"] + files)
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
 
     @staticmethod
     def commit(message: str) -> None:
-        result = subprocess.run(
-            ["git", "commit", "-m", message],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["commit", "-m", message])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
 
     @staticmethod
     def revert_last_commit() -> None:
-        result = subprocess.run(
-            ["git", "reset", "--soft", "HEAD~1"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["reset", "--soft", "HEAD~1"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
 
     @staticmethod
     def get_current_branch() -> str:
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["rev-parse", "--abbrev-ref", "HEAD"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
         return result.stdout.strip()
 
     @staticmethod
     def push() -> None:
-        result = subprocess.run(
-            ["git", "push"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["push"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
 
     @staticmethod
     def get_default_branch() -> str:
         """Detect the default branch (main or master)."""
-        result = subprocess.run(
-            ["git", "symbolic-ref", "refs/remotes/origin/HEAD"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["symbolic-ref", "refs/remotes/origin/HEAD"])
         if result.returncode == 0:
             return result.stdout.strip().split("/")[-1]
 
         for branch in ["main", "master"]:
-            check = subprocess.run(
-                ["git", "rev-parse", "--verify", f"refs/heads/{branch}"],
-                capture_output=True,
-                text=True
-            )
+            check = run_git(["rev-parse", "--verify", f"refs/heads/{branch}"])
             if check.returncode == 0:
                 return branch
 
@@ -116,11 +172,7 @@ class GitRepository:
     @staticmethod
     def get_commits_between(base: str, head: str = "HEAD") -> str:
         """Get commit log between base and head."""
-        result = subprocess.run(
-            ["git", "log", "--oneline", f"{base}..{head}"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["log", "--oneline", f"{base}..{head}"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
         return result.stdout.strip()
@@ -128,11 +180,7 @@ class GitRepository:
     @staticmethod
     def get_diff_between(base: str, head: str = "HEAD") -> str:
         """Get the full diff between base and head."""
-        result = subprocess.run(
-            ["git", "diff", f"{base}...{head}"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["diff", f"{base}...{head}"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
         return result.stdout.strip()
@@ -140,11 +188,7 @@ class GitRepository:
     @staticmethod
     def get_diff_stat(base: str, head: str = "HEAD") -> str:
         """Get a compact diffstat summary between base and head."""
-        result = subprocess.run(
-            ["git", "diff", "--stat", f"{base}...{head}"],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["diff", "--stat", f"{base}...{head}"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
         return result.stdout.strip()
@@ -152,10 +196,191 @@ class GitRepository:
     @staticmethod
     def push_with_upstream(branch: str) -> None:
         """Push and set upstream tracking."""
-        result = subprocess.run(
-            ["git", "push", "-u", "origin", branch],
-            capture_output=True,
-            text=True
-        )
+        result = run_git(["push", "-u", "origin", branch])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+    @staticmethod
+    def iter_log(
+        count: int,
+        since: str | None = None,
+        author: str | None = None,
+        paths: list[str] | None = None,
+    ) -> Iterator[tuple[str, str, str, str]]:
+        """
+        Stream (hash, subject, author, relative date) records from git log.
+
+        Records are yielded as git produces them, so callers can render the
+        first entries before the rest of the history has been read. Fields
+        are NUL-separated, so one split per line parses a record safely.
+        """
+        args = ["log", f"-{count}", "--pretty=format:%h%x00%s%x00%an%x00%ar"]
+        if since:
+            args.append(f"--since={since}")
+        if author:
+            args.append(f"--author={author}")
+        if paths:
+            args += ["--"] + paths
+
+        with stream_git(args, capture_stderr=True) as proc:
+            for line in proc.stdout:
+                parts = line.rstrip("\n").split("\x00")
+                if len(parts) == 4:
+                    yield parts[0], parts[1], parts[2], parts[3]
+            stderr = proc.stderr.read()
+            if proc.wait() != 0:
+                raise RuntimeError(stderr.strip())
+
+    @staticmethod
+    def get_hooks_dir() -> str:
+        """Get the hooks directory, honouring core.hooksPath."""
+        result = run_git(["rev-parse", "--git-path", "hooks"])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+    @staticmethod
+    def get_git_common_dir() -> str:
+        """Get the .git directory shared by all worktrees of this repository."""
+        result = run_git(["rev-parse", "--path-format=absolute", "--git-common-dir"])
         if result.returncode != 0:
             raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+    @staticmethod
+    def get_head_sha() -> str:
+        """Get the full SHA of HEAD."""
+        result = run_git(["rev-parse", "HEAD"])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+    @staticmethod
+    def write_tree() -> str:
+        """Write the index as a tree object and return its SHA."""
+        result = run_git(["write-tree"])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+    @staticmethod
+    def get_renamed_paths(tree: str, find_args: list[str]) -> dict[str, str]:
+        """
+        Map each file renamed between HEAD and tree to its old path.
+
+        Args:
+            tree: A tree ID, e.g. from write_tree().
+            find_args: Rename detection options, e.g. ["-M50%"].
+        """
+        base = "HEAD" if GitRepository.has_commits() else GitRepository._empty_tree()
+        result = run_git(["diff-tree", "-r", "-z", "--name-status"] + find_args + [base, tree])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+        # -z output: status NUL path [NUL new path for renames/copies] NUL ...
+        fields = result.stdout.split("\0")
+        renamed = {}
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            if status[:1] in ("R", "C"):
+                if status[0] == "R":
+                    renamed[fields[i + 2]] = fields[i + 1]
+                i += 3
+            else:
+                i += 2
+        return renamed
+
+    @staticmethod
+    def stage_from_tree(tree: str, files: list[str]) -> None:
+        """Set the index entries of files to their content in tree (removing files absent from it)."""
+        result = run_git(["reset", "-q", tree, "--"] + files)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+    @staticmethod
+    def is_ancestor(ancestor: str, descendant: str = "HEAD") -> bool:
+        """Check whether ancestor is reachable from descendant."""
+        result = run_git(["merge-base", "--is-ancestor", ancestor, descendant])
+        return result.returncode == 0
+
+    @staticmethod
+    def iter_commit_files(revision_range: str, max_count: int | None = None) -> Iterator[tuple[str, str, list[str]]]:
+        """
+        Stream (sha, subject, changed files) for non-merge commits, newest first.
+
+        Args:
+            revision_range: e.g. "HEAD" or "<sha>..HEAD".
+            max_count: Optional cap on the number of commits read.
+        """
+        args = ["log", "--no-merges", "--format=%x01%H%x00%s", "--name-only"]
+        if max_count:
+            args.append(f"-{max_count}")
+        args.append(revision_range)
+
+        current = None
+        with stream_git(args) as proc:
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                if line.startswith("\x01"):
+                    if current:
+                        yield current
+                    sha, _, subject = line[1:].partition("\x00")
+                    current = (sha, subject, [])
+                elif line and current:
+                    current[2].append(line)
+            if current:
+                yield current
+            if proc.wait() != 0:
+                raise RuntimeError(f"git log {revision_range} failed")
+
+    @staticmethod
+    def iter_commit_patches(
+        revision_range: str,
+        max_count: int | None = None,
+        max_patch_chars: int | None = None,
+    ) -> Iterator[tuple[str, str, str]]:
+        """
+        Stream (sha, full message, patch) for non-merge commits, newest first.
+
+        The whole range is read from a single `git log -p` process.
+
+        Args:
+            revision_range: e.g. "HEAD" or "<sha>..HEAD".
+            max_count: Optional cap on the number of commits read.
+            max_patch_chars: Optional cap on the patch kept per commit; the
+                rest of a huge patch is read past, never held in memory.
+        """
+        args = ["log", "-p", "--no-merges", "--no-color", "--format=%x01%H%x00%B%x02"]
+        if max_count:
+            args.append(f"-{max_count}")
+        args.append(revision_range)
+
+        sha = None
+        message_lines: list[str] = []
+        patch_lines: list[str] = []
+        patch_chars = 0
+        in_message = False
+        with stream_git(args) as proc:
+            for line in proc.stdout:
+                if line.startswith("\x01"):
+                    if sha:
+                        yield sha, "".join(message_lines).strip(), "".join(patch_lines)
+                    sha, _, rest = line[1:].partition("\x00")
+                    message_lines, patch_lines = [], []
+                    patch_chars = 0
+                    in_message = True
+                    line = rest
+                if in_message:
+                    if "\x02" in line:
+                        message_lines.append(line.split("\x02", 1)[0])
+                        in_message = False
+                    else:
+                        message_lines.append(line)
+                elif max_patch_chars is None or patch_chars < max_patch_chars:
+                    patch_lines.append(line)
+                    patch_chars += len(line)
+            if sha:
+                yield sha, "".join(message_lines).strip(), "".join(patch_lines)
+            if proc.wait() != 0:
+                raise RuntimeError(f"git log -p {revision_range} failed")
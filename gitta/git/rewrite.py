@@ -0,0 +1,134 @@
+# git/rewrite.py
+# Purpose: Rewrite commit messages of a range without an interactive rebase.
+#
+# Responsibilities:
+#   - Read every commit of a range (metadata and patch) from one git log stream
+#   - Recreate the commits with new messages by chaining git commit-tree
+#   - Move HEAD to the rewritten tip in one ref update
+
+from dataclasses import dataclass
+
+from gitta.git.runner import check_git, stream_git
+
+
+@dataclass
+class RangeCommit:
+    sha: str
+    parents: list[str]
+    tree: str
+    author_name: str
+    author_email: str
+    author_date: str
+    message: str
+    patch: str
+
+
+# Start of each record; fields are NUL-separated and the message ends at \x02
+_LOG_FORMAT = "%x01%H%x00%P%x00%T%x00%an%x00%ae%x00%ad%x00%B%x02"
+
+
+def read_range(revision_range: str) -> list[RangeCommit]:
+    """
+    Read the commits of revision_range, oldest first, with their patches.
+
+    Everything comes from a single `git log -p` process.
+
+    Raises:
+        RuntimeError: If the range is invalid, empty, contains merge
+            commits, or does not end at HEAD.
+    """
+    # Patches must be git's own, whatever diff drivers the user configured
+    args = ["log", "-p", "--no-ext-diff", "--reverse", "--no-color", "--date=raw", f"--format={_LOG_FORMAT}", revision_range]
+
+    commits: list[RangeCommit] = []
+    current: RangeCommit | None = None
+    message_lines: list[str] = []
+    patch_lines: list[str] = []
+    in_message = False
+
+    def finish() -> None:
+        if current:
+            current.message = "".join(message_lines).strip()
+            current.patch = "".join(patch_lines).strip()
+            commits.append(current)
+
+    with stream_git(args, capture_stderr=True) as proc:
+        for line in proc.stdout:
+            if line.startswith("\x01"):
+                finish()
+                sha, parents, tree, name, email, date, rest = line[1:].split("\x00", 6)
+                current = RangeCommit(sha, parents.split(), tree, name, email, date, "", "")
+                message_lines, patch_lines = [], []
+                in_message = True
+                line = rest
+            if in_message:
+                if "\x02" in line:
+                    message_lines.append(line.split("\x02", 1)[0])
+                    in_message = False
+                else:
+                    message_lines.append(line)
+            else:
+                patch_lines.append(line)
+        finish()
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(stderr.strip() or f"git log {revision_range} failed")
+
+    if not commits:
+        raise RuntimeError(f"No commits in range '{revision_range}'.")
+    if any(len(c.parents) > 1 for c in commits):
+        raise RuntimeError("The range contains merge commits, which reword cannot rewrite.")
+    if commits[-1].sha != check_git(["rev-parse", "HEAD"]).strip():
+        raise RuntimeError("The range must end at HEAD (e.g. main..HEAD).")
+    return commits
+
+
+def rewrite_messages(commits: list[RangeCommit], messages: dict[str, str]) -> str:
+    """
+    Recreate commits (oldest first) with new messages by chaining commit-tree.
+
+    Trees and authorship are kept; commits before the first changed
+    message are reused as they are. The committer becomes the current
+    user, as with a rebase.
+
+    Args:
+        commits: The range as returned by read_range().
+        messages: New message per original SHA; missing SHAs keep theirs.
+
+    Returns:
+        The SHA of the new tip.
+    """
+    rewritten: dict[str, str] = {}
+    tip = commits[-1].sha
+
+    for commit in commits:
+        parents = [rewritten.get(p, p) for p in commit.parents]
+        message = messages.get(commit.sha, commit.message)
+        if message == commit.message and parents == commit.parents:
+            tip = commit.sha
+            continue
+
+        args = ["commit-tree", commit.tree]
+        for parent in parents:
+            args += ["-p", parent]
+        tip = check_git(
+            args + ["-F", "-"],
+            input=message + "\n",
+            env={
+                "GIT_AUTHOR_NAME": commit.author_name,
+                "GIT_AUTHOR_EMAIL": commit.author_email,
+                "GIT_AUTHOR_DATE": commit.author_date,
+            },
+        ).strip()
+        rewritten[commit.sha] = tip
+
+    return tip
+
+
+def move_head(new_tip: str, old_tip: str) -> None:
+    """
+    Point HEAD's branch at new_tip, failing if it moved away from old_tip.
+
+    The trees are unchanged, so the index and working tree stay as they are.
+    """
+    check_git(["update-ref", "-m", "gitta reword", "HEAD", new_tip, old_tip])
@@ -0,0 +1,202 @@
+# git/runner.py
+# Purpose: Shared execution layer for every git command gitta runs.
+#
+# Responsibilities:
+#   - Run git with one environment setup (no optional locks, C locale, no pager)
+#   - Bound the number of concurrent git processes
+#   - Run commands on a thread pool and return futures
+#   - Stream long outputs from a managed subprocess
+#   - Record per-call timing
+#   - Refuse repository writes in read-only mode (query commands)
+
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from gitta.constants import GIT_MAX_WORKERS
+
+# Applied to every git process gitta starts
+GIT_ENV = {
+    # Never take optional locks (e.g. the index refresh in `git status`)
+    "GIT_OPTIONAL_LOCKS": "0",
+    # Stable, untranslated output for parsing
+    "LC_ALL": "C",
+    "GIT_PAGER": "cat",
+    "PAGER": "cat",
+}
+
+# Subcommands that modify the repository or index; refused in read-only mode
+WRITE_COMMANDS = frozenset({
+    "add", "am", "apply", "checkout", "cherry-pick", "commit", "commit-tree",
+    "gc", "maintenance", "merge", "mv", "pull", "push", "rebase", "reset",
+    "restore", "revert", "rm", "stash", "switch", "update-index", "update-ref",
+    "write-tree",
+})
+
+# Recent calls kept for timing reports
+MAX_RECORDED_CALLS = 1000
+
+
+@dataclass
+class GitCall:
+    args: tuple[str, ...]
+    elapsed_ms: float
+    returncode: int
+
+
+_calls: deque[GitCall] = deque(maxlen=MAX_RECORDED_CALLS)
+_read_only = False
+_slots = threading.BoundedSemaphore(GIT_MAX_WORKERS)
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def git_env(optional_locks: bool = False, extra: dict[str, str] | None = None) -> dict[str, str]:
+    """The process environment with gitta's git overrides (and extra) applied."""
+    env = {**os.environ, **GIT_ENV, **(extra or {})}
+    if optional_locks:
+        env.pop("GIT_OPTIONAL_LOCKS")
+    return env
+
+
+def enable_read_only() -> None:
+    """
+    Put this process in read-only mode.
+
+    Query commands (log, explain, pr without --create, doctor without --fix)
+    call this first; any later attempt to run a WRITE_COMMANDS subcommand
+    raises instead of touching the repository.
+    """
+    global _read_only
+    _read_only = True
+
+
+def _check_writable(args: list[str]) -> None:
+    if _read_only and args and args[0] in WRITE_COMMANDS:
+        raise RuntimeError(f"git {args[0]} is not allowed in read-only mode")
+
+
+def _record(args: list[str], start: float, returncode: int) -> None:
+    _calls.append(GitCall(tuple(args), (time.perf_counter() - start) * 1000, returncode))
+
+
+def recorded_calls() -> list[GitCall]:
+    """Timing of the most recent git calls in this process, oldest first."""
+    return list(_calls)
+
+
+def run_git(
+    args: list[str],
+    input: str | None = None,
+    optional_locks: bool = False,
+    env: dict[str, str] | None = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run `git <args>` in the calling thread and wait for it.
+
+    At most GIT_MAX_WORKERS git processes run at once across all threads.
+
+    Args:
+        args: Arguments after "git".
+        input: Optional text sent to stdin.
+        optional_locks: Let git take optional locks (only used to time the
+            default behaviour for comparison).
+        env: Extra environment variables for this call (e.g. GIT_AUTHOR_*).
+
+    Returns:
+        The completed process; stdout and stderr are text.
+
+    Raises:
+        RuntimeError: If args would write while in read-only mode.
+    """
+    _check_writable(args)
+    with _slots:
+        start = time.perf_counter()
+        result = subprocess.run(
+            ["git"] + args,
+            input=input,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env=git_env(optional_locks, env),
+        )
+    _record(args, start, result.returncode)
+    return result
+
+
+def check_git(args: list[str], input: str | None = None, env: dict[str, str] | None = None) -> str:
+    """
+    Run `git <args>` and return its stdout.
+
+    Raises:
+        RuntimeError: With git's error output if the command fails.
+    """
+    result = run_git(args, input=input, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=GIT_MAX_WORKERS, thread_name_prefix="gitta-git")
+        return _pool
+
+
+def submit_git(args: list[str], input: str | None = None) -> Future:
+    """
+    Start `git <args>` on the shared pool without waiting for it.
+
+    Lets callers overlap several git calls, or git work with network I/O.
+
+    Returns:
+        A future resolving to the subprocess.CompletedProcess.
+    """
+    return _executor().submit(run_git, args, input)
+
+
+@contextmanager
+def stream_git(args: list[str], capture_stderr: bool = False) -> Iterator[subprocess.Popen]:
+    """
+    Start `git <args>` with its stdout available to read incrementally.
+
+    The process is killed if the caller stops reading early, and its
+    timing is recorded when the block exits. It holds one of the
+    GIT_MAX_WORKERS slots until then, like a run_git call; git calls made
+    while reading take slots of their own.
+
+    Args:
+        args: Arguments after "git".
+        capture_stderr: Pipe stderr for the caller instead of discarding it.
+    """
+    _check_writable(args)
+    with _slots:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            ["git"] + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            env=git_env(),
+        )
+        try:
+            yield proc
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            if proc.stderr:
+                proc.stderr.close()
+            _record(args, start, proc.returncode)
@@ -7,3 +7,16 @@
 #
 #   class ConfigError(Exception):
 #       pass
+
+
+class StructuredOutputError(Exception):
+    """The AI provider could not produce a response matching the expected schema."""
+
+
+class ContextLengthError(RuntimeError):
+    """
+    A prompt did not fit the model's context window, even fully compacted.
+
+    A RuntimeError, so commands report it like any other failure to
+    generate rather than crashing with a traceback.
+    """
@@ -0,0 +1,58 @@
+# utils/locks.py
+# Purpose: Cross-process locks on files.
+#
+# Responsibilities:
+#   - Serialize read-modify-write of shared cache files between processes
+#   - Let background jobs detect that the same job is already running
+
+import fcntl
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TextIO
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold an exclusive lock on path (created if missing) for the block.
+
+    The lock is released when the block exits, or by the OS if the
+    process dies, so a crashed job never leaves a stale lock behind.
+
+    Yields:
+        bool: Whether the lock is held; always True when blocking, False
+        when not blocking and another process holds it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def try_lock_file(path: Path) -> TextIO | None:
+    """
+    Open path (created if missing) and lock it without blocking.
+
+    The lock lasts until the returned file and every copy of its
+    descriptor (e.g. one inherited by a child process) are closed, so a
+    parent can take a lock on behalf of a job it is about to start.
+
+    Returns:
+        The open file holding the lock, or None if another process holds it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = open(path, "a")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        return None
+    return f
@@ -0,0 +1,6 @@
+# worker/__init__.py
+# Purpose: Marks the worker directory as a Python package.
+#
+# A long-lived local process that keeps the AI client warm and serves
+# commit messages over a Unix socket. The client side must stay light:
+# it is imported by the git hook on every commit.
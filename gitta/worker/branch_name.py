@@ -0,0 +1,34 @@
+# worker/branch_name.py
+# Purpose: Cache an AI branch name in a detached background process.
+#
+# Responsibilities:
+#   - Request the AI name for a description that was named locally,
+#     without keeping `gitta branch --checkout` waiting for it
+#   - Store it in the repository's branch name cache for the next request
+
+import subprocess
+import sys
+
+from gitta.core.branch_namer import cache_ai_name
+
+
+def start_branch_naming(description: str) -> None:
+    """Start a detached process that requests and caches the AI name for description."""
+    subprocess.Popen(
+        [sys.executable, "-m", "gitta.worker.branch_name", description],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def main(argv: list[str]) -> int:
+    """Entry point of the detached process: branch_name <description>."""
+    if len(argv) != 1:
+        return 1
+    return 0 if cache_ai_name(argv[0]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
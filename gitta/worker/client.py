@@ -0,0 +1,126 @@
+# worker/client.py
+# Purpose: prepare-commit-msg hook client for the warm worker.
+#
+# Responsibilities:
+#   - Read the staged diff, compacted and cut to the prompt budget
+#   - Ask the worker for a message (starting it if needed)
+#   - Write the message into git's commit message file
+#
+# Only the standard library (and gitta modules built on it alone) is
+# imported here: this runs on every commit, so it must not pay for typer,
+# rich or openai.
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from gitta.constants import WORKER_REQUEST_TIMEOUT, WORKER_LOG, WORKER_SOCKET
+from gitta.git.diff import get_staged_diff
+
+# Message sources for which git already has a message we must not replace
+SKIP_SOURCES = ("message", "template", "merge", "squash", "commit")
+
+WORKER_START_TIMEOUT = 10.0
+
+
+def is_worker_running() -> bool:
+    """Check whether a worker is accepting connections on the socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(WORKER_SOCKET))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def request_message(diff: str) -> str:
+    """
+    Send a staged diff to the worker and return the generated message.
+
+    Raises:
+        RuntimeError: If the worker reports an error.
+        OSError: If the worker cannot be reached.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(WORKER_REQUEST_TIMEOUT)
+    try:
+        sock.connect(str(WORKER_SOCKET))
+        sock.sendall(json.dumps({"diff": diff, "cwd": os.getcwd()}).encode())
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    finally:
+        sock.close()
+
+    response = json.loads(b"".join(chunks).decode())
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["message"]
+
+
+def start_worker() -> None:
+    """Start a detached worker and wait until its socket accepts connections."""
+    WORKER_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with open(WORKER_LOG, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "gitta.main", "hook", "serve"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    deadline = time.monotonic() + WORKER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if is_worker_running():
+            return
+        time.sleep(0.05)
+
+
+def main(argv: list[str]) -> int:
+    """
+    Hook entry point: prepare-commit-msg <msg-file> [<source> [<sha>]].
+
+    Always returns 0 so a failure here never blocks the commit; git then
+    simply opens the editor without a generated message.
+    """
+    if len(argv) < 1:
+        return 0
+
+    msg_file = argv[0]
+    source = argv[1] if len(argv) > 1 else ""
+    if source in SKIP_SOURCES:
+        return 0
+
+    try:
+        # The same compacted diff, cut at the same budget, as `gitta commit`
+        diff, _ = get_staged_diff()
+        if not diff:
+            return 0
+        try:
+            message = request_message(diff)
+        except (ConnectionRefusedError, FileNotFoundError):
+            start_worker()
+            message = request_message(diff)
+    except Exception as e:
+        print(f"gitta: could not generate a commit message: {e}", file=sys.stderr)
+        return 0
+
+    with open(msg_file, "r+", encoding="utf-8") as f:
+        existing = f.read()
+        f.seek(0)
+        f.write(f"{message}\n{existing}")
+        f.truncate()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
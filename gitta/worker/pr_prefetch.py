@@ -0,0 +1,98 @@
+# worker/pr_prefetch.py
+# Purpose: Prepare a branch's PR description in a detached background process.
+#
+# Responsibilities:
+#   - Start the preparation without keeping the calling command waiting
+#   - Serialize preparations per branch with a lock file, so concurrent
+#     ships of different branches run in parallel without colliding
+#   - Take the lock before the process starts, so a preparation is never
+#     missed by `gitta pr` while it is still starting up
+#   - Let `gitta pr` wait for a preparation that is still running
+
+import hashlib
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from gitta.constants import PR_PREFETCH_LOG
+from gitta.core.pr_service import load_pr_description, prepare_pr_description
+from gitta.git.repository import GitRepository
+from gitta.git.runner import enable_read_only
+from gitta.utils.locks import file_lock, try_lock_file
+
+
+def _lock_path(branch: str) -> Path:
+    # Branch names may contain slashes; hash them into a flat file name
+    name = hashlib.sha1(branch.encode()).hexdigest()[:16]
+    return Path(GitRepository.get_git_common_dir()) / "gitta" / "locks" / f"pr-{name}.lock"
+
+
+def start_pr_prefetch(base: str, branch: str, head_sha: str) -> None:
+    """Start a detached process that prepares and caches the PR description for head_sha."""
+    PR_PREFETCH_LOG.parent.mkdir(parents=True, exist_ok=True)
+    args = [sys.executable, "-m", "gitta.worker.pr_prefetch", base, branch, head_sha]
+    # The branch's lock is taken here and handed to the child, so the
+    # preparation counts as running from the moment this returns. If an
+    # earlier preparation holds it, the child waits for it instead.
+    lock = try_lock_file(_lock_path(branch))
+    try:
+        if lock:
+            args.append(str(lock.fileno()))
+        with open(PR_PREFETCH_LOG, "ab") as log:
+            subprocess.Popen(
+                args,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+                pass_fds=(lock.fileno(),) if lock else (),
+            )
+    finally:
+        # The child's copy of the descriptor keeps the lock held
+        if lock:
+            lock.close()
+
+
+def is_pr_prefetch_running(branch: str) -> bool:
+    """Whether a preparation for branch is running right now."""
+    with file_lock(_lock_path(branch), blocking=False) as acquired:
+        return not acquired
+
+
+def wait_for_pr_prefetch(branch: str, timeout: float) -> None:
+    """Wait until no preparation for branch is running, for at most timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while is_pr_prefetch_running(branch) and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+
+def main(argv: list[str]) -> int:
+    """
+    Entry point of the detached process: pr_prefetch <base> <branch> <head-sha> [<lock-fd>].
+
+    lock-fd is a descriptor of the branch's lock file, inherited already
+    locked from start_pr_prefetch; without it the lock is taken here.
+    """
+    if len(argv) not in (3, 4):
+        return 1
+    base, branch, head_sha = argv[:3]
+
+    # Preparing a description only reads the repository
+    enable_read_only()
+
+    try:
+        # A previous ship of the same branch finishes first; other branches do not wait
+        lock = open(int(argv[3]), "a") if len(argv) == 4 else file_lock(_lock_path(branch))
+        with lock:
+            if load_pr_description(base, branch, head_sha):
+                return 0
+            prepare_pr_description(base, branch, head_sha)
+    except Exception as e:
+        print(f"gitta: could not prepare the PR description for {branch} ({head_sha[:12]}): {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+# worker/server.py
+# Purpose: Warm commit-message worker listening on a Unix socket.
+#
+# Responsibilities:
+#   - Keep one AIClient (and its HTTPS connection pool) alive between requests
+#   - Generate a commit message for each staged diff it receives
+#   - Exit after a period of inactivity
+
+import json
+import os
+import socketserver
+
+from gitta.ai.client import AIClient
+from gitta.config.settings import get_settings
+from gitta.core.context_index import build_repo_context
+from gitta.core.file_cache import build_explanation_context
+from gitta.git.diff_parser import parse_diff_by_file
+from gitta.constants import WORKER_IDLE_TIMEOUT, WORKER_LOCK, WORKER_SOCKET
+from gitta.utils.locks import file_lock
+from gitta.worker.client import is_worker_running
+
+
+class _WorkerState:
+    """Holds the warm AI client, rebuilt only when the settings change."""
+
+    def __init__(self):
+        self.settings = None
+        self.client = None
+
+    def generate(self, diff: str, cwd: str | None) -> str:
+        # Per-repo overrides (.gitta.toml) are resolved from the working directory
+        if cwd:
+            os.chdir(cwd)
+
+        settings = get_settings()
+        if settings is not self.settings:
+            self.client = AIClient()
+            self.settings = settings
+
+        diff = self.client.prompt_budget.cut(diff)
+
+        file_diffs = parse_diff_by_file(diff)
+        repo_context = ""
+        if settings.repo_context:
+            try:
+                repo_context = build_repo_context([fd.file_path for fd in file_diffs])
+            except (RuntimeError, OSError):
+                pass
+
+        explained = build_explanation_context(file_diffs)
+        repo_context = "\n\n".join(part for part in (repo_context, explained) if part)
+        return self.client.generate_commit_message(diff, repo_context)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        body = self.rfile.read()
+        if not body:
+            # Liveness check from is_worker_running()
+            return
+
+        try:
+            request = json.loads(body.decode())
+            message = self.server.state.generate(request["diff"], request.get("cwd"))
+            response = {"message": message}
+        except Exception as e:
+            response = {"error": str(e)}
+        self.wfile.write(json.dumps(response).encode())
+
+
+class _WorkerServer(socketserver.UnixStreamServer):
+    def __init__(self, path: str):
+        super().__init__(path, _RequestHandler)
+        self.state = _WorkerState()
+        self.timeout = WORKER_IDLE_TIMEOUT
+        self.idle = False
+
+    def handle_timeout(self):
+        self.idle = True
+
+
+def serve() -> None:
+    """
+    Run the worker until it has been idle for WORKER_IDLE_TIMEOUT seconds.
+
+    Raises:
+        RuntimeError: If another worker is already running.
+    """
+    # Two hooks may start a worker at once: without the lock, the second
+    # could unlink the socket the first just bound
+    with file_lock(WORKER_LOCK):
+        if is_worker_running():
+            raise RuntimeError(f"A gitta worker is already running on {WORKER_SOCKET}.")
+
+        if WORKER_SOCKET.exists():
+            WORKER_SOCKET.unlink()
+
+        # The socket serves generated messages for any repo: owner access only
+        old_umask = os.umask(0o177)
+        try:
+            server = _WorkerServer(str(WORKER_SOCKET))
+        finally:
+            os.umask(old_umask)
+
+    try:
+        while not server.idle:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if WORKER_SOCKET.exists():
+            WORKER_SOCKET.unlink()
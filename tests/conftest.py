@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+CASSETTE = Path(__file__).resolve().parent / "cassettes" / "commands.jsonl"
+
+# replay (default) runs offline from CASSETTE; record rewrites it against
+# the provider set by GITTA_BASE_URL and GITTA_API_KEY
+MODE = os.environ.get("GITTA_CASSETTE_MODE", "replay")
+RECORDING = MODE == "record"
+
+# The model is part of each request's key: keep it fixed when re-recording
+CONFIG = """\
+provider = "openai"
+base_url = "http://127.0.0.1:9/v1"
+model = "gpt-4o-mini"
+style = "conventional"
+api_key = "dummy"
+"""
+
+# Fixed identity and dates, so every run builds the same commits and SHAs
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test Author",
+    "GIT_AUTHOR_EMAIL": "author@example.com",
+    "GIT_AUTHOR_DATE": "2024-01-01T12:00:00+00:00",
+    "GIT_COMMITTER_NAME": "Test Author",
+    "GIT_COMMITTER_EMAIL": "author@example.com",
+    "GIT_COMMITTER_DATE": "2024-01-01T12:00:00+00:00",
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+@pytest.fixture(scope="session")
+def cassette() -> Path:
+    """The shared cassette, emptied once per session when recording."""
+    if RECORDING:
+        CASSETTE.parent.mkdir(parents=True, exist_ok=True)
+        CASSETTE.write_text("")
+    return CASSETTE
+
+
+@pytest.fixture
+def env(tmp_path, cassette) -> dict[str, str]:
+    """Environment of a gitta run: an isolated HOME, git identity and the cassette."""
+    home = tmp_path / "home"
+    (home / ".gitta").mkdir(parents=True)
+    (home / ".gitta" / "config.toml").write_text(CONFIG)
+
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("GITTA_", "GIT_"))}
+    env.update(GIT_ENV)
+    env.update(
+        HOME=str(home),
+        PYTHONPATH=str(ROOT),
+        COLUMNS="200",
+        GITTA_CASSETTE=str(cassette),
+        GITTA_CASSETTE_MODE=MODE,
+    )
+    if RECORDING:
+        for key in ("GITTA_BASE_URL", "GITTA_API_KEY"):
+            if key in os.environ:
+                env[key] = os.environ[key]
+    return env
+
+
+def git(repo: Path, env: dict[str, str], *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def repo(tmp_path, env) -> Path:
+    """
+    A repository on branch feature, one commit ahead of main, with staged
+    changes in two modules (app and docs).
+    """
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, env, "init", "-q", "-b", "main")
+
+    (repo / "app").mkdir()
+    (repo / "docs").mkdir()
+    (repo / "app" / "client.py").write_text(
+        "import time\n\n\n"
+        "def fetch(session, url):\n"
+        "    return session.get(url, timeout=10)\n"
+    )
+    (repo / "docs" / "usage.md").write_text("# Usage\n\nCall `fetch(session, url)`.\n")
+    git(repo, env, "add", ".")
+    git(repo, env, "commit", "-q", "-m", "Initial commit")
+
+    git(repo, env, "checkout", "-q", "-b", "feature")
+    (repo / "app" / "client.py").write_text(
+        "import time\n\n\n"
+        "def fetch(session, url, retries=3):\n"
+        "    for attempt in range(retries):\n"
+        "        try:\n"
+        "            return session.get(url, timeout=10)\n"
+        "        except ConnectionError:\n"
+        "            time.sleep(2 ** attempt)\n"
+        "    raise ConnectionError(f\"Giving up on {url}\")\n"
+    )
+    git(repo, env, "commit", "-q", "-am", "Retry failed fetches")
+
+    (repo / "app" / "client.py").write_text(
+        (repo / "app" / "client.py").read_text().replace("timeout=10", "timeout=30")
+    )
+    (repo / "docs" / "usage.md").write_text(
+        "# Usage\n\nCall `fetch(session, url)`. Failed requests are retried three times.\n"
+    )
+    git(repo, env, "add", ".")
+    return repo
+
+
+@pytest.fixture
+def gitta(repo, env):
+    """Run `gitta <args>` in the fixture repository."""
+    def run(*args: str, input: str | None = None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, "-m", "gitta.main", *args],
+            cwd=repo,
+            env=env,
+            input=input,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+    return run
+
+
+@pytest.fixture
+def in_repo(repo, env, monkeypatch) -> Path:
+    """The fixture repository as the working directory of in-process git calls."""
+    for key in (*GIT_ENV, "HOME"):
+        monkeypatch.setenv(key, env[key])
+    monkeypatch.chdir(repo)
+    return repo
+
+
+@pytest.fixture
+def configured(in_repo, env, monkeypatch) -> Path:
+    """in_repo, with in-process settings read from the test HOME's config."""
+    # CONFIG_FILE was resolved from the real HOME at import
+    from gitta.config import settings, storage
+
+    config_file = Path(env["HOME"]) / ".gitta" / "config.toml"
+    monkeypatch.setattr(settings, "CONFIG_FILE", config_file)
+    monkeypatch.setattr(storage, "CONFIG_FILE", config_file)
+    # Neither index is needed by in-process tests
+    monkeypatch.setenv("GITTA_REPO_CONTEXT", "false")
+    monkeypatch.setenv("GITTA_REUSE_SIMILAR", "false")
+    return in_repo
+
+
+def commit_file(repo: Path, env: dict[str, str], path: str, text: str, message: str) -> None:
+    """Write path and commit it (and everything else staged) as message."""
+    (repo / path).parent.mkdir(parents=True, exist_ok=True)
+    (repo / path).write_text(text)
+    git(repo, env, "add", path)
+    git(repo, env, "commit", "-q", "-m", message)
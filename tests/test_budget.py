@@ -0,0 +1,139 @@
+import pytest
+
+from gitta.ai.budget import Section, compress_commit_log, compress_stat, fit_sections, truncate_text
+from gitta.ai.tokens import PromptBudget
+
+LOG = "\n".join([
+    "a1 fixup! Add parser",
+    "b2 Bump version",
+    "c3 Bump version",
+    "d4 squash! fixup! Add parser",
+    "e5 Add parser",
+])
+
+STAT = "\n".join([
+    " src/app/api/routes.py | 10 +++++-----",
+    " src/app/api/views.py | 4 ++--",
+    " src/app/models.py | 6 ++++++",
+    " docs/index.md | 2 +-",
+    " assets/logo.png | Bin 0 -> 120 bytes",
+    " 5 files changed, 17 insertions(+), 5 deletions(-)",
+])
+
+
+@pytest.mark.parametrize("log, limit, expected", [
+    # Fits: unchanged
+    (LOG, len(LOG), LOG),
+    # Fixups folded into the commit they amend, repeated subjects counted
+    (
+        LOG,
+        len(LOG) - 1,
+        "b2 Bump version (x2)\ne5 Add parser (x3)\n(2 fixup commit(s) folded into the commits they amend)",
+    ),
+    # A fixup whose target is outside the log is kept under its target's subject
+    ("a1 fixup! Gone\nb2 Kept\nc3 Kept", 28, "b2 Kept (x2)\na1 fixup! Gone"),
+])
+def test_compress_commit_log(log, limit, expected):
+    assert compress_commit_log(log, limit) == expected
+
+
+def test_compress_commit_log_keeps_newest_and_oldest():
+    log = "\n".join(f"{i:02} Change {i}" for i in range(40))
+
+    text = compress_commit_log(log, 80)
+
+    assert len(text) <= 80
+    lines = text.splitlines()
+    assert lines[0] == "00 Change 0" and lines[-1] == "39 Change 39"
+    omitted = int(next(line for line in lines if line.startswith("... ")).split()[1])
+    assert omitted + len(lines) - 1 == 40
+
+
+@pytest.mark.parametrize("limit, expected", [
+    (len(STAT), STAT),
+    # Deepest directories aggregated first; binary files count no lines
+    (
+        len(STAT) - 1,
+        " src/app/api/ (2 files) | 14\n src/app/models.py | 6\n docs/index.md | 2\n assets/logo.png | 0\n"
+        " 5 files changed, 17 insertions(+), 5 deletions(-)",
+    ),
+    (
+        120,
+        " src/app/ (3 files) | 20\n docs/index.md | 2\n assets/logo.png | 0\n"
+        " 5 files changed, 17 insertions(+), 5 deletions(-)",
+    ),
+    (110, " src/ (3 files) | 20\n docs/ | 2\n assets/ | 0\n 5 files changed, 17 insertions(+), 5 deletions(-)"),
+])
+def test_compress_stat(limit, expected):
+    assert compress_stat(STAT, limit) == expected
+
+
+def test_compress_stat_overflow_keeps_ends():
+    stat = "\n".join(f" dir{i}/file.py | {i} {'+' * i}" for i in range(1, 30))
+
+    text = compress_stat(stat, 100)
+
+    assert len(text) <= 100
+    assert text.startswith(" dir1/ | 1") and text.endswith(" dir29/ | 29")
+    assert "more entries" in text
+
+
+class Words:
+    """A stand-in token estimator: one token per whitespace-separated word."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+    def cut(self, text: str, limit: int) -> str:
+        return " ".join(text.split()[:limit])
+
+
+CHARS = PromptBudget(100)
+TOKENS = PromptBudget(20, Words())
+
+
+@pytest.mark.parametrize("budget, sections, sizes", [
+    # Everything fits: nothing is touched
+    (CHARS, {"diff": Section("d" * 60, 2), "log": Section("l" * 40)}, {"diff": 60, "log": 40}),
+    # The short section keeps its size, the long one gets the rest
+    (CHARS, {"diff": Section("d" * 200, 2), "log": Section("l" * 20)}, {"diff": 80, "log": 20}),
+    # Both overflow: shared 2:1 by weight
+    (CHARS, {"diff": Section("d" * 200, 2), "log": Section("l" * 200)}, {"diff": 66, "log": 33}),
+    # Sections without a fit function are kept whole and come off the top
+    (CHARS, {"files": Section("f" * 40, fit=None), "diff": Section("d" * 200, 2)}, {"files": 40, "diff": 60}),
+    # Token budgets share out tokens, not characters
+    (TOKENS, {"diff": Section("word " * 50, 2), "log": Section("entry " * 50)}, {"diff": 13, "log": 6}),
+])
+def test_fit_sections(budget, sections, sizes):
+    fitted = fit_sections(sections, budget)
+
+    assert {name: budget.measure(text) for name, text in fitted.items()} == sizes
+    assert sum(sizes.values()) <= budget.limit
+
+
+def test_fit_sections_gives_unused_share_to_cut_sections():
+    log = "\n".join(["x1 Bump version"] * 30)
+    sections = {"diff": Section("d" * 300, 2), "log": Section(log, fit=compress_commit_log)}
+
+    fitted = fit_sections(sections, CHARS)
+
+    assert fitted["log"] == "x1 Bump version (x30)"
+    assert len(fitted["diff"]) == 100 - len(fitted["log"])
+
+
+def test_fit_sections_everything_overflows():
+    sections = {
+        "files": Section("f" * 150, fit=None),
+        "diff": Section("d" * 300, 2),
+        "log": Section("l" * 300, fit=compress_commit_log),
+    }
+
+    fitted = fit_sections(sections, CHARS)
+
+    # The fixed section alone is over budget: the flexible ones get nothing
+    assert fitted == {"files": "f" * 150, "diff": "", "log": ""}
+
+
+def test_truncate_text_prefers_line_boundary():
+    assert truncate_text("aaaa\nbbbb\ncccc", 12) == "aaaa\nbbbb"
+    assert truncate_text("a\nbbbbbbbbbbbb", 10) == "a\nbbbbbbbb"
@@ -0,0 +1,71 @@
+import pytest
+from openai.types.chat import ChatCompletion
+
+from gitta.ai.cassette import Cassette, CassetteMissError, ReplayedBadRequestError, request_key
+from gitta.ai.context_limits import is_context_length_error
+
+REQUEST = {"model": "m", "messages": [{"role": "user", "content": "Write a commit message."}], "temperature": 0.2}
+
+
+def completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "c",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "m",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    })
+
+
+def test_request_key_ignores_transport_fields():
+    assert request_key(REQUEST) == request_key({**REQUEST, "timeout": 30, "stream": False})
+    assert request_key(REQUEST) != request_key({**REQUEST, "temperature": 0.7})
+    assert request_key(REQUEST) != request_key({**REQUEST, "messages": [{"role": "user", "content": "Other."}]})
+
+
+def test_replay_in_recording_order(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    recorder = Cassette(path, "record")
+    recorder.record(REQUEST, 10, response=completion("first"))
+    recorder.record(REQUEST, 10, response=completion("second"))
+
+    player = Cassette(path, "replay")
+    contents = [player.replay(dict(REQUEST)).choices[0].message.content for _ in range(3)]
+
+    # The last entry repeats once the recorded ones run out
+    assert contents == ["first", "second", "second"]
+
+
+def test_replay_recorded_error(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    error = "Error code: 400 - This model's maximum context length is 8192 tokens."
+    Cassette(path, "record").record(REQUEST, 10, error=error)
+
+    with pytest.raises(ReplayedBadRequestError) as info:
+        Cassette(path, "replay").replay(REQUEST)
+
+    assert is_context_length_error(info.value)
+
+
+def test_replay_miss(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    Cassette(path, "record").record(REQUEST, 10, response=completion("recorded"))
+
+    with pytest.raises(CassetteMissError, match="GITTA_CASSETTE_MODE=record"):
+        Cassette(path, "replay").replay({**REQUEST, "model": "other"})
+
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(RuntimeError, match="Must be 'record' or 'replay'"):
+        Cassette(tmp_path / "cassette.jsonl", "rewind")
+
+
+@pytest.mark.parametrize("line", ['{"key": "k", "response": {', '["not", "an", "entry"]', '{"response": {}}'])
+def test_corrupt_line_names_the_line(tmp_path, line):
+    path = tmp_path / "cassette.jsonl"
+    Cassette(path, "record").record(REQUEST, 10, response=completion("recorded"))
+    with open(path, "a") as f:
+        f.write(line + "\n")
+
+    with pytest.raises(RuntimeError, match=f"Invalid cassette entry at {path}:2"):
+        Cassette(path, "replay")
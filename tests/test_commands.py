@@ -0,0 +1,73 @@
+"""
+Commands run end to end against the recorded cassette (tests/cassettes).
+
+Offline by default. To re-record after changing a prompt, run against a
+provider (any OpenAI-compatible endpoint):
+
+    GITTA_CASSETTE_MODE=record GITTA_BASE_URL=... GITTA_API_KEY=... pytest tests/test_commands.py
+"""
+
+import json
+import re
+
+import pytest
+
+from conftest import CASSETTE, RECORDING, git
+
+
+def recorded_lines() -> set[str]:
+    """Every non-empty line of the recorded completions, including JSON string fields."""
+    lines = set()
+    for entry in map(json.loads, CASSETTE.read_text().splitlines()):
+        for choice in entry.get("response", {}).get("choices", []):
+            texts = [choice["message"]["content"] or ""]
+            try:
+                texts += [v for v in json.loads(texts[0]).values() if isinstance(v, str)]
+            except (ValueError, AttributeError):
+                pass
+            lines.update(line.strip() for text in texts for line in text.splitlines() if line.strip())
+    return lines
+
+
+def assert_recorded_output(result) -> None:
+    assert result.returncode == 0, result.stdout + result.stderr
+    # Not whole lines: the spinner's last frame stays in front of the first one
+    assert any(line in result.stdout for line in recorded_lines()), result.stdout
+
+
+def test_commit(gitta):
+    result = gitta("commit", "--dry-run", "--no-split")
+    assert_recorded_output(result)
+
+
+def test_commit_split(gitta):
+    result = gitta("commit", "--split", "--dry-run")
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert re.findall(r"\((\w+)\) ", result.stdout) == ["app", "docs"]
+
+
+def test_pr(gitta):
+    result = gitta("pr", "--dry-run", "--base", "main")
+    assert_recorded_output(result)
+
+
+def test_explain(gitta):
+    result = gitta("explain", "HEAD")
+    assert_recorded_output(result)
+
+
+def test_branch(gitta):
+    result = gitta("branch", "retry failed fetches")
+    assert_recorded_output(result)
+    assert "named locally" not in result.stdout
+
+
+@pytest.mark.skipif(RECORDING, reason="nothing is missing while recording")
+def test_unrecorded_request_fails(gitta, repo, env):
+    (repo / "app" / "client.py").write_text("print('never recorded')\n")
+    git(repo, env, "add", ".")
+
+    result = gitta("commit", "--dry-run", "--no-split")
+
+    assert result.returncode == 1
+    assert "No recorded response" in result.stdout + result.stderr
@@ -0,0 +1,29 @@
+import pytest
+
+from gitta.core import commit_service
+from gitta.core.commit_service import CommitService
+
+
+@pytest.fixture
+def requests(configured, monkeypatch) -> list[tuple[int, bool]]:
+    """(n, sample) of every candidate request; sampled requests answer with a new message."""
+    calls: list[tuple[int, bool]] = []
+
+    def generate(diff, n, repo_context="", sample=False):
+        calls.append((n, sample))
+        return [f"message {len(calls)}" if sample else "message 1"]
+
+    monkeypatch.setenv("GITTA_CANDIDATES", "1")
+    monkeypatch.setattr(commit_service, "generate_commit_messages", generate)
+    return calls
+
+
+def test_regenerate_samples_a_new_candidate(requests):
+    service = CommitService()
+    message, _ = service.run()
+
+    assert message == "message 1"
+    assert service.next_candidate() == ("message 2", 2, 2)
+    assert service.next_candidate() == ("message 3", 3, 3)
+    # The first batch is deterministic; only top-ups are sampled
+    assert requests == [(1, False), (1, True), (1, True)]
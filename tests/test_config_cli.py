@@ -0,0 +1,40 @@
+import pytest
+from typer.testing import CliRunner
+
+from gitta.cli import config as config_cli
+from gitta.main import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def saved(tmp_path, monkeypatch):
+    """Redirect the config file to a temp dir; returns the saved data."""
+    data = {"provider": "openai", "base_url": "https://api.example.com/v1", "model": "m", "style": "simple"}
+    config_file = tmp_path / "config.toml"
+    config_file.write_text("")
+    monkeypatch.setattr(config_cli, "CONFIG_FILE", config_file)
+    monkeypatch.setattr(config_cli, "load_config", lambda: dict(data))
+    monkeypatch.setattr(config_cli, "save_config", data.update)
+    return data
+
+
+@pytest.mark.parametrize("key", ["max_diff_tokens", "rpm", "tpm"])
+def test_zero_turns_off(saved, key):
+    result = runner.invoke(app, ["config", "set", key, "0"])
+    assert result.exit_code == 0, result.output
+    assert saved[key] == 0
+
+
+@pytest.mark.parametrize("key", ["candidates", "max_diff_chars", "rename_threshold", "copy_threshold"])
+def test_zero_rejected(saved, key):
+    result = runner.invoke(app, ["config", "set", key, "0"])
+    assert result.exit_code == 1
+    assert key not in saved
+
+
+@pytest.mark.parametrize("key", ["rpm", "candidates"])
+def test_negative_rejected(saved, key):
+    result = runner.invoke(app, ["config", "set", key, "-5"])
+    assert result.exit_code == 1
+    assert key not in saved
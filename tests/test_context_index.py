@@ -0,0 +1,28 @@
+import json
+
+from conftest import commit_file
+
+from gitta.core import context_index
+from gitta.core.context_index import load_index, update_index
+
+
+def test_incremental_update_is_capped(in_repo, env, monkeypatch):
+    assert update_index()["commits"] == 2
+
+    monkeypatch.setattr(context_index, "INCREMENTAL_INDEX_COMMITS", 3)
+    for i in range(5):
+        commit_file(in_repo, env, f"app/module_{i}.py", f"VALUE = {i}\n", f"feat(app): add module {i}")
+
+    index = update_index()
+    assert index["commits"] == 5
+    assert index["types"] == {"feat": 3}
+    assert load_index() == index
+
+
+def test_index_is_replaced_atomically(in_repo):
+    update_index()
+
+    files = [p.name for p in context_index._index_path().parent.iterdir()]
+    assert context_index.INDEX_FILENAME in files
+    assert not [name for name in files if name.endswith(".tmp")]
+    assert json.loads(context_index._index_path().read_text())["commits"] == 2
@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import git
+
+from gitta.ai.tokens import PromptBudget, get_estimator
+from gitta.config.settings import Settings
+from gitta.git import diff
+
+BUDGETS = {
+    "chars": lambda limit: PromptBudget(limit),
+    "tokens": lambda limit: PromptBudget(limit, get_estimator("gpt-4o-mini")),
+}
+
+
+@pytest.fixture
+def staged(in_repo, env, monkeypatch):
+    settings = Settings({"provider": "openai", "base_url": "https://api.example.com/v1", "model": "gpt-4o-mini", "style": "simple"})
+    monkeypatch.setattr(diff, "get_settings", lambda: settings)
+    # Ends in context lines, so the last lines read are blank-ish
+    (in_repo / "app" / "notes.txt").write_text("".join(f"note {i}\n" for i in range(30)))
+    git(in_repo, env, "add", "-A")
+    return in_repo
+
+
+@pytest.mark.parametrize("unit", BUDGETS)
+def test_truncated_flag_at_the_boundary(staged, unit):
+    budget = BUDGETS[unit]
+    full, truncated = diff.get_staged_diff(budget(10**6))
+    assert not truncated
+    size = budget(0).measure(full)
+
+    assert diff.get_staged_diff(budget(size)) == (full, False)
+
+    text, truncated = diff.get_staged_diff(budget(size - 1))
+    assert truncated
+    assert budget(0).measure(text) <= size - 1
+    assert full.startswith(text)
+
+
+@pytest.mark.parametrize("unit", BUDGETS)
+def test_cut_inside_trailing_whitespace_is_truncated(staged, env, unit):
+    # A blank line after the last visible one still counts as cut off
+    (staged / "docs" / "blank.md").write_text("text\n\n\n\n")
+    git(staged, env, "add", "-A")
+    budget = BUDGETS[unit]
+    full, _ = diff.get_staged_diff(budget(10**6))
+    head = full[:full.index("+text") + len("+text")]
+
+    text, truncated = diff.get_staged_diff(budget(budget(0).measure(head)))
+
+    assert text == head
+    assert truncated
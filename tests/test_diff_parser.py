@@ -0,0 +1,100 @@
+import pytest
+
+from conftest import git
+
+from gitta.git.diff_parser import compact_renames, group_diffs_by_module, parse_diff_by_file
+from gitta.git.repository import GitRepository
+
+LINES = "".join(f"line {i}\n" for i in range(20))
+
+
+def staged_diff(repo, env) -> str:
+    """The staged diff as gitta reads it: plumbing, rename detection, pure moves compacted."""
+    git(repo, env, "add", "-A")
+    diff, truncated = GitRepository.read_diff_index(["--cached", "-p", "--full-index", "-M50%", "-C50%"], 10**6, compact_renames)
+    assert not truncated
+    return diff
+
+
+@pytest.fixture
+def clean_repo(in_repo, env):
+    git(in_repo, env, "commit", "-q", "-m", "Tighten timeouts")
+    (in_repo / "app" / "data.txt").write_text(LINES)
+    (in_repo / "app" / "logo.png").write_bytes(b"\x89PNG\0\0binary")
+    git(in_repo, env, "add", "-A")
+    git(in_repo, env, "commit", "-q", "-m", "Add data")
+    return in_repo
+
+
+def test_pure_rename_is_one_line(clean_repo, env):
+    git(clean_repo, env, "mv", "app/data.txt", "app/moved.txt")
+
+    diff = staged_diff(clean_repo, env)
+
+    assert diff == "rename app/data.txt => app/moved.txt"
+    (fd,) = parse_diff_by_file(diff)
+    assert (fd.file_path, fd.status, fd.old_path, fd.similarity) == ("app/moved.txt", "renamed", "app/data.txt", 100)
+    assert fd.diff_text == diff
+
+
+def test_rename_with_edits_keeps_hunks(clean_repo, env):
+    git(clean_repo, env, "mv", "app/data.txt", "app/moved.txt")
+    (clean_repo / "app" / "moved.txt").write_text(LINES.replace("line 3\n", "line three\n"))
+
+    diff = staged_diff(clean_repo, env)
+
+    assert "rename from app/data.txt" in diff
+    (fd,) = parse_diff_by_file(diff)
+    assert (fd.file_path, fd.status, fd.old_path) == ("app/moved.txt", "renamed", "app/data.txt")
+    assert 50 <= fd.similarity < 100
+    assert "+line three" in fd.diff_text
+    assert fd.blob_key and len(fd.blob_key) == 82
+
+
+def test_binary_file(clean_repo, env):
+    (clean_repo / "app" / "logo.png").write_bytes(b"\x89PNG\0\0changed")
+    (clean_repo / "app" / "data.txt").write_text(LINES + "line 20\n")
+
+    fds = parse_diff_by_file(staged_diff(clean_repo, env))
+
+    assert [(fd.file_path, fd.status) for fd in fds] == [("app/data.txt", "modified"), ("app/logo.png", "modified")]
+    assert "Binary files" in fds[1].diff_text
+    assert "+line 20" not in fds[1].diff_text
+
+
+def test_paths_with_spaces(clean_repo, env):
+    (clean_repo / "docs" / "release notes.md").write_text("# Notes\n")
+    git(clean_repo, env, "mv", "app/data.txt", "app/old data.txt")
+
+    fds = parse_diff_by_file(staged_diff(clean_repo, env))
+
+    assert [(fd.file_path, fd.status, fd.old_path) for fd in fds] == [
+        ("app/old data.txt", "renamed", "app/data.txt"),
+        ("docs/release notes.md", "added", None),
+    ]
+    assert [g.scope for g in group_diffs_by_module(fds)] == ["app", "docs"]
+
+
+@pytest.mark.parametrize("header, compacted", [
+    # Pure rename
+    (["diff --git a/a b/b\n", "similarity index 100%\n", "rename from a\n", "rename to b\n"], ["rename a => b\n"]),
+    # Pure copy
+    (["diff --git a/a b/c\n", "similarity index 100%\n", "copy from a\n", "copy to c\n"], ["copy a => c\n"]),
+    # A mode change is kept in full
+    (
+        ["diff --git a/a b/b\n", "old mode 100644\n", "new mode 100755\n", "similarity index 100%\n", "rename from a\n", "rename to b\n"],
+        None,
+    ),
+])
+def test_compact_renames(header, compacted):
+    assert list(compact_renames(header)) == (compacted or header)
+
+
+def test_spans_exclude_separators():
+    diff = "diff --git a/x b/x\n--- a/x\n+++ b/x\n@@ -1 +1 @@\n-a\n+b\n\ndiff --git a/y b/y\n--- a/y\n+++ b/y\n@@ -1 +1 @@\n-c\n+d\n"
+
+    x, y = parse_diff_by_file(diff)
+
+    assert x.diff_text == diff[:diff.index("\n\ndiff")]
+    assert y.diff_text == diff[diff.index("diff --git a/y"):].rstrip("\n")
+    assert x.size == len(x.diff_text)
@@ -0,0 +1,28 @@
+import time
+
+from gitta.cli.doctor import CheckResult, _run_with_deadlines
+
+
+def test_missed_deadline_is_a_warning():
+    results = _run_with_deadlines([
+        ("slow", 0.05, lambda: time.sleep(1) or []),
+        ("quick", 1.0, lambda: [CheckResult("quick", "ok", "done")]),
+    ])
+
+    assert [(r.name, r.status) for r in results] == [("slow", "warn"), ("quick", "ok")]
+
+
+def test_crashed_check_is_a_warning():
+    def crash():
+        raise OSError("no such file")
+
+    (result,) = _run_with_deadlines([("crash", 1.0, crash)])
+
+    assert result.status == "warn"
+    assert "no such file" in result.message
+
+
+def test_check_keeps_its_own_failure():
+    (result,) = _run_with_deadlines([("provider", 1.0, lambda: [CheckResult("provider", "fail", "unreachable")])])
+
+    assert result.status == "fail"
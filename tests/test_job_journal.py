@@ -0,0 +1,116 @@
+import pytest
+
+from conftest import git
+
+from gitta.cli import confirm
+from gitta.core import commit_service
+from gitta.core.commit_service import CommitService
+from gitta.core.job_journal import load_pending_split
+from gitta.git.repository import GitRepository
+from gitta.utils.errors import StructuredOutputError
+
+
+@pytest.fixture
+def generated(configured, monkeypatch) -> list[str]:
+    """Scopes passed to the per-group generator, with every request answered by `<scope> v<n>`."""
+    calls: list[str] = []
+
+    def no_structured(*args):
+        raise StructuredOutputError("forced per-group generation")
+
+    def per_group(groups, contexts, record):
+        results = []
+        for group in groups:
+            calls.append(group.scope)
+            message = f"{group.scope} v{calls.count(group.scope)}"
+            record(group, message)
+            results.append((group, message))
+        return results
+
+    monkeypatch.setattr(commit_service, "generate_split_commit_messages", no_structured)
+    monkeypatch.setattr(commit_service, "generate_grouped_commit_messages", per_group)
+    return calls
+
+
+def messages(grouped) -> dict[str, str]:
+    return {group.scope: message for group, message in grouped}
+
+
+def test_interrupted_run_resumes(generated, monkeypatch):
+    def interrupted(groups, contexts, record):
+        generated.append(groups[0].scope)
+        record(groups[0], "app v1")
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(commit_service, "generate_grouped_commit_messages", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            CommitService().run_split()
+
+    grouped, _ = CommitService().run_split()
+
+    # Only the group without a journaled message is generated again
+    assert generated == ["app", "docs"]
+    assert messages(grouped) == {"app": "app v1", "docs": "docs v1"}
+
+    # The complete grouping is journaled: nothing is generated at all
+    grouped, _ = CommitService().run_split()
+    assert generated == ["app", "docs"]
+    assert messages(grouped) == {"app": "app v1", "docs": "docs v1"}
+
+
+def test_regenerate_replaces_journaled_messages(generated):
+    CommitService().run_split()
+
+    grouped, _ = CommitService().run_split(regenerate=True)
+
+    assert generated == ["app", "docs", "app", "docs"]
+    assert messages(grouped) == {"app": "app v2", "docs": "docs v2"}
+    grouped, _ = CommitService().run_split()
+    assert messages(grouped) == {"app": "app v2", "docs": "docs v2"}
+
+
+def test_interrupted_split_commit_resumes(generated, in_repo, env, monkeypatch):
+    grouped, _ = CommitService().run_split()
+    commit = GitRepository.commit
+
+    def commit_once(message):
+        if message == "docs v1":
+            raise KeyboardInterrupt
+        commit(message)
+
+    with monkeypatch.context() as m:
+        m.setattr(GitRepository, "commit", commit_once)
+        with pytest.raises(KeyboardInterrupt):
+            confirm._commit_groups_separately(grouped)
+
+    _, pending, committed = load_pending_split()
+    assert (messages(pending), committed) == ({"app": "app v1", "docs": "docs v1"}, 1)
+
+    monkeypatch.setattr(confirm.typer, "confirm", lambda *args, **kwargs: True)
+    assert confirm.resume_pending_split() is True
+
+    log = git(in_repo, env, "log", "--format=%s", "main..HEAD").splitlines()
+    assert log == ["docs v1", "app v1", "Retry failed fetches"]
+    assert git(in_repo, env, "status", "--porcelain") == ""
+    assert load_pending_split() is None
+
+
+def test_split_is_not_resumed_after_other_commits(generated, in_repo, env, monkeypatch):
+    grouped, _ = CommitService().run_split()
+    commit = GitRepository.commit
+
+    def commit_once(message):
+        if message == "docs v1":
+            raise KeyboardInterrupt
+        commit(message)
+
+    with monkeypatch.context() as m:
+        m.setattr(GitRepository, "commit", commit_once)
+        with pytest.raises(KeyboardInterrupt):
+            confirm._commit_groups_separately(grouped)
+
+    git(in_repo, env, "commit", "-q", "-m", "Unrelated")
+
+    assert load_pending_split() is None
+    assert confirm.resume_pending_split() is None
@@ -0,0 +1,95 @@
+import json
+import stat
+import sys
+
+import pytest
+
+from conftest import git
+
+from gitta.core.artifacts import save_artifact
+
+FAKE_GH = """\
+#!{python}
+import json, os, sys
+with open(os.environ["FAKE_GH_LOG"], "a") as log:
+    log.write(json.dumps(sys.argv[1:]) + "\\n")
+if sys.argv[1:3] == ["pr", "view"]:
+    print(os.environ["FAKE_GH_VIEW"])
+elif sys.argv[1:3] == ["pr", "merge"] and os.environ.get("FAKE_GH_MERGE_ERROR"):
+    print(os.environ["FAKE_GH_MERGE_ERROR"], file=sys.stderr)
+    sys.exit(1)
+"""
+
+
+@pytest.fixture
+def gh(tmp_path, repo, env):
+    """A stand-in `gh` on PATH; returns a function reading the calls it received."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "gh"
+    script.write_text(FAKE_GH.format(python=sys.executable))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    log = tmp_path / "gh.log"
+    head = git(repo, env, "rev-parse", "HEAD").strip()
+    env.update(
+        PATH=f"{bin_dir}:{env['PATH']}",
+        FAKE_GH_LOG=str(log),
+        FAKE_GH_VIEW=json.dumps({
+            "title": "Retry failed fetches", "number": 7, "state": "OPEN",
+            "url": "https://github.com/o/r/pull/7", "headRefOid": head, "baseRefName": "main",
+        }),
+    )
+
+    def calls() -> list[list[str]]:
+        return [json.loads(line) for line in log.read_text().splitlines()] if log.exists() else []
+    return calls
+
+
+def merge_call(calls: list[list[str]]) -> list[str] | None:
+    return next((args for args in calls if args[:2] == ["pr", "merge"]), None)
+
+
+@pytest.mark.parametrize("flags, expected", [
+    ([], "--merge"),
+    (["--rebase"], "--rebase"),
+])
+def test_merge_mode(gitta, gh, repo, env, flags, expected):
+    head = git(repo, env, "rev-parse", "HEAD").strip()
+
+    result = gitta("merge", *flags, input="y\n")
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert merge_call(gh()) == ["pr", "merge", "--match-head-commit", head, expected, "--delete-branch"]
+
+
+def test_squash_passes_cached_message(gitta, gh, in_repo, env):
+    head = git(in_repo, env, "rev-parse", "HEAD").strip()
+    save_artifact(head, "squash", {"subject": "Retry failed fetches", "body": "Up to three attempts."})
+
+    result = gitta("merge", "--squash", "--no-delete-branch", input="y\n")
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert merge_call(gh()) == [
+        "pr", "merge", "--match-head-commit", head, "--squash",
+        "--subject", "Retry failed fetches", "--body", "Up to three attempts.",
+    ]
+
+
+def test_stale_head_is_refused(gitta, gh, repo, env):
+    git(repo, env, "commit", "-q", "-m", "Not pushed yet")
+
+    result = gitta("merge", input="y\n")
+
+    assert result.returncode == 1
+    assert "Push or pull" in result.stdout
+    assert merge_call(gh()) is None
+
+
+def test_gh_error_exits(gitta, gh, env):
+    env["FAKE_GH_MERGE_ERROR"] = "Pull request is not mergeable"
+
+    result = gitta("merge", input="y\n")
+
+    assert result.returncode == 1
+    assert "Pull request is not mergeable" in result.stdout
@@ -0,0 +1,33 @@
+from conftest import commit_file, git
+
+from gitta.git.rewrite import move_head, read_range, rewrite_messages
+
+
+def commits(repo, env, revision_range: str) -> list[list[str]]:
+    """Tree, author, author date and subject of each commit, oldest first."""
+    log = git(repo, env, "log", "--reverse", "--format=%T%x00%an <%ae>%x00%ad%x00%s", revision_range)
+    return [line.split("\0") for line in log.splitlines()]
+
+
+def test_rewrite_changes_only_messages(in_repo, env):
+    git(in_repo, env, "commit", "-q", "-m", "Raise timeout")
+    other = {**env, "GIT_AUTHOR_NAME": "Other Author", "GIT_AUTHOR_DATE": "2024-02-01T08:30:00+02:00"}
+    commit_file(in_repo, other, "app/extra.py", "X = 1\n", "Add extra")
+    (in_repo / "app" / "untracked.txt").write_text("left alone\n")
+    before = commits(in_repo, env, "main..HEAD")
+    old_tip = git(in_repo, env, "rev-parse", "HEAD").strip()
+
+    range_commits = read_range("main..HEAD")
+    assert [c.message for c in range_commits] == ["Retry failed fetches", "Raise timeout", "Add extra"]
+    assert "+X = 1" in range_commits[-1].patch
+
+    # Only the middle message changes: the first commit is reused as it is
+    new_tip = rewrite_messages(range_commits, {range_commits[1].sha: "fix(app): raise the fetch timeout"})
+    move_head(new_tip, old_tip)
+
+    after = commits(in_repo, env, "main..HEAD")
+    assert [c[:3] for c in after] == [c[:3] for c in before]
+    assert [c[3] for c in after] == ["Retry failed fetches", "fix(app): raise the fetch timeout", "Add extra"]
+    assert git(in_repo, env, "rev-parse", "HEAD~2").strip() == range_commits[0].sha
+    assert git(in_repo, env, "rev-parse", "HEAD").strip() == new_tip != old_tip
+    assert git(in_repo, env, "status", "--porcelain") == "?? app/untracked.txt\n"
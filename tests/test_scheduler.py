@@ -0,0 +1,45 @@
+from gitta.ai.scheduler import RateLimitScheduler, TokenBucket, parse_reset
+
+
+def test_learning_limit_starts_from_remaining():
+    scheduler = RateLimitScheduler()
+    assert scheduler.acquire(9000) == 0
+
+    scheduler.observe({
+        "x-ratelimit-limit-tokens": "30000",
+        "x-ratelimit-remaining-tokens": "29000",
+        "x-ratelimit-limit-requests": "500",
+        "x-ratelimit-remaining-requests": "499",
+    })
+
+    assert scheduler.tokens.level == 29000
+    assert scheduler.requests.level == 499
+    assert scheduler.acquire(9000) == 0
+
+
+def test_learning_limit_without_remaining_fills_bucket():
+    bucket = TokenBucket(0)
+    bucket.observe(600, None, now=bucket.updated)
+    assert bucket.capacity == 600
+    assert bucket.level == 600
+
+
+def test_known_limit_only_lowers_level():
+    bucket = TokenBucket(1000)
+    bucket.observe(1000, 400, now=bucket.updated)
+    assert bucket.level == 400
+    bucket.observe(1000, 900, now=bucket.updated)
+    assert bucket.level == 400
+
+
+def test_empty_bucket_waits():
+    bucket = TokenBucket(60)
+    bucket.take(60)
+    assert bucket.wait_time(30, bucket.updated) == 30
+
+
+def test_parse_reset():
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("20ms") == 0.02
+    assert parse_reset("1.5") == 1.5
+    assert parse_reset(None) is None
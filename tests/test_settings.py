@@ -0,0 +1,30 @@
+import pytest
+
+from gitta.config.settings import Settings
+from gitta.config.storage import load_toml_cached
+
+BASE = {"provider": "openai", "base_url": "https://api.example.com/v1", "model": "m", "style": "simple"}
+
+
+def test_int_settings_are_parsed():
+    settings = Settings({**BASE, "rpm": "60", "candidates": 3})
+    assert settings.rpm == 60
+    assert settings.candidates == 3
+
+
+def test_invalid_int_names_key_and_source():
+    with pytest.raises(RuntimeError, match=r"'tpm' in GITTA_TPM"):
+        Settings({**BASE, "tpm": "lots"}, {"tpm": "GITTA_TPM"})
+
+
+def test_invalid_model_budget_names_table():
+    data = {**BASE, "models": {"m": {"max_diff_tokens": "big"}}}
+    with pytest.raises(RuntimeError, match=r'models\."m"\.max_diff_tokens'):
+        Settings(data, {"models": "/tmp/config.toml"})
+
+
+def test_malformed_toml_is_runtime_error(tmp_path):
+    path = tmp_path / ".gitta.toml"
+    path.write_text("model = \n")
+    with pytest.raises(RuntimeError, match="Invalid TOML"):
+        load_toml_cached(path)
@@ -0,0 +1,34 @@
+from conftest import commit_file
+
+from gitta.core import similarity_index
+from gitta.core.similarity_index import update_similarity_index
+from gitta.git.repository import GitRepository
+
+
+def indexed_shas() -> set[str]:
+    conn = similarity_index._connect()
+    try:
+        return {sha for (sha,) in conn.execute("SELECT sha FROM commits")}
+    finally:
+        conn.close()
+
+
+def test_incremental_update_is_capped(in_repo, env, monkeypatch):
+    assert update_similarity_index() == 2
+
+    monkeypatch.setattr(similarity_index, "INCREMENTAL_INDEX_COMMITS", 3)
+    for i in range(5):
+        commit_file(in_repo, env, f"app/module_{i}.py", f"VALUE = {i}\n", f"Add module {i}")
+
+    assert update_similarity_index() == 3
+    assert len(indexed_shas()) == 5
+    # Up to date: nothing is read again
+    assert update_similarity_index() == 0
+
+
+def test_patches_are_capped(in_repo, env):
+    commit_file(in_repo, env, "app/big.py", "x = 1\n" * 1000, "Add a big file")
+
+    (_, _, patch), = GitRepository.iter_commit_patches("HEAD", max_count=1, max_patch_chars=100)
+
+    assert 100 <= len(patch) < 200